@@ -0,0 +1,96 @@
+"""
+Measures the memory traffic generated by Kona's vector kernels inside FGMRES.
+
+Large NumPy temporaries are obtained from the operating system with fresh
+memory maps, so every temporary created by a vector kernel shows up as a
+burst of minor page faults. This benchmark solves a diagonal system with
+FGMRES and reports the minor page faults and wall time per Krylov iteration,
+once with the in-place `BaseVector` kernels and once with a reference
+implementation that re-binds ``data`` to freshly allocated arrays.
+
+Usage::
+
+    python benchmarks/fgmres_allocations.py [size] [max_iter]
+"""
+import sys
+import time
+import resource
+
+import numpy as np
+
+from kona.user import UserSolver, BaseVector, BlockAllocator
+from kona.linalg.memory import KonaMemory
+from kona.linalg.solvers.krylov import FGMRES
+from kona.linalg.matrices.common import IdentityMatrix
+
+class AllocatingVector(BaseVector):
+    """
+    Reference implementation of the original, allocating vector kernels.
+    """
+    def plus(self, vector):
+        self.data = self.data + vector.data
+
+    def times_scalar(self, value):
+        self.data = value*self.data
+
+    def equals_ax_p_by(self, a, x, b, y):
+        self.data = a*x.data + b*y.data
+
+class AllocatingAllocator(BlockAllocator):
+
+    def _alloc_block(self, size, count, blocks):
+        out = []
+        for i in xrange(count):
+            out.append(AllocatingVector(size))
+        return out
+
+def minor_faults():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+
+def run(allocator, max_iter):
+    solver = UserSolver(allocator=allocator)
+    memory = KonaMemory(solver)
+    factory = memory.primal_factory
+    factory.request_num_vectors(2)
+    out_file = open('/dev/null', 'w')
+    krylov = FGMRES(factory, {
+        'max_iter' : max_iter,
+        'rel_tol' : 1e-14,
+        'check_res' : False,
+        'out_file' : out_file})
+    memory.allocate_memory()
+
+    diag = np.linspace(1., 10., allocator.num_primal)
+
+    def mat_vec(in_vec, out_vec):
+        np.multiply(diag, in_vec._data.data, out=out_vec._data.data)
+
+    b = factory.generate()
+    x = factory.generate()
+    b.equals(1.0)
+    x.equals(0.0)
+    precond = IdentityMatrix().product
+
+    # warm up caches and scratch space
+    krylov.solve(mat_vec, b, x, precond)
+    x.equals(0.0)
+
+    faults = minor_faults()
+    start = time.time()
+    iters, _ = krylov.solve(mat_vec, b, x, precond)
+    elapsed = time.time() - start
+    faults = minor_faults() - faults
+    out_file.close()
+    return iters, float(faults)/iters, elapsed/iters
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    max_iter = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    print('vector size = %i, max_iter = %i'%(size, max_iter))
+    print('%-12s %8s %16s %16s'%(
+        'kernels', 'iters', 'faults/iter', 'sec/iter'))
+    for name, allocator in [
+            ('in-place', BlockAllocator(size, 0, 0)),
+            ('allocating', AllocatingAllocator(size, 0, 0))]:
+        iters, faults, elapsed = run(allocator, max_iter)
+        print('%-12s %8i %16.1f %16.6f'%(name, iters, faults, elapsed))
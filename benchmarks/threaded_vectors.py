@@ -0,0 +1,61 @@
+"""
+Compares the `ThreadedVector` kernels against the single-threaded
+`BaseVector` kernels.
+
+For each vector size, the benchmark times the operations Kona performs
+between user callbacks (inner products, norms, scaled additions and linear
+combinations) and reports the seconds per call for both implementations,
+together with the speed-up. The largest sizes need several GB of memory;
+pass a smaller maximum exponent to skip them.
+
+Usage::
+
+    python benchmarks/threaded_vectors.py [max_exponent] [num_threads]
+"""
+import sys
+import time
+import multiprocessing
+
+import numpy as np
+
+from kona.user import BaseVector, ThreadedVector
+
+def time_call(func, repeat):
+    func()
+    start = time.time()
+    for i in xrange(repeat):
+        func()
+    return (time.time() - start)/repeat
+
+def run(size, num_threads):
+    results = []
+    for cls, kwargs in [
+            (BaseVector, {}),
+            (ThreadedVector, {'num_threads' : num_threads})]:
+        x = cls(size, val=1., **kwargs)
+        y = cls(size, val=2., **kwargs)
+        z = cls(size, val=3., **kwargs)
+        repeat = max(1, 10**7//size)
+        ops = [
+            ('inner', lambda: x.inner(y)),
+            ('infty', lambda: x.infty),
+            ('equals_ax_p_by', lambda: z.equals_ax_p_by(2., x, 3., y)),
+            ('equals_lin_comb', lambda: z.equals_lin_comb(
+                [1., 2., 3.], [x, y, z])),
+            ('times_scalar', lambda: z.times_scalar(1.)),
+        ]
+        results.append([(name, time_call(op, repeat)) for name, op in ops])
+    return zip(results[0], results[1])
+
+if __name__ == '__main__':
+    max_exp = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    num_threads = int(sys.argv[2]) if len(sys.argv) > 2 \
+        else multiprocessing.cpu_count()
+    print('num_threads = %i'%num_threads)
+    print('%-10s %-16s %14s %14s %8s'%(
+        'size', 'operation', 'base sec', 'threaded sec', 'speedup'))
+    for exp in xrange(5, max_exp + 1):
+        size = 10**exp
+        for (name, base), (_, threaded) in run(size, num_threads):
+            print('%-10i %-16s %14.6f %14.6f %8.2f'%(
+                size, name, base, threaded, base/threaded))
@@ -3,8 +3,6 @@ import numpy as np
 
 from kona.options import BadKonaOption, get_opt
 from kona.linalg import current_solution, factor_linear_system, objective_value
-from kona.linalg.vectors.composite import ReducedKKTVector
-from kona.linalg.vectors.composite import CompositePrimalVector
 from kona.linalg.matrices.common import dCdU, dRdU, IdentityMatrix
 from kona.linalg.matrices.hessian import ReducedKKTMatrix
 from kona.linalg.matrices.preconds import NestedKKTPreconditioner
@@ -50,9 +48,11 @@ class ConstrainedRSNK(OptimizationAlgorithm):
         )
 
         # number of vectors required in solve() method
-        self.primal_factory.request_num_vectors(7)
-        self.state_factory.request_num_vectors(3)
-        self.dual_factory.request_num_vectors(14)
+        self.kkt_factory = self.primal_factory._memory.kkt_factory(slack=True)
+        self.kkt_factory.request_num_vectors(6)
+        self.primal_factory.request_num_vectors(1)
+        self.state_factory.request_num_vectors(4)
+        self.dual_factory.request_num_vectors(2)
 
         # get other options
         self.radius = get_opt(optns, 0.5, 'trust', 'init_radius')
@@ -174,11 +174,7 @@ class ConstrainedRSNK(OptimizationAlgorithm):
         )
 
     def _generate_KKT_vector(self):
-        design = self.primal_factory.generate()
-        slack = self.dual_factory.generate()
-        primal = CompositePrimalVector(design, slack)
-        dual = self.dual_factory.generate()
-        return ReducedKKTVector(primal, dual)
+        return self.kkt_factory.generate()
 
     def solve(self):
         self._write_header()
@@ -204,6 +200,7 @@ class ConstrainedRSNK(OptimizationAlgorithm):
         state = self.state_factory.generate()
         state_work = self.state_factory.generate()
         adjoint = self.state_factory.generate()
+        adjoint_work = self.state_factory.generate()
 
         # generate dual vectors
         dual_work = self.dual_factory.generate()
@@ -219,10 +216,12 @@ class ConstrainedRSNK(OptimizationAlgorithm):
         if self.factor_matrices and self.iter < self.max_iter:
             factor_linear_system(X._primal._design, state)
 
-        # perform an adjoint solution for the Lagrangian
+        # perform an adjoint solution for the Lagrangian, which later
+        # solutions start from
+        adjoint.equals(0.0)
         state_work.equals_objective_partial(X._primal._design, state)
-        dCdU(X._primal._design, state).T.product(X._dual, adjoint)
-        state_work.plus(adjoint)
+        dCdU(X._primal._design, state).T.product(X._dual, adjoint_work)
+        state_work.plus(adjoint_work)
         state_work.times(-1.)
         dRdU(X._primal._design, state).T.solve(state_work, adjoint)
 
@@ -362,8 +361,8 @@ class ConstrainedRSNK(OptimizationAlgorithm):
                 old_flag = min_radius_active
                 success, min_radius_active = self.trust_step(
                     X, state, adjoint, P, kkt_rhs, krylov_tol, feas_tol,
-                    primal_work, state_work, dual_work, slack_work,
-                    kkt_work, kkt_save)
+                    primal_work, state_work, adjoint_work, dual_work,
+                    slack_work, kkt_work, kkt_save)
 
                 # watchdog on trust region failures
                 if min_radius_active and old_flag:
@@ -385,8 +384,9 @@ class ConstrainedRSNK(OptimizationAlgorithm):
 
                 # perform an adjoint solution for the Lagrangian
                 state_work.equals_objective_partial(X._primal._design, state)
-                dCdU(X._primal._design, state).T.product(X._dual, adjoint)
-                state_work.plus(adjoint)
+                dCdU(X._primal._design, state).T.product(
+                    X._dual, adjoint_work)
+                state_work.plus(adjoint_work)
                 state_work.times(-1.)
                 dRdU(X._primal._design, state).T.solve(state_work, adjoint)
 
@@ -408,8 +408,8 @@ class ConstrainedRSNK(OptimizationAlgorithm):
             'Total number of nonlinear iterations: %i\n\n'%self.iter)
 
     def trust_step(self, X, state, adjoint, P, kkt_rhs, krylov_tol, feas_tol,
-                   primal_work, state_work, dual_work, slack_work,
-                   kkt_work, kkt_save):
+                   primal_work, state_work, adjoint_work, dual_work,
+                   slack_work, kkt_work, kkt_save):
         # start trust region loop
         max_iter = 6
         iters = 0
@@ -499,9 +499,10 @@ class ConstrainedRSNK(OptimizationAlgorithm):
                 # save the old step
                 kkt_save.equals(X)
 
-                # accept the new step entirely
-                X.plus(P)
-                state.equals_primal_solution(X._primal._design)
+                # accept the new step entirely, along with the state that
+                # was already solved for at the trial point
+                X.equals(kkt_work)
+                state.equals(state_work)
 
                 # if this is a matrix-based problem, tell the solver to factor
                 # some important matrices to be used in the next iteration
@@ -510,8 +511,9 @@ class ConstrainedRSNK(OptimizationAlgorithm):
 
                 # perform an adjoint solution for the Lagrangian
                 state_work.equals_objective_partial(X._primal._design, state)
-                dCdU(X._primal._design, state).T.product(X._dual, adjoint)
-                state_work.plus(adjoint)
+                dCdU(X._primal._design, state).T.product(
+                    X._dual, adjoint_work)
+                state_work.plus(adjoint_work)
                 state_work.times(-1.)
                 dRdU(X._primal._design, state).T.solve(state_work, adjoint)
 
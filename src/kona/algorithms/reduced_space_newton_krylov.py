@@ -117,7 +117,8 @@ class ReducedSpaceNewtonKrylov(OptimizationAlgorithm):
         # set initial design and solve for state
         x.equals_init_design()
         state.equals_primal_solution(x)
-        # solve for adjoint
+        # solve for adjoint, later solutions start from the previous one
+        adjoint.equals(0.0)
         adjoint.equals_adjoint_solution(x, state, state_work)
         # get objective value
         obj = objective_value(x, state)
@@ -175,8 +176,11 @@ class ReducedSpaceNewtonKrylov(OptimizationAlgorithm):
             self.krylov.rel_tol = krylov_tol
             self.krylov.radius = self.radius
             self.hessian.linearize(x, state, adjoint)
-            pred, active = self.krylov.solve(
-                self.hessian.product, dJdX, p, self.precond)
+            if self.hessian.dense:
+                pred, active = self.hessian.solve_dense(dJdX, p, self.radius)
+            else:
+                pred, active = self.krylov.solve(
+                    self.hessian.product, dJdX, p, self.precond)
             dJdX.times(-1.0)
             x.plus(p)
 
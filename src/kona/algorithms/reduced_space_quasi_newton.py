@@ -88,6 +88,7 @@ class ReducedSpaceQuasiNewton(OptimizationAlgorithm):
         # initialize values into some vectors
         x.equals_init_design()
         initial_design.equals(x)
+        adjoint.equals(0.0)
         # start optimization outer iterations
         self.iter = 0
         converged = False
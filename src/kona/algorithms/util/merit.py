@@ -133,6 +133,8 @@ class ObjectiveMerit(MeritFunction):
             self.primal_work = self.primal_factory.generate()
             self.state_work = self.state_factory.generate()
             self.adjoint_work = self.state_factory.generate()
+            # adjoint solutions start from the previous trial point's
+            self.adjoint_work.equals(0.0)
             self._allocated = True
         # store information for the new point the merit function is reset at
         self.search_dir = search_dir
@@ -82,7 +82,7 @@ class Verifier(object):
             num_state = max(num_state, 4)
         if self.optns['lin_solve']:
             num_primal = max(num_primal, 1)
-            num_state = max(num_state, 5)
+            num_state = max(num_state, 7)
         self.primal_factory.request_num_vectors(num_primal)
         self.state_factory.request_num_vectors(num_state)
         if self.optns['dual_vec']:
@@ -128,6 +128,10 @@ class Verifier(object):
                 'multiply_dRdU'         : None,
                 'multiply_dRdX_T'       : None,
                 'multiply_dRdU_T'       : None,
+                'multiply_dRdX_block'   : None,
+                'multiply_dRdX_T_block' : None,
+                'multiply_dRdU_block'   : None,
+                'multiply_dRdU_T_block' : None,
             },
             # UserSolver constraint jacobian operations
             'cnstr_jac' : {
@@ -135,10 +139,15 @@ class Verifier(object):
                 'multiply_dCdU'         : None,
                 'multiply_dCdX_T'       : None,
                 'multiply_dCdU_T'       : None,
+                'multiply_dCdX_block'   : None,
+                'multiply_dCdX_T_block' : None,
+                'multiply_dCdU_block'   : None,
+                'multiply_dCdU_T_block' : None,
             },
             # UserSolver forward and reverse linear solves
             'lin_solve' : {
                 'solve_linear'          : None,
+                'solve_linear_block'    : None,
             },
             'red_grad' : {
                 'solve_adjoint'         : None,
@@ -504,6 +513,22 @@ class Verifier(object):
                     'WARNING: Fix multiply_dRdU() and check this test again!\n'
                 )
 
+        # sweep the jacobians over the test directions and the linearization
+        # point in single block products
+        x_p = self.primal_factory.generate()
+        self._verify_block_product(
+            dRdX(u_p, u_s), [z_p, u_p], [v_s, w_s], y_s,
+            'pde_jac', 'multiply_dRdX_block')
+        self._verify_block_product(
+            dRdX(u_p, u_s).T, [z_s, u_s], [v_p, w_p], x_p,
+            'pde_jac', 'multiply_dRdX_T_block')
+        self._verify_block_product(
+            dRdU(u_p, u_s), [z_s, u_s], [v_s, w_s], y_s,
+            'pde_jac', 'multiply_dRdU_block')
+        self._verify_block_product(
+            dRdU(u_p, u_s).T, [z_s, u_s], [v_s, w_s], y_s,
+            'pde_jac', 'multiply_dRdU_T_block')
+
     def _verify_cnstr_jac(self):
         if not self.optns['cnstr_jac']:
             return
@@ -649,6 +674,51 @@ class Verifier(object):
                     'WARNING: Fix multiply_dCdU() and check this test again!\n'
                 )
 
+        # sweep the jacobians over the test directions and the linearization
+        # point in single block products
+        self._verify_block_product(
+            dCdX(u_p, u_s), [z_p, u_p], [v_d, y_d], x_d,
+            'cnstr_jac', 'multiply_dCdX_block')
+        x_d.equals_constraints(u_p, u_s)
+        self._verify_block_product(
+            dCdX(u_p, u_s).T, [z_d, x_d], [v_p, w_p], z_p,
+            'cnstr_jac', 'multiply_dCdX_T_block')
+        self._verify_block_product(
+            dCdU(u_p, u_s), [z_s, u_s], [v_d, y_d], x_d,
+            'cnstr_jac', 'multiply_dCdU_block')
+        x_d.equals_constraints(u_p, u_s)
+        self._verify_block_product(
+            dCdU(u_p, u_s).T, [z_d, x_d], [v_s, w_s], z_s,
+            'cnstr_jac', 'multiply_dCdU_T_block')
+
+    def _verify_block_product(self, matrix, in_vecs, out_vecs, work,
+                              op_name, function):
+        for out_vec in out_vecs:
+            out_vec.equals(1./EPS)
+        matrix.product_block(in_vecs, out_vecs)
+
+        # compare each block result against the single product
+        error = 0.
+        for in_vec, out_vec in zip(in_vecs, out_vecs):
+            work.equals(1./EPS)
+            matrix.product(in_vec, work)
+            prod_norm = work.norm2
+            work.minus(out_vec)
+            error = max(error, work.norm2/(prod_norm + EPS))
+
+        self.out_stream.write(
+            '============================================================\n' +
+            'Block product test: %s\n'%function +
+            '   number of vectors    : %i\n'%len(in_vecs) +
+            '   max relative error   : %e\n'%error
+        )
+
+        if error > 1e3*EPS:
+            self.failures[op_name][function] = True
+            self.out_stream.write(
+                'WARNING: %s() may be inaccurate!\n'%function
+            )
+
     def _verify_red_grad(self):
         if not self.optns['red_grad']:
             return
@@ -667,6 +737,7 @@ class Verifier(object):
             factor_linear_system(u_p, u_s)
         J = objective_value(u_p, u_s)
 
+        v_s.equals(0.0)
         v_s.equals_adjoint_solution(u_p, u_s, w_s)
         v_p.equals_total_gradient(u_p, u_s, v_s, w_p)
         z_p.equals(1.0)
@@ -720,6 +791,8 @@ class Verifier(object):
         u = self.state_factory.generate()
         v = self.state_factory.generate()
         w = self.state_factory.generate()
+        x = self.state_factory.generate()
+        y = self.state_factory.generate()
         z = self.state_factory.generate()
 
         primal.equals_init_design()
@@ -731,6 +804,10 @@ class Verifier(object):
         v.equals(1.0)
         rel_tol = 1e-8
 
+        # solutions start from zero, since they carry the initial guess
+        w.equals(0.0)
+        z.equals(0.0)
+
         dRdU(primal, primal_sol).solve(u, w, rel_tol)
         forward = v.inner(w)
         dRdU(primal, primal_sol).T.solve(v, z, rel_tol)
@@ -754,3 +831,31 @@ class Verifier(object):
                 self.out_stream.write(
                     'WARNING: Fix solve_adjoint() and check this test again!\n'
                 )
+
+        # repeat the test with the ones vector and the state solution as
+        # right hand sides, solved together in block solutions
+        rhs_vecs = [u, primal_sol]
+        for sol in [w, x, y, z]:
+            sol.equals(0.0)
+        dRdU(primal, primal_sol).solve_block(rhs_vecs, [w, x], rel_tol)
+        dRdU(primal, primal_sol).T.solve_block(rhs_vecs, [y, z], rel_tol)
+        max_error = 0.
+        for i, fwd_sol in enumerate([w, x]):
+            for j, rev_sol in enumerate([y, z]):
+                forward = rhs_vecs[j].inner(fwd_sol)
+                reverse = rhs_vecs[i].inner(rev_sol)
+                max_error = max(
+                    max_error, abs(forward - reverse)/(abs(forward) + EPS))
+
+        self.out_stream.write(
+            '============================================================\n' +
+            'Block linear solve test: dR/dU * [w, x] = [1, u] \n' +
+            '   max relative error   : %e\n'%max_error
+        )
+
+        if max_error > 10.0*rel_tol:
+            self.failures['lin_solve']['solve_linear_block'] = True
+            self.out_stream.write(
+                'WARNING: solve_linear_block() or solve_adjoint_block() ' +
+                'may be inaccurate!\n'
+            )
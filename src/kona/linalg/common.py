@@ -18,7 +18,12 @@ def current_solution(curr_design, curr_state=None, curr_adj=None,
         Current iteration of the optimization.
     """
 
-    solver = curr_design._memory.solver
+    memory = curr_design._memory
+    if num_iter is not None:
+        for profiler in memory.profilers:
+            profiler.next_iteration(num_iter)
+
+    solver = memory.solver
     curr_design = curr_design._data
 
     if curr_state is not None:
@@ -37,6 +42,9 @@ def objective_value(at_design, at_state):
     """
     Evaluate the objective value the given Primal and State point.
 
+    Repeated evaluations at unchanged points are answered from the memory
+    manager's `EvaluationCache`.
+
     Parameters
     ----------
     at_design : PrimalVector
@@ -56,16 +64,23 @@ def objective_value(at_design, at_state):
         raise MemoryError('objective_value() >> Primal and State ' +
                           'vectors are not on the same memory manager!')
 
+    cache = at_design._memory.eval_cache
+    value = cache.get_objective(at_design, at_state)
+    if value is not None:
+        return value
+
     result = solver.eval_obj(at_design._data, at_state._data)
 
     if isinstance(result, tuple):
         at_design._memory.cost += result[1]
-        return result[0]
+        value = result[0]
     elif isinstance(result, float):
-        return result
+        value = result
     else:
         raise TypeError('objective_value() >> solver.eval_obj() expected 2-tuple or float ' +
                         'but was given %s'%type(result))
+    cache.put_objective(at_design, at_state, value)
+    return value
 
 def factor_linear_system(at_design, at_state):
     """
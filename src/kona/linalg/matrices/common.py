@@ -1,3 +1,5 @@
+from kona.user import UserSolver
+
 
 class KonaMatrix(object):
     """
@@ -39,6 +41,19 @@ class KonaMatrix(object):
             raise RuntimeError('KonaMatrix.product() >> ' +
                                'Matrix must be linearized first!')
 
+    def _set_linearization(self):
+        # only notify the solver when the evaluation point has changed
+        key = (self._primal._version, self._state._version)
+        if key != self._memory.linearization_key:
+            self._memory.linearization_key = key
+            self._solver.set_linearization(
+                self._primal._data, self._state._data, key)
+
+    def _check_block(self, in_vecs, out_vecs):
+        if len(in_vecs) != len(out_vecs):
+            raise ValueError('KonaMatrix.product_block() >> ' +
+                             'Number of input and output vectors must match!')
+
     def linearize(self, primal, state):
         """
         Store the vector points around which a non-linear matrix should be
@@ -74,6 +89,29 @@ class KonaMatrix(object):
         """
         raise NotImplementedError
 
+    def product_block(self, in_vecs, out_vecs):
+        """
+        Performs several matrix-vector products at the internally stored
+        linearization. The product with ``in_vecs[i]`` is stored in
+        ``out_vecs[i]``.
+
+        Jacobian matrices hand the whole block to the user solver in a single
+        call, so that solvers can share the cost of the products. Other
+        matrices evaluate the products one at a time.
+
+        Parameters
+        ----------
+        in_vecs : list of KonaVector
+        out_vecs : list of KonaVector
+
+        Returns
+        -------
+        out_vecs : list of KonaVector
+        """
+        self._check_block(in_vecs, out_vecs)
+        for in_vec, out_vec in zip(in_vecs, out_vecs):
+            self.product(in_vec, out_vec)
+
     @property
     def T(self):
         """
@@ -91,6 +129,7 @@ class dRdX(KonaMatrix):
     """
     def product(self, in_vec, out_vec):
         self._check_linearization()
+        self._set_linearization()
         if not self._transposed:
             # self._check_type(in_vec, PrimalVector)
             # self._check_type(out_vec, StateVector)
@@ -103,6 +142,22 @@ class dRdX(KonaMatrix):
             self._solver.multiply_dRdX_T(
                 self._primal._data, self._state._data,
                 in_vec._data, out_vec._data)
+        out_vec._modified()
+
+    def product_block(self, in_vecs, out_vecs):
+        self._check_linearization()
+        self._set_linearization()
+        self._check_block(in_vecs, out_vecs)
+        in_data = [in_vec._data for in_vec in in_vecs]
+        out_data = [out_vec._data for out_vec in out_vecs]
+        if not self._transposed:
+            self._solver.multiply_dRdX_block(
+                self._primal._data, self._state._data, in_data, out_data)
+        else:
+            self._solver.multiply_dRdX_T_block(
+                self._primal._data, self._state._data, in_data, out_data)
+        for out_vec in out_vecs:
+            out_vec._modified()
 
 class dRdU(KonaMatrix):
     """
@@ -110,6 +165,7 @@ class dRdU(KonaMatrix):
     """
     def product(self, in_vec, out_vec):
         self._check_linearization()
+        self._set_linearization()
         # self._check_type(in_vec, StateVector)
         # self._check_type(out_vec, StateVector)
         if not self._transposed:
@@ -120,6 +176,22 @@ class dRdU(KonaMatrix):
             self._solver.multiply_dRdU_T(
                 self._primal._data, self._state._data,
                 in_vec._data, out_vec._data)
+        out_vec._modified()
+
+    def product_block(self, in_vecs, out_vecs):
+        self._check_linearization()
+        self._set_linearization()
+        self._check_block(in_vecs, out_vecs)
+        in_data = [in_vec._data for in_vec in in_vecs]
+        out_data = [out_vec._data for out_vec in out_vecs]
+        if not self._transposed:
+            self._solver.multiply_dRdU_block(
+                self._primal._data, self._state._data, in_data, out_data)
+        else:
+            self._solver.multiply_dRdU_T_block(
+                self._primal._data, self._state._data, in_data, out_data)
+        for out_vec in out_vecs:
+            out_vec._modified()
 
     def solve(self, rhs_vec, solution, rel_tol=1e-8):
         """
@@ -135,13 +207,15 @@ class dRdU(KonaMatrix):
         rel_tol : float
             Solution tolerance.
         solution : StateVector
-            Vector where the result should be stored.
+            Vector where the result should be stored. Its contents on entry
+            are passed to the user solver as the initial guess.
 
         Returns
         -------
         solution : StateVector
         """
         self._check_linearization()
+        self._set_linearization()
         # self._check_type(solution, StateVector)
         # self._check_type(rhs_vec, StateVector)
         if not self._transposed:
@@ -153,9 +227,53 @@ class dRdU(KonaMatrix):
                 self._primal._data, self._state._data,
                 rhs_vec._data, rel_tol, solution._data)
 
+        solution._modified()
+        self._memory.cost += cost
+
+    def solve_block(self, rhs_vecs, solutions, rel_tol=1e-8):
+        """
+        Performs linear solutions for several right hand sides at the
+        internally stored linearization, in a single call to the user solver.
+
+        This is the entry point for grouping independent solves that share a
+        linearization. If the transposed matrix object is used, this function
+        performs adjoint solutions.
+
+        Parameters
+        ----------
+        rhs_vecs : list of StateVector
+            Right hand side vectors for the solutions.
+        solutions : list of StateVector
+            Vectors where the results should be stored. Their contents on
+            entry are passed to the user solver as initial guesses.
+        rel_tol : float
+            Solution tolerance.
+
+        Returns
+        -------
+        solutions : list of StateVector
+        """
+        self._check_linearization()
+        self._set_linearization()
+        self._check_block(rhs_vecs, solutions)
+        rhs_data = [rhs_vec._data for rhs_vec in rhs_vecs]
+        sol_data = [solution._data for solution in solutions]
+        if not self._transposed:
+            cost = self._solver.solve_linear_block(
+                self._primal._data, self._state._data,
+                rhs_data, rel_tol, sol_data)
+        else:
+            cost = self._solver.solve_adjoint_block(
+                self._primal._data, self._state._data,
+                rhs_data, rel_tol, sol_data)
+
+        for solution in solutions:
+            solution._modified()
         self._memory.cost += cost
 
     def precond(self, in_vec, out_vec):
+        self._check_linearization()
+        self._set_linearization()
         if not self._transposed:
             self._solver.apply_precond(
                 self._primal._data, self._state._data,
@@ -165,6 +283,7 @@ class dRdU(KonaMatrix):
                 self._primal._data, self._state._data,
                 in_vec._data, out_vec._data)
 
+        out_vec._modified()
         self._memory.cost += 1
 
 class dCdX(KonaMatrix):
@@ -173,6 +292,7 @@ class dCdX(KonaMatrix):
     """
     def product(self, in_vec, out_vec):
         self._check_linearization()
+        self._set_linearization()
         if not self._transposed:
             # self._check_type(in_vec, PrimalVector)
             # self._check_type(out_vec, DualVector)
@@ -185,6 +305,22 @@ class dCdX(KonaMatrix):
             self._solver.multiply_dCdX_T(
                 self._primal._data, self._state._data,
                 in_vec._data, out_vec._data)
+        out_vec._modified()
+
+    def product_block(self, in_vecs, out_vecs):
+        self._check_linearization()
+        self._set_linearization()
+        self._check_block(in_vecs, out_vecs)
+        in_data = [in_vec._data for in_vec in in_vecs]
+        out_data = [out_vec._data for out_vec in out_vecs]
+        if not self._transposed:
+            self._solver.multiply_dCdX_block(
+                self._primal._data, self._state._data, in_data, out_data)
+        else:
+            self._solver.multiply_dCdX_T_block(
+                self._primal._data, self._state._data, in_data, out_data)
+        for out_vec in out_vecs:
+            out_vec._modified()
 
 class dCdU(KonaMatrix):
     """
@@ -192,6 +328,7 @@ class dCdU(KonaMatrix):
     """
     def product(self, in_vec, out_vec):
         self._check_linearization()
+        self._set_linearization()
         if not self._transposed:
             # self._check_type(in_vec, StateVector)
             # self._check_type(out_vec, DualVector)
@@ -204,6 +341,132 @@ class dCdU(KonaMatrix):
             self._solver.multiply_dCdU_T(
                 self._primal._data, self._state._data,
                 in_vec._data, out_vec._data)
+        out_vec._modified()
+
+    def product_block(self, in_vecs, out_vecs):
+        self._check_linearization()
+        self._set_linearization()
+        self._check_block(in_vecs, out_vecs)
+        in_data = [in_vec._data for in_vec in in_vecs]
+        out_data = [out_vec._data for out_vec in out_vecs]
+        if not self._transposed:
+            self._solver.multiply_dCdU_block(
+                self._primal._data, self._state._data, in_data, out_data)
+        else:
+            self._solver.multiply_dCdU_T_block(
+                self._primal._data, self._state._data, in_data, out_data)
+        for out_vec in out_vecs:
+            out_vec._modified()
+
+class LagrangianMatrix(KonaMatrix):
+    """
+    Base class for second derivatives of the Lagrangian,
+
+    .. math::
+
+        L = F(x, u) + \\psi^T R(x, u) + \\lambda^T C(x, u)
+
+    These matrices are linearized at adjoint and Lagrange multiplier points,
+    in addition to the design and state points. The multipliers are None for
+    unconstrained problems.
+
+    The products are evaluated by the user solver's optional
+    ``multiply_d2L*`` methods. Check `has_lagrangian_hessian` before using
+    these matrices.
+
+    Parameters
+    ----------
+    primal : PrimalVector
+    state : StateVector
+    adjoint : StateVector
+    dual : DualVector, optional
+    transposed : boolean, optional
+    """
+    def __init__(self, primal=None, state=None, adjoint=None, dual=None,
+                 transposed=False):
+        super(LagrangianMatrix, self).__init__(transposed=transposed)
+        if primal is not None and state is not None and adjoint is not None:
+            self.linearize(primal, state, adjoint, dual)
+
+    def linearize(self, primal, state, adjoint, dual=None):
+        """
+        Store the vector points around which the matrix should be
+        linearized.
+
+        Parameters
+        ----------
+        primal : PrimalVector
+        state : StateVector
+        adjoint : StateVector
+        dual : DualVector, optional
+        """
+        super(LagrangianMatrix, self).linearize(primal, state)
+        self._adjoint = adjoint
+        self._dual = dual
+
+    def _multiply(self, name, in_vec, out_vec):
+        self._check_linearization()
+        self._set_linearization()
+        if self._dual is None:
+            dual = None
+        else:
+            dual = self._dual._data
+        getattr(self._solver, name)(
+            self._primal._data, self._state._data, self._adjoint._data, dual,
+            in_vec._data, out_vec._data)
+        out_vec._modified()
+
+    @property
+    def T(self):
+        return self.__class__(
+            self._primal, self._state, self._adjoint, self._dual, True)
+
+class d2LdX2(LagrangianMatrix):
+    """
+    Second derivative of the Lagrangian with respect to primal variables.
+    """
+    def product(self, in_vec, out_vec):
+        self._multiply('multiply_d2LdX2', in_vec, out_vec)
+
+class d2LdXdU(LagrangianMatrix):
+    """
+    Mixed second derivative of the Lagrangian, mapping state vectors to
+    primal vectors. The transposed matrix maps primal vectors to state
+    vectors.
+    """
+    def product(self, in_vec, out_vec):
+        if not self._transposed:
+            self._multiply('multiply_d2LdXdU', in_vec, out_vec)
+        else:
+            self._multiply('multiply_d2LdXdU_T', in_vec, out_vec)
+
+class d2LdU2(LagrangianMatrix):
+    """
+    Second derivative of the Lagrangian with respect to state variables.
+    """
+    def product(self, in_vec, out_vec):
+        self._multiply('multiply_d2LdU2', in_vec, out_vec)
+
+def has_lagrangian_hessian(solver):
+    """
+    Checks whether the user solver implements all of the optional Lagrangian
+    second derivative products.
+
+    Parameters
+    ----------
+    solver : UserSolver
+
+    Returns
+    -------
+    boolean
+    """
+    for name in ['multiply_d2LdX2', 'multiply_d2LdXdU', 'multiply_d2LdXdU_T',
+                 'multiply_d2LdU2']:
+        method = getattr(type(solver), name, None)
+        if method is None or \
+                method.__func__ is getattr(UserSolver, name).__func__:
+            return False
+    return True
 
 class IdentityMatrix(KonaMatrix):
     """
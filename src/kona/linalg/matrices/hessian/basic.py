@@ -1,5 +1,7 @@
 import sys
 
+import numpy as np
+
 from kona.options import get_opt
 
 class BaseHessian(object):
@@ -94,3 +96,173 @@ class QuasiNewtonApprox(BaseHessian):
             Difference between subsequent gradients.
         """
         raise NotImplementedError # pragma: no cover
+
+class AdjointPredictor(object):
+    """
+    Initial guesses for the 2nd order adjoints of Hessian-vector products.
+
+    At a fixed linearization, the 2nd order adjoints of a Hessian-vector
+    product depend linearly on the vector being multiplied. The predictor
+    stores up to ``max_stored`` previous input vectors together with their
+    adjoints. The adjoints of a new product are predicted from the
+    least-squares projection of its input vector onto the stored ones, and
+    handed to the user solver as the initial guess of its linear solves.
+    Stored products are discarded whenever the Hessian is linearized at a
+    new point.
+
+    Input vectors may consist of several components (e.g.: the design and
+    dual parts of a KKT vector), whose inner products are summed.
+
+    Parameters
+    ----------
+    max_stored : int
+        Maximum number of stored products. Zero turns the predictor off, and
+        all initial guesses are zero.
+    input_factories : list of VectorFactory
+        Factories for the components of the input vectors.
+    state_factory : VectorFactory
+        Factory for the adjoint vectors.
+    num_adjoints : int
+        Number of adjoints per product.
+    num_pending : int, optional
+        Maximum number of products recorded before they are committed.
+
+    Attributes
+    ----------
+    max_stored : int
+        Maximum number of stored products.
+    """
+
+    def __init__(self, max_stored, input_factories, state_factory,
+                 num_adjoints, num_pending=1):
+        self.max_stored = max_stored
+        self._input_factories = input_factories
+        self._state_factory = state_factory
+        self._num_adjoints = num_adjoints
+        self._stored = []
+        self._pending = []
+        self._spare = []
+        self._gram = np.zeros((0, 0))
+        if max_stored > 0:
+            num_entries = max_stored + num_pending
+            for factory in input_factories:
+                factory.request_num_vectors(num_entries)
+            state_factory.request_num_vectors(num_adjoints*num_entries)
+
+    def _new_entry(self):
+        if len(self._spare) > 0:
+            return self._spare.pop()
+        inputs = [factory.generate() for factory in self._input_factories]
+        adjoints = [self._state_factory.generate()
+                    for i in xrange(self._num_adjoints)]
+        return (inputs, adjoints)
+
+    def _inner_many(self, inputs, entries):
+        prods = np.zeros(len(entries))
+        for k, vec in enumerate(inputs):
+            prods += vec.inner_many([entry[0][k] for entry in entries])
+        return prods
+
+    def reset(self):
+        """
+        Discards all stored and pending products.
+        """
+        self._spare.extend(self._stored + self._pending)
+        self._stored = []
+        self._pending = []
+        self._gram = np.zeros((0, 0))
+
+    def coefficients(self, inputs):
+        """
+        Projects an input vector onto the stored input vectors.
+
+        Parameters
+        ----------
+        inputs : list of KonaVector
+            Components of the input vector.
+
+        Returns
+        -------
+        numpy.ndarray
+            Coefficients of the stored products in the prediction.
+        """
+        if len(self._stored) == 0:
+            return np.zeros(0)
+        rhs = self._inner_many(inputs, self._stored)
+        return np.linalg.lstsq(self._gram, rhs, rcond=1e-10)[0]
+
+    def predict(self, coeffs, index, adjoint):
+        """
+        Predicts one adjoint of a product from the stored adjoints.
+
+        Parameters
+        ----------
+        coeffs : numpy.ndarray
+            Coefficients returned by ``coefficients()``.
+        index : int
+            Index of the adjoint within a product.
+        adjoint : StateVector
+            Location where the prediction is stored.
+        """
+        if len(coeffs) == 0:
+            adjoint.equals(0.0)
+        else:
+            adjoint.equals_lin_comb(
+                coeffs, [entry[1][index] for entry in self._stored])
+
+    def record(self, inputs):
+        """
+        Records the input vector of a new product. The product is only used
+        for predictions after ``commit()``.
+
+        Parameters
+        ----------
+        inputs : list of KonaVector
+            Components of the input vector.
+
+        Returns
+        -------
+        int or None
+            Handle of the product for ``save()``.
+        """
+        if self.max_stored == 0:
+            return None
+        entry = self._new_entry()
+        for vec, copy in zip(inputs, entry[0]):
+            copy.equals(vec)
+        self._pending.append(entry)
+        return len(self._pending) - 1
+
+    def save(self, handle, index, adjoint):
+        """
+        Saves one adjoint of a recorded product.
+
+        Parameters
+        ----------
+        handle : int or None
+            Handle returned by ``record()``.
+        index : int
+            Index of the adjoint within a product.
+        adjoint : StateVector
+            Adjoint to be saved.
+        """
+        if handle is not None:
+            self._pending[handle][1][index].equals(adjoint)
+
+    def commit(self):
+        """
+        Makes the recorded products available for predictions, discarding
+        the oldest stored products if necessary.
+        """
+        for entry in self._pending:
+            if len(self._stored) == self.max_stored:
+                self._spare.append(self._stored.pop(0))
+                self._gram = self._gram[1:, 1:]
+            row = self._inner_many(entry[0], self._stored + [entry])
+            gram = np.empty((len(row), len(row)))
+            gram[:-1, :-1] = self._gram
+            gram[-1, :] = row
+            gram[:, -1] = row
+            self._gram = gram
+            self._stored.append(entry)
+        self._pending = []
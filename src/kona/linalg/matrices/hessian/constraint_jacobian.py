@@ -1,4 +1,5 @@
 
+from kona.options import get_opt
 from kona.linalg.vectors.common import PrimalVector, StateVector, DualVector
 from kona.linalg.matrices.common import dRdX, dRdU, dCdX, dCdU
 from kona.linalg.matrices.hessian.basic import BaseHessian
@@ -21,6 +22,9 @@ class TotalConstraintJacobian(BaseHessian):
         Transposed matrix.
     approx : TotalConstraintJacobian
         Approximate/inexact matrix.
+    block_size : int
+        Maximum number of products whose 2nd order adjoints are solved
+        together in `product_block`.
     """
     def __init__(self, vector_factories, optns={}):
         super(TotalConstraintJacobian, self).__init__(vector_factories, optns)
@@ -38,8 +42,9 @@ class TotalConstraintJacobian(BaseHessian):
                 self.dual_factory = factory
 
         # request vector allocation
+        self.block_size = get_opt(optns, 1, 'block_size')
         self.primal_factory.request_num_vectors(1)
-        self.state_factory.request_num_vectors(2)
+        self.state_factory.request_num_vectors(2*self.block_size)
         self.dual_factory.request_num_vectors(1)
 
         # set misc settings
@@ -67,8 +72,11 @@ class TotalConstraintJacobian(BaseHessian):
         # if this is the first linearization, produce some work vectors
         if not self._allocated:
             self.design_work = self.primal_factory.generate()
-            self.state_work = self.state_factory.generate()
-            self.adjoint = self.state_factory.generate()
+            self.state_work = []
+            self.adjoint = []
+            for i in xrange(self.block_size):
+                self.state_work.append(self.state_factory.generate())
+                self.adjoint.append(self.state_factory.generate())
             self.dual_work = self.dual_factory.generate()
             self._allocated = True
 
@@ -85,81 +93,111 @@ class TotalConstraintJacobian(BaseHessian):
         self.use_target = True
 
     def product(self, in_vec, out_vec):
+        self.product_block([in_vec], [out_vec])
+
+    def product_block(self, in_vecs, out_vecs):
+        """
+        Matrix-vector products for several vectors at the same linearization.
+
+        The products are processed in groups of up to ``block_size`` vectors,
+        and the 2nd order adjoints of each group are solved with one block
+        solve.
+
+        Parameters
+        ----------
+        in_vecs : list of PrimalVector
+            Vectors to be multiplied with the matrix.
+        out_vecs : list of PrimalVector
+            Results of the operation.
+        """
         if not self.use_design and not self.use_target:
             raise RuntimeError(
                 'Both design and target components are set to false')
+        if len(in_vecs) != len(out_vecs):
+            raise ValueError('TotalConstraintJacobian.product_block() >> ' +
+                             'Number of input and output vectors must match!')
 
+        for i in xrange(0, len(in_vecs), self.block_size):
+            self._product_group(
+                in_vecs[i:i+self.block_size], out_vecs[i:i+self.block_size])
+
+        # reset the approx and transpose flags at the end
+        self._approx = False
+        self._transposed = False
+
+    def _solve_adjoints(self, matrix, rhs_vecs, adjoints):
+        for adjoint in adjoints:
+            adjoint.equals(0.0)
+        if self._approx:
+            # if this is approximate, use PDE preconditioner
+            for rhs_vec, adjoint in zip(rhs_vecs, adjoints):
+                matrix.precond(rhs_vec, adjoint)
+        else:
+            # otherwise perform full adjoint solutions
+            rel_tol = 1e-4
+            matrix.solve_block(rhs_vecs, adjoints, rel_tol)
+
+    def _product_group(self, in_vecs, out_vecs):
         # do some aliasing to make the code look pretty
         at_design = self.at_design
         at_state = self.at_state
         design_work = self.design_work
-        state_work = self.state_work
+        state_work = self.state_work[:len(in_vecs)]
         dual_work = self.dual_work
-        adjoint = self.adjoint
+        adjoint = self.adjoint[:len(in_vecs)]
 
         # compute out = A^T * (in)_(target subspace)
         if self._transposed:
-            # convert input vector's target subspace into a dual vector
-            dual_work.convert(in_vec)
+            for in_vec, out_vec, rhs in zip(in_vecs, out_vecs, state_work):
+                # convert input vector's target subspace into a dual vector
+                dual_work.convert(in_vec)
 
-            # compute (dC/dX)^T * dual_work and add to output vector
-            dCdX(at_design, at_state).T.product(dual_work, design_work)
-            out_vec.plus(design_work)
+                # compute (dC/dX)^T * dual_work and add to output vector
+                dCdX(at_design, at_state).T.product(dual_work, design_work)
+                out_vec.plus(design_work)
 
-            # build RHS for adjoint system
-            dCdU(at_design, at_state).T.product(dual_work, state_work)
-            state_work.times(-1)
+                # build RHS for adjoint system
+                dCdU(at_design, at_state).T.product(dual_work, rhs)
+                rhs.times(-1)
 
-            # solve 2nd order adjoint
-            adjoint.equals(0.0)
-            if self._approx:
-                # if this is approximate, use PDE preconditioner
-                dRdU(at_design, at_state).T.precond(state_work, adjoint)
-            else:
-                # otherwise perform a full adjoint solution
-                rel_tol = 1e-4
-                dRdU(at_design, at_state).T.solve(state_work, adjoint, rel_tol)
-
-            # apply lambda adjoint to design part of the Jacobian
-            dRdX(at_design, at_state).T.product(adjoint, design_work)
-            out_vec.plus(design_work)
-
-            # restrict if necessary
-            if self.use_design and not self.use_target:
-                out_vec.restrict_to_design()
-            if not self.use_design and self.use_target:
-                out_vec.restrict_to_target()
+            # solve 2nd order adjoints
+            self._solve_adjoints(
+                dRdU(at_design, at_state).T, state_work, adjoint)
 
-        # compute (out)_(target subspace) = A * in
-        else:
-            # restrict if necessary
-            design_work.equals(in_vec)
-            if self.use_design and not self.use_target:
-                design_work.restrict_to_design()
-            if not self.use_design and self.use_target:
-                design_work.restrict_to_target()
-
-            # compute (dC/dX) * in
-            dCdX(at_design, at_state).product(design_work, dual_work)
-            out_vec.convert(dual_work)
-
-            # build RHS for adjoint system
-            dRdX(at_design, at_state).product(design_work, state_work)
-            state_work.times(-1)
-
-            # solve second order adjoint
-            adjoint.equals(0.0)
-            if self._approx:
-                dRdU(at_design, at_state).precond(state_work, adjoint)
-            else:
-                rel_tol = 1e-4
-                dRdU(at_design, at_state).solve(state_work, adjoint, rel_tol)
+            for out_vec, adj in zip(out_vecs, adjoint):
+                # apply lambda adjoint to design part of the Jacobian
+                dRdX(at_design, at_state).T.product(adj, design_work)
+                out_vec.plus(design_work)
 
-            # finish the dual part of the KKT matrix vector product
-            dCdU(at_design, at_state).T.product(adjoint, dual_work)
-            design_work.convert(dual_work)
-            out_vec.plus(design_work)
+                # restrict if necessary
+                if self.use_design and not self.use_target:
+                    out_vec.restrict_to_design()
+                if not self.use_design and self.use_target:
+                    out_vec.restrict_to_target()
 
-        # reset the approx and transpose flags at the end
-        self._approx = False
-        self._transposed = False
+        # compute (out)_(target subspace) = A * in
+        else:
+            for in_vec, out_vec, rhs in zip(in_vecs, out_vecs, state_work):
+                # restrict if necessary
+                design_work.equals(in_vec)
+                if self.use_design and not self.use_target:
+                    design_work.restrict_to_design()
+                if not self.use_design and self.use_target:
+                    design_work.restrict_to_target()
+
+                # compute (dC/dX) * in
+                dCdX(at_design, at_state).product(design_work, dual_work)
+                out_vec.convert(dual_work)
+
+                # build RHS for adjoint system
+                dRdX(at_design, at_state).product(design_work, rhs)
+                rhs.times(-1)
+
+            # solve second order adjoints
+            self._solve_adjoints(dRdU(at_design, at_state), state_work, adjoint)
+
+            for out_vec, adj in zip(out_vecs, adjoint):
+                # finish the dual part of the KKT matrix vector product
+                dCdU(at_design, at_state).T.product(adj, dual_work)
+                design_work.convert(dual_work)
+                out_vec.plus(design_work)
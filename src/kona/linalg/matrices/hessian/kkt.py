@@ -3,7 +3,10 @@ from kona.linalg.vectors.common import PrimalVector, StateVector, DualVector
 from kona.linalg.vectors.composite import ReducedKKTVector
 from kona.linalg.vectors.composite import CompositePrimalVector
 from kona.linalg.matrices.common import dRdX, dRdU, dCdX, dCdU
+from kona.linalg.matrices.common import d2LdX2, d2LdXdU, d2LdU2
+from kona.linalg.matrices.common import has_lagrangian_hessian
 from kona.linalg.matrices.hessian.basic import BaseHessian, QuasiNewtonApprox
+from kona.linalg.matrices.hessian.basic import AdjointPredictor
 from kona.linalg.solvers.krylov.basic import KrylovSolver
 from kona.linalg.solvers.util import calc_epsilon, EPS
 
@@ -60,6 +63,14 @@ class ReducedKKTMatrix(BaseHessian):
         A krylov solver object used to solve the system defined by this matrix.
     dRdX, dRdU, dCdX, dCdU : KonaMatrix
         Various abstract jacobians used in calculating the mat-vec product.
+    predictor : AdjointPredictor
+        Source of the initial guesses for the 2nd order adjoint solves,
+        predicted from up to ``adjoint_guess`` previous products at the same
+        linearization.
+    analytic : boolean
+        If True, the user solver provides the Lagrangian second derivative
+        products, which replace the finite-difference approximations of the
+        2nd order terms.
     """
     def __init__(self, vector_factories, optns={}):
         super(ReducedKKTMatrix, self).__init__(vector_factories, optns)
@@ -72,6 +83,7 @@ class ReducedKKTMatrix(BaseHessian):
         self.grad_scale = get_opt(optns, 1.0, 'grad_scale')
         self.ceq_scale = get_opt(optns, 1.0, 'ceq_scale')
         self.dynamic_tol = get_opt(optns, False, 'dynamic_tol')
+        self.adjoint_guess = get_opt(optns, 0, 'adjoint_guess')
 
         # get references to individual factories
         self.primal_factory = None
@@ -95,6 +107,9 @@ class ReducedKKTMatrix(BaseHessian):
         self.primal_factory.request_num_vectors(3)
         self.state_factory.request_num_vectors(6)
         self.dual_factory.request_num_vectors(3)
+        self.predictor = AdjointPredictor(
+            self.adjoint_guess, [self.primal_factory, self.dual_factory],
+            self.state_factory, 2)
 
         # initialize abtract jacobians
         self.dRdX = dRdX()
@@ -102,6 +117,13 @@ class ReducedKKTMatrix(BaseHessian):
         self.dCdX = dCdX()
         self.dCdU = dCdU()
 
+        # use analytic 2nd derivatives if the user solver provides them
+        self.analytic = has_lagrangian_hessian(
+            self.primal_factory._memory.solver)
+        self.d2LdX2 = d2LdX2()
+        self.d2LdXdU = d2LdXdU()
+        self.d2LdU2 = d2LdU2()
+
     def _linear_solve(self, rhs_vec, solution, rel_tol=1e-8):
         self.dRdU.linearize(self.at_design, self.at_state)
         self.dRdU.solve(rhs_vec, solution, rel_tol=rel_tol)
@@ -179,6 +201,17 @@ class ReducedKKTMatrix(BaseHessian):
         self.at_adjoint = at_adjoint
         self.at_dual = at_kkt._dual
 
+        # previous products do not predict the adjoints at a new point
+        self.predictor.reset()
+
+        # the analytic 2nd derivatives need no reference gradients
+        if self.analytic:
+            for matrix in [self.d2LdX2, self.d2LdXdU, self.d2LdU2]:
+                matrix.linearize(
+                    self.at_design, self.at_state, self.at_adjoint,
+                    self.at_dual)
+            return
+
         # compute adjoint residual at the linearization
         self.dual_work.equals_constraints(self.at_design, self.at_state)
         self.adjoint_res.equals_objective_partial(self.at_design, self.at_state)
@@ -235,9 +268,6 @@ class ReducedKKTMatrix(BaseHessian):
         in_dual = in_vec._dual
         out_dual = out_vec._dual
 
-        # modify the in_vec for inequality constraints
-        self.dual_work.equals_constraints(self.at_design, self.at_state)
-
         # calculate appropriate FD perturbation for design
         epsilon_fd = calc_epsilon(self.design_norm, in_design.norm2)
 
@@ -246,38 +276,23 @@ class ReducedKKTMatrix(BaseHessian):
         self.dRdX.product(in_design, self.state_work[0])
         self.state_work[0].times(-1.0)
 
+        # predict the 2nd order adjoints from previous products
+        coeffs = self.predictor.coefficients([in_design, in_dual])
+        handle = self.predictor.record([in_design, in_dual])
+
         # perform the adjoint solution
-        self.w_adj.equals(0.0)
+        self.predictor.predict(coeffs, 0, self.w_adj)
         rel_tol = self.product_tol * \
             self.product_fac/max(self.state_work[0].norm2, EPS)
         # rel_tol = 1e-12
         self._linear_solve(self.state_work[0], self.w_adj, rel_tol=rel_tol)
+        self.predictor.save(handle, 0, self.w_adj)
 
-        # find the adjoint perturbation by solving the linearized dual equation
-        self.pert_design.equals_ax_p_by(
-            1.0, self.at_design, epsilon_fd, in_design)
-        self.state_work[2].equals_ax_p_by(
-            1.0, self.at_state, epsilon_fd, self.w_adj)
-
-        # first part of LHS: evaluate the adjoint equation residual at
-        # perturbed design and state
-        self.state_work[0].equals_objective_partial(
-            self.pert_design, self.state_work[2])
-        pert_state = self.state_work[2] # aliasing for readability
-        self.dRdU.linearize(self.pert_design, pert_state)
-        self.dRdU.T.product(self.at_adjoint, self.state_work[1])
-        self.state_work[0].plus(self.state_work[1])
-        self.dCdU.linearize(self.pert_design, pert_state)
-        self.dCdU.T.product(self.at_dual, self.state_work[1])
-        self.state_work[0].plus(self.state_work[1])
-
-        # at this point state_work[0] should contain the perturbed adjoint
-        # residual, so take difference with unperturbed adjoint residual
-        self.state_work[0].minus(self.adjoint_res)
-        self.state_work[0].divide_by(epsilon_fd)
-
-        # multiply by -1 to move to RHS
-        self.state_work[0].times(-1.0)
+        # first part of LHS: 2nd order terms of the adjoint equation
+        if self.analytic:
+            self._analytic_adjoint_rhs(in_design)
+        else:
+            self._fd_adjoint_rhs(in_design, epsilon_fd)
 
         # second part of LHS: (dC/dU) * in_vec._dual
         self.dCdU.linearize(self.at_design, self.at_state)
@@ -287,31 +302,20 @@ class ReducedKKTMatrix(BaseHessian):
         self.state_work[0].minus(self.state_work[1])
 
         # perform the adjoint solution
-        self.lambda_adj.equals(0.0)
+        self.predictor.predict(coeffs, 1, self.lambda_adj)
         rel_tol = self.product_tol * \
             self.product_fac/max(self.state_work[0].norm2, EPS)
         # rel_tol = 1e-12
         self._adjoint_solve(
             self.state_work[0], self.lambda_adj, rel_tol=rel_tol)
+        self.predictor.save(handle, 1, self.lambda_adj)
+        self.predictor.commit()
 
-        # evaluate first order optimality conditions at perturbed design, state
-        # and adjoint:
-        # g = df/dX + lag_mult*dC/dX + (adjoint + eps_fd*lambda_adj)*dR/dX
-        self.state_work[1].equals_ax_p_by(
-            1.0, self.at_adjoint, epsilon_fd, self.lambda_adj)
-        pert_adjoint = self.state_work[1] # aliasing for readability
-        out_design.equals_objective_partial(self.pert_design, pert_state)
-        self.dRdX.linearize(self.pert_design, pert_state)
-        self.dRdX.T.product(pert_adjoint, self.primal_work)
-        out_design.plus(self.primal_work)
-        self.dCdX.linearize(self.pert_design, pert_state)
-        self.dCdX.T.product(self.at_dual, self.primal_work)
-        out_design.plus(self.primal_work)
-
-        # take difference with unperturbed conditions
-        out_design.times(self.grad_scale)
-        out_design.minus(self.reduced_grad)
-        out_design.divide_by(epsilon_fd)
+        # 2nd order terms of the design product
+        if self.analytic:
+            self._analytic_design_product(in_design, out_design)
+        else:
+            self._fd_design_product(out_design, epsilon_fd)
 
         # the dual part needs no FD
         self.dCdX.linearize(self.at_design, self.at_state)
@@ -354,3 +358,72 @@ class ReducedKKTMatrix(BaseHessian):
             self.dual_work.equals(in_slack)
             self.dual_work.times(self.slack_work)
             out_dual.plus(self.dual_work)
+
+    def _analytic_adjoint_rhs(self, in_design):
+        # apply the Lagrangian Hessian to the design and state perturbations
+        self.d2LdXdU.T.product(in_design, self.state_work[0])
+        self.d2LdU2.product(self.w_adj, self.state_work[1])
+        self.state_work[0].plus(self.state_work[1])
+
+        # multiply by -1 to move to RHS
+        self.state_work[0].times(-1.0)
+
+    def _fd_adjoint_rhs(self, in_design, epsilon_fd):
+        # find the adjoint perturbation by solving the linearized dual equation
+        self.pert_design.equals_ax_p_by(
+            1.0, self.at_design, epsilon_fd, in_design)
+        self.state_work[2].equals_ax_p_by(
+            1.0, self.at_state, epsilon_fd, self.w_adj)
+
+        # first part of LHS: evaluate the adjoint equation residual at
+        # perturbed design and state
+        self.state_work[0].equals_objective_partial(
+            self.pert_design, self.state_work[2])
+        pert_state = self.state_work[2] # aliasing for readability
+        self.dRdU.linearize(self.pert_design, pert_state)
+        self.dRdU.T.product(self.at_adjoint, self.state_work[1])
+        self.state_work[0].plus(self.state_work[1])
+        self.dCdU.linearize(self.pert_design, pert_state)
+        self.dCdU.T.product(self.at_dual, self.state_work[1])
+        self.state_work[0].plus(self.state_work[1])
+
+        # at this point state_work[0] should contain the perturbed adjoint
+        # residual, so take difference with unperturbed adjoint residual
+        self.state_work[0].minus(self.adjoint_res)
+        self.state_work[0].divide_by(epsilon_fd)
+
+        # multiply by -1 to move to RHS
+        self.state_work[0].times(-1.0)
+
+    def _analytic_design_product(self, in_design, out_design):
+        # apply the Lagrangian Hessian to the design and state perturbations
+        self.d2LdX2.product(in_design, out_design)
+        self.d2LdXdU.product(self.w_adj, self.primal_work)
+        out_design.plus(self.primal_work)
+
+        # apply lambda_adj to the design part of the jacobian
+        self.dRdX.linearize(self.at_design, self.at_state)
+        self.dRdX.T.product(self.lambda_adj, self.primal_work)
+        out_design.plus(self.primal_work)
+        out_design.times(self.grad_scale)
+
+    def _fd_design_product(self, out_design, epsilon_fd):
+        pert_state = self.state_work[2] # perturbed in _fd_adjoint_rhs()
+        # evaluate first order optimality conditions at perturbed design, state
+        # and adjoint:
+        # g = df/dX + lag_mult*dC/dX + (adjoint + eps_fd*lambda_adj)*dR/dX
+        self.state_work[1].equals_ax_p_by(
+            1.0, self.at_adjoint, epsilon_fd, self.lambda_adj)
+        pert_adjoint = self.state_work[1] # aliasing for readability
+        out_design.equals_objective_partial(self.pert_design, pert_state)
+        self.dRdX.linearize(self.pert_design, pert_state)
+        self.dRdX.T.product(pert_adjoint, self.primal_work)
+        out_design.plus(self.primal_work)
+        self.dCdX.linearize(self.pert_design, pert_state)
+        self.dCdX.T.product(self.at_dual, self.primal_work)
+        out_design.plus(self.primal_work)
+
+        # take difference with unperturbed conditions
+        out_design.times(self.grad_scale)
+        out_design.minus(self.reduced_grad)
+        out_design.divide_by(epsilon_fd)
@@ -41,7 +41,8 @@ class LimitedMemoryBFGS(QuasiNewtonApprox):
 
         # otherwise we must first free up space for the correction, if needed
         if (len(self.s_list) == self.max_stored):
-            del self.s_list[0], self.y_list[0]
+            self.s_list.pop(0).release()
+            self.y_list.pop(0).release()
             del self.s_dot_s_list[0], self.s_dot_y_list[0]
 
         # get new vectors to store the correction
@@ -1,4 +1,3 @@
-import gc
 import numpy
 
 from kona.options import get_opt
@@ -98,8 +97,8 @@ class LimitedMemorySR1(QuasiNewtonApprox):
 
         # if maximum is reached, remove old elements
         if len(self.s_list) == self.max_stored:
-            del self.s_list[0]
-            del self.y_list[0]
+            self.s_list.pop(0).release()
+            self.y_list.pop(0).release()
 
         # generate two new vectors
         s_new = self.vec_fac.generate()
@@ -113,10 +112,6 @@ class LimitedMemorySR1(QuasiNewtonApprox):
         self.s_list.append(s_new)
         self.y_list.append(y_new)
 
-        # force garbage collection
-        del s_new, y_new
-        gc.collect()
-
     def solve(self, u_vec, v_vec, rel_tol=1e-15):
         # alias some variables
         lambda0 = self.lambda0
@@ -3,9 +3,12 @@ import numpy
 from kona.options import get_opt
 from kona.linalg.vectors.common import PrimalVector, StateVector
 from kona.linalg.matrices.common import dRdX, dRdU, IdentityMatrix
+from kona.linalg.matrices.common import d2LdX2, d2LdXdU, d2LdU2
+from kona.linalg.matrices.common import has_lagrangian_hessian
 from kona.linalg.matrices.hessian.basic import BaseHessian, QuasiNewtonApprox
+from kona.linalg.matrices.hessian.basic import AdjointPredictor
 from kona.linalg.solvers.krylov.basic import KrylovSolver
-from kona.linalg.solvers.util import calc_epsilon
+from kona.linalg.solvers.util import calc_epsilon, solve_trust_reduced, EPS
 
 class ReducedHessian(BaseHessian):
     """
@@ -26,6 +29,34 @@ class ReducedHessian(BaseHessian):
         ???
     quasi_newton : QuasiNewtonApproximation -like
         QN Hessian object to be used as preconditioner.
+    block_size : int
+        Maximum number of products whose 2nd order adjoints are solved
+        together in `product_block`.
+    predictor : AdjointPredictor
+        Source of the initial guesses for the 2nd order adjoint solves,
+        predicted from up to ``adjoint_guess`` previous products at the same
+        linearization.
+    analytic : boolean
+        If True, the user solver provides the Lagrangian second derivative
+        products, which replace the finite-difference approximations of the
+        2nd order terms.
+    complex_step : boolean
+        If True, the 2nd order terms are evaluated with complex-step
+        perturbations instead of finite differences. This requires a user
+        solver and allocator that support complex-valued vectors (see
+        `BaseAllocator.alloc_primal_complex`). Analytic 2nd derivatives take
+        precedence if they are available.
+    dense_max : int
+        Largest design space that is assembled into a dense matrix.
+    dense : boolean
+        If True, the trust-region subproblem at the current linearization is
+        solved with the dense reduced Hessian (see `solve_dense`). This is
+        chosen when the allocator supports dense assembly (see
+        `BaseAllocator.dense_primal_size`), and the design space has at most
+        ``dense_max`` variables and no more than the Krylov solver's maximum
+        number of iterations.
+        Assembly takes one product per design variable, while the Krylov
+        solver may take one per iteration.
     """
     def __init__(self, vector_factories, optns={}):
         super(ReducedHessian, self).__init__(vector_factories, optns)
@@ -36,6 +67,10 @@ class ReducedHessian(BaseHessian):
         self.scale = get_opt(optns, 1.0, 'scale')
         self.nu = get_opt(optns, 0.95, 'nu')
         self.dynamic_tol = get_opt(optns, False, 'dynamic_tol')
+        self.block_size = get_opt(optns, 1, 'block_size')
+        self.adjoint_guess = get_opt(optns, 0, 'adjoint_guess')
+        self.complex_step = get_opt(optns, False, 'complex_step')
+        self.dense_max = get_opt(optns, 30, 'dense_max')
 
         # preconditioner and solver settings
         self.precond = get_opt(optns, None, 'precond')
@@ -56,12 +91,31 @@ class ReducedHessian(BaseHessian):
 
         # request vector memory for future allocation
         self.primal_factory.request_num_vectors(4)
-        self.state_factory.request_num_vectors(7)
+        self.state_factory.request_num_vectors(4 + 2*self.block_size)
+        # small design spaces also need their unit vectors for assembly
+        self.num_design = self.primal_factory._memory.dense_design_size()
+        self._assemble = self.num_design is not None and \
+            0 < self.num_design <= self.dense_max
+        if self._assemble:
+            self.primal_factory.request_num_vectors(
+                self.num_design + self.block_size)
+        self.dense = False
+        self.H_dense = None
+        self.predictor = AdjointPredictor(
+            self.adjoint_guess, [self.primal_factory], self.state_factory, 2,
+            num_pending=self.block_size)
 
         # initialize abtract jacobians
         self.dRdX = dRdX()
         self.dRdU = dRdU()
 
+        # use analytic 2nd derivatives if the user solver provides them
+        self.analytic = has_lagrangian_hessian(
+            self.primal_factory._memory.solver)
+        self.d2LdX2 = d2LdX2()
+        self.d2LdXdU = d2LdXdU()
+        self.d2LdU2 = d2LdU2()
+
     def set_krylov_solver(self, krylov_solver):
         if isinstance(krylov_solver, KrylovSolver):
             self.krylov = krylov_solver
@@ -101,25 +155,58 @@ class ReducedHessian(BaseHessian):
         self.state_norm = self.at_state.norm2
         self.at_adjoint = at_adjoint
 
+        # previous products do not predict the adjoints at a new point
+        self.predictor.reset()
+
         # if this is the first ever linearization...
         if not self._allocated:
 
             # generate state vectors
             self.adjoint_res = self.state_factory.generate()
-            self.w_adj = self.state_factory.generate()
-            self.lambda_adj = self.state_factory.generate()
             self.state_work = []
-            for i in xrange(4):
+            for i in xrange(3):
                 self.state_work.append(self.state_factory.generate())
 
+            # generate the 2nd order adjoints and their right hand sides
+            self.adjoints = []
+            self.adjoint_rhs = []
+            for i in xrange(self.block_size):
+                self.adjoints.append(self.state_factory.generate())
+                self.adjoint_rhs.append(self.state_factory.generate())
+
             # generate primal vectors
             self.pert_design = self.primal_factory.generate()
             self.reduced_grad = self.primal_factory.generate()
             self.primal_work = []
             for i in xrange(2):
                 self.primal_work.append(self.primal_factory.generate())
+            # complex-valued vectors live outside of the factories
+            if self.complex_step and not self.analytic:
+                memory = self.primal_factory._memory
+                self.primal_cs = memory.alloc_complex(PrimalVector, 2)
+                self.state_cs = memory.alloc_complex(StateVector, 2)
             self._allocated = True
 
+            # unit vectors and products for the dense assembly
+            if self._assemble:
+                self._setup_dense()
+
+        # dense assembly pays off if the Krylov solver may need more products
+        self.H_dense = None
+        self.dense = self._assemble and (
+            self.krylov is None or self.num_design <= self.krylov.max_iter)
+
+        # the analytic 2nd derivatives need no reference gradients
+        if self.analytic:
+            self.d2LdX2.linearize(self.at_design, self.at_state, at_adjoint)
+            self.d2LdXdU.linearize(self.at_design, self.at_state, at_adjoint)
+            self.d2LdU2.linearize(self.at_design, self.at_state, at_adjoint)
+            return
+
+        # neither do the complex-step perturbations
+        if self.complex_step:
+            return
+
         # compute adjoint residual at the linearization
         self.adjoint_res.equals_objective_partial(self.at_design, self.at_state)
         self.dRdU.linearize(self.at_design, self.at_state)
@@ -135,18 +222,163 @@ class ReducedHessian(BaseHessian):
 
     def product(self, in_vec, out_vec):
         """
-        Matrix-vector product for the reduced KKT system.
+        Matrix-vector product for the reduced Hessian.
 
         Parameters
         ----------
-        in_vec : ReducedKKTVector
-            Vector to be multiplied with the KKT matrix.
-        out_vec : ReducedKKTVector
+        in_vec : PrimalVector
+            Vector to be multiplied with the Hessian.
+        out_vec : PrimalVector
             Result of the operation.
         """
+        self.product_block([in_vec], [out_vec])
+
+    def product_block(self, in_vecs, out_vecs):
+        """
+        Matrix-vector products for several vectors at the same linearization.
+
+        The products are processed in groups of up to ``block_size`` vectors.
+        Each group solves its first and its second 2nd order adjoints with
+        one block solve each, so that the user solver can share the cost of
+        the solutions.
+
+        Parameters
+        ----------
+        in_vecs : list of PrimalVector
+            Vectors to be multiplied with the Hessian.
+        out_vecs : list of PrimalVector
+            Results of the operation.
+        """
+        if len(in_vecs) != len(out_vecs):
+            raise ValueError('ReducedHessian.product_block() >> ' +
+                             'Number of input and output vectors must match!')
+        for i in xrange(0, len(in_vecs), self.block_size):
+            self._product_group(
+                in_vecs[i:i+self.block_size], out_vecs[i:i+self.block_size])
+
+    def _product_group(self, in_vecs, out_vecs):
+        num_vecs = len(in_vecs)
+        adjoints = self.adjoints[:num_vecs]
+        adjoint_rhs = self.adjoint_rhs[:num_vecs]
+
+        # first adjoint systems
+        ####################################
+
+        # build RHS
+        self.dRdX.linearize(self.at_design, self.at_state)
+        self.dRdX.product_block(in_vecs, adjoint_rhs)
+        for rhs in adjoint_rhs:
+            rhs.times(-1.0)
+
+        # predict the 2nd order adjoints from previous products
+        coeffs = []
+        handles = []
+        for in_vec, w_adj in zip(in_vecs, adjoints):
+            coeffs.append(self.predictor.coefficients([in_vec]))
+            handles.append(self.predictor.record([in_vec]))
+            self.predictor.predict(coeffs[-1], 0, w_adj)
+
+        # solve the first 2nd order adjoints
+        self.dRdU.linearize(self.at_design, self.at_state)
+        self.dRdU.solve_block(adjoint_rhs, adjoints, rel_tol=self.product_fac)
+        for handle, w_adj in zip(handles, adjoints):
+            self.predictor.save(handle, 0, w_adj)
+
+        # 2nd order terms of the products and the second adjoint systems
+        for in_vec, out_vec, w_adj, rhs in zip(
+                in_vecs, out_vecs, adjoints, adjoint_rhs):
+            if self.analytic:
+                self._analytic_terms(in_vec, out_vec, w_adj, rhs)
+            elif self.complex_step:
+                self._cs_terms(in_vec, out_vec, w_adj, rhs)
+            else:
+                self._fd_terms(in_vec, out_vec, w_adj, rhs)
+
+        # solve the second 2nd order adjoints, reusing the first ones' memory
+        for coeff, lambda_adj in zip(coeffs, adjoints):
+            self.predictor.predict(coeff, 1, lambda_adj)
+        self.dRdU.linearize(self.at_design, self.at_state)
+        self.dRdU.T.solve_block(
+            adjoint_rhs, adjoints, rel_tol=self.product_fac)
+        for handle, lambda_adj in zip(handles, adjoints):
+            self.predictor.save(handle, 1, lambda_adj)
+        self.predictor.commit()
+
+        # assemble the Hessian-vector products using 2nd order adjoints
+        ##############################################################
+
+        self.dRdX.linearize(self.at_design, self.at_state)
+        for in_vec, out_vec, lambda_adj in zip(in_vecs, out_vecs, adjoints):
+            # apply lambda_adj to the design part of the jacobian
+            self.dRdX.T.product(lambda_adj, self.primal_work[0])
+            out_vec.plus(self.primal_work[0])
+
+            # update quasi-Newton method if necessary
+            if self.quasi_newton is not None:
+                self.quasi_newton.add_correction(in_vec, out_vec)
+
+            # add globalization if necessary
+            if self.lamb > numpy.finfo(float).eps:
+                out_vec.equals_ax_p_by(
+                    1.-self.lamb, out_vec, self.lamb*self.scale, in_vec)
+
+    def _analytic_terms(self, in_vec, out_vec, w_adj, rhs):
+        # apply the Lagrangian Hessian to the design and state perturbations
+        self.d2LdX2.product(in_vec, out_vec)
+        self.d2LdXdU.product(w_adj, self.primal_work[0])
+        out_vec.plus(self.primal_work[0])
+
+        # assemble the RHS of the second adjoint system
+        self.d2LdXdU.T.product(in_vec, rhs)
+        self.d2LdU2.product(w_adj, self.state_work[0])
+        rhs.plus(self.state_work[0])
+        rhs.times(-1.0)
+
+    def _cs_gradients(self, at_design, at_state, design_out, state_out):
+        # imaginary parts of the Lagrangian partials at a complex point
+        primal_cs = self.primal_cs[0]
+        state_cs = self.state_cs[0]
+        primal_cs.equals_objective_partial(at_design, at_state)
+        design_out.equals_imag(primal_cs)
+        self.dRdX.linearize(at_design, at_state)
+        self.dRdX.T.product(self.at_adjoint, primal_cs)
+        self.primal_work[1].equals_imag(primal_cs)
+        design_out.plus(self.primal_work[1])
+        state_cs.equals_objective_partial(at_design, at_state)
+        state_out.equals_imag(state_cs)
+        self.dRdU.linearize(at_design, at_state)
+        self.dRdU.T.product(self.at_adjoint, state_cs)
+        self.state_work[1].equals_imag(state_cs)
+        state_out.plus(self.state_work[1])
+
+    def _cs_terms(self, in_vec, out_vec, w_adj, rhs):
+        # the imaginary parts are free of subtractive cancellation, so the
+        # step only needs to keep them clear of underflow
+        pert_design = self.primal_cs[1]
+        pert_state = self.state_cs[1]
+
+        # perturb the design vector along the imaginary axis
+        epsilon_cs = 1e-20/max(in_vec.norm2, EPS)
+        pert_design.equals_ax_p_by(1.0, self.at_design, 1j*epsilon_cs, in_vec)
+        self._cs_gradients(pert_design, self.at_state, out_vec, rhs)
+        out_vec.divide_by(epsilon_cs)
+        rhs.divide_by(-epsilon_cs)
+
+        # perturb the state vector along the imaginary axis
+        epsilon_cs = 1e-20/max(w_adj.norm2, EPS)
+        pert_state.equals_ax_p_by(1.0, self.at_state, 1j*epsilon_cs, w_adj)
+        self._cs_gradients(
+            self.at_design, pert_state, self.primal_work[0],
+            self.state_work[0])
+        out_vec.equals_ax_p_by(
+            1.0, out_vec, 1./epsilon_cs, self.primal_work[0])
+        rhs.equals_ax_p_by(1.0, rhs, -1./epsilon_cs, self.state_work[0])
+
+    def _fd_terms(self, in_vec, out_vec, w_adj, rhs):
         # perturb the design vector
         epsilon_fd = calc_epsilon(self.primal_norm, in_vec.norm2)
-        self.pert_design.equals_ax_p_by(1.0, self.at_design, epsilon_fd, in_vec)
+        self.pert_design.equals_ax_p_by(
+            1.0, self.at_design, epsilon_fd, in_vec)
 
         # compute total gradient at the perturbed design
         out_vec.equals_objective_partial(self.pert_design, self.at_state)
@@ -160,69 +392,43 @@ class ReducedHessian(BaseHessian):
         # divide it by the perturbation
         out_vec.divide_by(epsilon_fd)
 
-        # first adjoint system
-        ####################################
-
-        # build RHS
-        self.dRdX.linearize(self.at_design, self.at_state)
-        self.dRdX.product(in_vec, self.state_work[0])
-        self.state_work[0].times(-1.0)
-
-        # solve the first 2nd order adjoint
-        self.dRdU.linearize(self.at_design, self.at_state)
-        self.dRdU.solve(
-            self.state_work[0], self.w_adj, rel_tol=self.product_fac)
-
         # second adjoint system
         #####################################
 
         # calculate total (dg/dx)^T*w using FD
-        self.state_work[0].equals_objective_partial(
-            self.pert_design, self.at_state)
+        rhs.equals_objective_partial(self.pert_design, self.at_state)
         self.dRdU.linearize(self.pert_design, self.at_state)
-        self.dRdU.T.product(self.at_adjoint, self.state_work[1])
-        self.state_work[0].plus(self.state_work[1])
-        self.state_work[0].minus(self.adjoint_res)
-        self.state_work[0].divide_by(epsilon_fd)
+        self.dRdU.T.product(self.at_adjoint, self.state_work[0])
+        rhs.plus(self.state_work[0])
+        rhs.minus(self.adjoint_res)
+        rhs.divide_by(epsilon_fd)
 
         # multiply by -1 to use it as RHS
-        self.state_work[0].times(-1.0)
+        rhs.times(-1.0)
 
         # perform state perturbation
-        epsilon_fd = calc_epsilon(self.state_norm, self.w_adj.norm2)
-        self.state_work[1].equals_ax_p_by(
-            1.0, self.at_state, epsilon_fd, self.w_adj)
+        epsilon_fd = calc_epsilon(self.state_norm, w_adj.norm2)
+        self.state_work[0].equals_ax_p_by(
+            1.0, self.at_state, epsilon_fd, w_adj)
 
         # calculate total (dS/du)^T*z using FD
-        self.state_work[2].equals_objective_partial(
-            self.at_design, self.state_work[1])
-        self.state_work[3].equals_ax_p_by(
-            -1./epsilon_fd, self.state_work[2], 1./epsilon_fd, self.adjoint_res)
-        self.dRdU.linearize(self.at_design, self.state_work[1])
-        self.dRdU.T.product(self.at_adjoint, self.state_work[2])
-        self.state_work[3].equals_ax_p_by(
-            1., self.state_work[3], -1./epsilon_fd, self.state_work[2])
+        self.state_work[1].equals_objective_partial(
+            self.at_design, self.state_work[0])
+        self.state_work[2].equals_ax_p_by(
+            -1./epsilon_fd, self.state_work[1],
+            1./epsilon_fd, self.adjoint_res)
+        self.dRdU.linearize(self.at_design, self.state_work[0])
+        self.dRdU.T.product(self.at_adjoint, self.state_work[1])
+        self.state_work[2].equals_ax_p_by(
+            1., self.state_work[2], -1./epsilon_fd, self.state_work[1])
 
         # assemble RHS
-        self.state_work[0].plus(self.state_work[3])
-
-        # solve the second 2nd order adjoint
-        self.dRdU.linearize(self.at_design, self.at_state)
-        self.dRdU.T.solve(
-            self.state_work[0], self.lambda_adj, rel_tol=self.product_fac)
-
-        # assemble the Hessian-vector product using 2nd order adjoints
-        ##############################################################
-
-        # apply lambda_adj to the design part of the jacobian
-        self.dRdX.linearize(self.at_design, self.at_state)
-        self.dRdX.T.product(self.lambda_adj, self.primal_work[0])
-        out_vec.plus(self.primal_work[0])
+        rhs.plus(self.state_work[2])
 
         # apply w_adj to the cross-derivative part of the jacobian
         self.primal_work[0].equals_objective_partial(
-            self.at_design, self.state_work[1])
-        self.dRdX.linearize(self.at_design, self.state_work[1])
+            self.at_design, self.state_work[0])
+        self.dRdX.linearize(self.at_design, self.state_work[0])
         self.dRdX.T.product(self.at_adjoint, self.primal_work[1])
         self.primal_work[0].plus(self.primal_work[1])
         self.primal_work[0].equals_ax_p_by(
@@ -230,14 +436,75 @@ class ReducedHessian(BaseHessian):
             -1./epsilon_fd, self.reduced_grad)
         out_vec.plus(self.primal_work[0])
 
-        # update quasi-Newton method if necessary
-        if self.quasi_newton is not None:
-            self.quasi_newton.add_correction(in_vec, out_vec)
+    def _setup_dense(self):
+        self.units = []
+        for i in xrange(self.num_design):
+            self.units.append(self.primal_factory.generate())
+            self.units[i].equals_unit(i)
+        self.dense_work = []
+        for i in xrange(self.block_size):
+            self.dense_work.append(self.primal_factory.generate())
+
+    def assemble(self):
+        """
+        Assembles the reduced Hessian at the current linearization into a
+        dense matrix, one column per design variable.
+
+        The columns are products with the unit vectors of the design space,
+        computed in groups of ``block_size`` with `product_block`.
+
+        Returns
+        -------
+        numpy.ndarray
+            Dense reduced Hessian.
+        """
+        if not self._assemble:
+            raise RuntimeError('ReducedHessian.assemble() >> ' +
+                               'Design space cannot be assembled!')
+        H = numpy.zeros((self.num_design, self.num_design))
+        for j in xrange(0, self.num_design, self.block_size):
+            units = self.units[j:j+self.block_size]
+            columns = self.dense_work[:len(units)]
+            self.product_block(units, columns)
+            for k in xrange(len(columns)):
+                H[:, j+k] = columns[k].inner_many(self.units)
+        return H
+
+    def solve_dense(self, rhs, solution, radius):
+        """
+        Solves the trust-region subproblem
 
-        # add globalization if necessary
-        if self.lamb > numpy.finfo(float).eps:
-            out_vec.equals_ax_p_by(
-                1.-self.lamb, out_vec, self.lamb*self.scale, in_vec)
+        .. math:: \\min_x \\frac{1}{2}x^T H x - b^T x \\quad
+            \\text{s.t.} \\quad \\|x\\| \\leq \\Delta
+
+        exactly, with the dense reduced Hessian. The matrix is assembled on
+        the first call after each linearization.
+
+        Parameters
+        ----------
+        rhs : PrimalVector
+            Right hand side vector :math:`b`.
+        solution : PrimalVector
+            Solution of the subproblem.
+        radius : float
+            Trust-region radius :math:`\\Delta`.
+
+        Returns
+        -------
+        float
+            Predicted decrease of the quadratic model.
+        boolean
+            True if the trust-region constraint is active.
+        """
+        if self.H_dense is None:
+            self.H_dense = self.assemble()
+        g = -rhs.inner_many(self.units)
+        if not numpy.any(g):
+            solution.equals(0.0)
+            return 0.0, False
+        y, lam, pred = solve_trust_reduced(self.H_dense, g, radius)
+        solution.equals_lin_comb(y, self.units)
+        return pred, lam > 0.0
 
     def solve(self, rhs, solution, rel_tol=None):
         """
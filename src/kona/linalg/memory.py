@@ -1,4 +1,84 @@
+import sys
+from collections import OrderedDict
+
+from kona.options import get_opt
+from kona.linalg.solvers.util import EPS
 from kona.linalg.vectors.common import PrimalVector, StateVector, DualVector
+from kona.linalg.vectors.composite import ReducedKKTVector
+from kona.linalg.vectors.composite import CompositePrimalVector
+
+# component names cached by the code object that generated vectors
+_component_names = {}
+
+def _find_component(frame):
+    """
+    Names the component that requested a vector.
+
+    The name is the class that defines the calling method, looked up from the
+    caller's code object and module globals. Frame locals are never touched,
+    so no references to the caller's vectors are kept alive.
+
+    Parameters
+    ----------
+    frame : frame
+        Frame of the immediate caller of ``VectorFactory.generate()``.
+
+    Returns
+    -------
+    string
+        Class name of the component, or the function name for vectors
+        generated outside of any class.
+    """
+    while frame is not None and frame.f_globals.get('__name__') == __name__:
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+    code = frame.f_code
+    name = _component_names.get(code)
+    if name is None:
+        name = code.co_name
+        for obj in frame.f_globals.values():
+            if isinstance(obj, type):
+                func = obj.__dict__.get(code.co_name)
+                if getattr(func, '__code__', None) is code:
+                    name = obj.__name__
+                    break
+        _component_names[code] = name
+    return name
+
+class VectorScope(object):
+    """
+    Context manager that releases every vector generated inside it.
+
+    Vectors generated by the owning factory while the scope is open are
+    returned to the memory stack when the scope exits, without waiting for
+    them to be garbage collected. They must not be used after that point.
+
+    Parameters
+    ----------
+    factory : VectorFactory
+        Factory whose vectors are tracked by this scope.
+
+    Attributes
+    ----------
+    vectors : list of KonaVector
+        Vectors generated inside the scope so far.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self.vectors = []
+
+    def __enter__(self):
+        self._factory._scopes.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._factory._scopes.remove(self)
+        for vector in self.vectors:
+            vector.release()
+        self.vectors = []
+        return False
 
 class VectorFactory(object):
     """
@@ -16,21 +96,44 @@ class VectorFactory(object):
     ----------
     num_vecs : int
         Number of vectors requested from this factory.
+    num_low_vecs : int
+        Number of low-precision vectors requested from this factory.
+    num_allocated : int
+        Number of vectors actually allocated for this factory's type.
+    num_live : int
+        Number of vectors currently generated and not yet returned.
+    peak_live : int
+        High-water mark of ``num_live``.
+    bytes_per_vec : int or None
+        Size of one user vector in bytes, if it can be determined.
+    components : dict
+        Live and peak vector counts keyed by the name of the component that
+        generated the vectors.
     _memory : KonaMemory
         All-knowing Kona memory manager.
     _vec_type : PrimalVector or StateVector or DualVector
         Kona abstracted vector type associated with this factory
+    _scopes : list of VectorScope
+        Open vector scopes, innermost last.
     """
 
     def __init__(self, memory, vec_type=None):
         self.num_vecs = 0
+        self.num_low_vecs = 0
+        self.num_allocated = 0
+        self.num_live = 0
+        self.peak_live = 0
+        self.bytes_per_vec = None
+        self.components = {}
         self._memory = memory
+        self._scopes = []
+        self._owners = {}
         if vec_type not in self._memory.vector_stack.keys():
             raise TypeError('VectorFactory() >> Unknown vector type!')
         else:
             self._vec_type = vec_type
 
-    def request_num_vectors(self, count):
+    def request_num_vectors(self, count, low_precision=False):
         """
         Put in a request for the factory's vector type, to be used later.
 
@@ -38,33 +141,638 @@ class VectorFactory(object):
         ----------
         count : int
             Number of vectors requested.
+        low_precision : boolean, optional
+            If True, request vectors that are only used for storage (e.g.:
+            Krylov subspace bases) and may be kept in reduced precision.
         """
         if count < 1:
             raise ValueError('VectorFactory() >> ' +
                              'Cannot request less than 1 vector.')
-        self.num_vecs += count
+        if low_precision:
+            self.num_low_vecs += count
+        else:
+            self.num_vecs += count
 
-    def generate(self):
+    def generate(self, low_precision=False):
         """
         Generate one abstract KonaVector of this vector factory's defined type.
 
+        If the memory manager is in pool mode, a new chunk of vectors is
+        allocated whenever the memory stack runs out.
+
+        Parameters
+        ----------
+        low_precision : boolean, optional
+            If True, generate the vector from the low-precision memory stack.
+
         Returns
         -------
         KonaVector
             Abstracted vector type linked to user generated memory.
         """
         if self._memory.is_allocated:
+            if low_precision:
+                stack = self._memory.low_stack[self._vec_type]
+            else:
+                stack = self._memory.vector_stack[self._vec_type]
+            if self._memory.pool and len(stack) == 0:
+                self._memory.grow_pool(self._vec_type, low_precision)
             try:
-                data = self._memory.pop_vector(self._vec_type)
+                data = self._memory.pop_vector(self._vec_type, low_precision)
             except IndexError:
+                if self._memory.pool:
+                    raise MemoryError(
+                        'No more vector memory available. ' +
+                        'Vector pool is capped at %d vectors'%
+                        self._memory.pool_max_vecs)
                 raise MemoryError(
                     'No more vector memory available. ' +
                     'Allocate more vectors in your algorithm initialization')
-            return self._vec_type(self._memory, data)
+            self.num_live += 1
+            self.peak_live = max(self.peak_live, self.num_live)
+            self._checkout(data, _find_component(sys._getframe(1)))
+            vector = self._vec_type(self._memory, data)
+            if len(self._scopes) > 0:
+                self._scopes[-1].vectors.append(vector)
+            return vector
         else:
             raise RuntimeError('VectorFactory() >> ' +
                                'Must allocate memory before generating vector.')
 
+    def _checkout(self, user_data, name):
+        counts = self.components.setdefault(name, {'live' : 0, 'peak' : 0})
+        counts['live'] += 1
+        counts['peak'] = max(counts['peak'], counts['live'])
+        self._owners[id(user_data)] = name
+
+    def _checkin(self, user_data):
+        self.num_live -= 1
+        name = self._owners.pop(id(user_data), None)
+        if name is not None:
+            self.components[name]['live'] -= 1
+
+    def scope(self):
+        """
+        Open a scope that releases all vectors generated by this factory
+        inside a ``with`` block when the block exits.
+
+        Returns
+        -------
+        VectorScope
+        """
+        return VectorScope(self)
+
+class PackedStorage(object):
+    """
+    Owner of the packed user vector behind a packed `ReducedKKTVector`.
+
+    The composite vector and each of its component vectors keep a reference
+    to this object, so the packed user vector is returned to the memory stack
+    only after all of them have been garbage collected, or when the composite
+    vector is released.
+
+    Parameters
+    ----------
+    factory : KKTVectorFactory
+        Factory that generated the packed vector.
+    user_data : tuple
+        Packed user vector and its component views, as produced by the
+        allocator's ``alloc_kkt()`` method.
+    """
+
+    def __init__(self, factory, user_data):
+        self._factory = factory
+        self.user_data = user_data
+
+    def __del__(self):
+        if self.user_data is not None:
+            self._factory._push(self.user_data)
+
+    def release(self):
+        """
+        Returns the packed user vector to the memory stack immediately.
+        """
+        if self.user_data is not None:
+            self._factory._push(self.user_data)
+            self.user_data = None
+
+class KKTVectorFactory(VectorFactory):
+    """
+    A factory object used for generating `ReducedKKTVector` objects.
+
+    If the user allocator implements ``alloc_kkt()`` (see
+    `BlockAllocator.alloc_kkt`), the design, slack and dual components of
+    each vector are views into one packed user vector. Composite vector
+    operations between packed vectors then act on the whole packed vector
+    with a single call, instead of one call per component. Otherwise, and for
+    low-precision vectors, the components are generated by the primal and
+    dual vector factories.
+
+    Parameters
+    ----------
+    memory : KonaMemory
+    slack : boolean, optional
+        If True, the primal component of the vectors is a
+        `CompositePrimalVector` with design and slack components.
+
+    Attributes
+    ----------
+    slack : boolean
+        If True, the vectors include slack components.
+    packed : boolean
+        If True, the vectors use packed storage. This is determined when the
+        memory is allocated.
+    """
+
+    def __init__(self, memory, slack=False):
+        self.num_vecs = 0
+        self.num_low_vecs = 0
+        self.num_allocated = 0
+        self.num_live = 0
+        self.peak_live = 0
+        self.bytes_per_vec = None
+        self.components = {}
+        self.slack = slack
+        self.packed = False
+        self._memory = memory
+        self._scopes = []
+        self._owners = {}
+        self._stack = []
+        self._stacked_ids = set()
+
+    def request_num_vectors(self, count, low_precision=False):
+        """
+        Put in a request for KKT vectors, to be used later.
+
+        Parameters
+        ----------
+        count : int
+            Number of vectors requested.
+        low_precision : boolean, optional
+            If True, request low-precision storage vectors. These are never
+            packed, and are requested from the component factories directly.
+        """
+        if count < 1:
+            raise ValueError('KKTVectorFactory() >> ' +
+                             'Cannot request less than 1 vector.')
+        if low_precision:
+            self._memory.primal_factory.request_num_vectors(count, True)
+            self._memory.dual_factory.request_num_vectors(
+                self._num_duals()*count, True)
+        else:
+            self.num_vecs += count
+
+    def _num_duals(self):
+        if self.slack:
+            return 2
+        return 1
+
+    def _setup(self):
+        """
+        Decides between packed and component storage before the component
+        factories allocate their memory.
+        """
+        allocator = self._memory.solver.allocator
+        self.packed = hasattr(allocator, 'alloc_kkt')
+        if self.packed:
+            if not self._memory.pool and self.num_vecs > 0:
+                self._grow(self.num_vecs)
+        elif not self._memory.pool:
+            self._memory.primal_factory.num_vecs += self.num_vecs
+            self._memory.dual_factory.num_vecs += \
+                self._num_duals()*self.num_vecs
+
+    def _grow(self, count):
+        new_data = self._memory.solver.allocator.alloc_kkt(count, self.slack)
+        self.num_allocated += count
+        self.bytes_per_vec = _vector_bytes([data[0] for data in new_data])
+        for user_data in new_data:
+            for part in user_data[1:]:
+                if part is not None:
+                    self._memory.packed_ids.add(id(part))
+            self._stacked_ids.add(id(user_data[0]))
+            self._stack.append(user_data)
+
+    def _push(self, user_data):
+        if id(user_data[0]) not in self._stacked_ids:
+            self._stacked_ids.add(id(user_data[0]))
+            self._stack.append(user_data)
+            self._checkin(user_data[0])
+
+    def generate(self, low_precision=False):
+        """
+        Generate one `ReducedKKTVector`.
+
+        Parameters
+        ----------
+        low_precision : boolean, optional
+            If True, generate the components from the low-precision memory
+            stacks of the component factories.
+
+        Returns
+        -------
+        ReducedKKTVector
+        """
+        if not self._memory.is_allocated:
+            raise RuntimeError('KKTVectorFactory() >> ' +
+                               'Must allocate memory before generating vector.')
+        if low_precision or not self.packed:
+            design = self._memory.primal_factory.generate(low_precision)
+            if self.slack:
+                slack = self._memory.dual_factory.generate(low_precision)
+                primal = CompositePrimalVector(design, slack)
+            else:
+                primal = design
+            dual = self._memory.dual_factory.generate(low_precision)
+            vector = ReducedKKTVector(primal, dual)
+        else:
+            if self._memory.pool and len(self._stack) == 0:
+                count = self._memory.pool_chunk
+                if self._memory.pool_max_vecs is not None:
+                    count = min(
+                        count, self._memory.pool_max_vecs - self.num_allocated)
+                if count > 0:
+                    self._grow(count)
+            if len(self._stack) == 0:
+                raise MemoryError(
+                    'No more KKT vector memory available. ' +
+                    'Allocate more vectors in your algorithm initialization')
+            user_data = self._stack.pop()
+            self._stacked_ids.discard(id(user_data[0]))
+            self.num_live += 1
+            self.peak_live = max(self.peak_live, self.num_live)
+            self._checkout(user_data[0], _find_component(sys._getframe(1)))
+            vector = self._build(user_data)
+        if len(self._scopes) > 0:
+            self._scopes[-1].vectors.append(vector)
+        return vector
+
+    def _build(self, user_data):
+        packed, packed_primal, packed_design, packed_slack, packed_dual = \
+            user_data
+        storage = PackedStorage(self, user_data)
+        design = PrimalVector(self._memory, packed_design)
+        design._storage = storage
+        if self.slack:
+            slack = DualVector(self._memory, packed_slack)
+            slack._storage = storage
+            primal = CompositePrimalVector(design, slack)
+            primal._packed = packed_primal
+            primal._storage = storage
+        else:
+            primal = design
+        dual = DualVector(self._memory, packed_dual)
+        dual._storage = storage
+        vector = ReducedKKTVector(primal, dual)
+        vector._packed = packed
+        vector._storage = storage
+        return vector
+
+class EvaluationCache(object):
+    """
+    Bounded cache of functional evaluations in front of the user solver.
+
+    Objective values, system residuals and constraint vectors are stored
+    under the version stamps of the design and state vectors they were
+    evaluated at. Since every operation that modifies a Kona vector gives it
+    a new stamp, a repeated evaluation at an unchanged point is answered
+    from the cache without calling the solver. The least recently used
+    entry of each kind is evicted first.
+
+    Objective values are scalars, so they are always cached. Residual and
+    constraint vectors are only cached if ``vector_size`` is positive, in
+    which case the cache requests that many state and dual vectors from the
+    memory manager to store them.
+
+    Parameters
+    ----------
+    memory : KonaMemory
+    size : int
+        Maximum number of cached objective values. Zero turns the cache off.
+    vector_size : int, optional
+        Maximum number of cached residual and constraint vectors of each
+        kind. Zero turns off the caching of vector evaluations.
+
+    Attributes
+    ----------
+    size : int
+        Maximum number of cached objective values.
+    vector_size : int
+        Maximum number of cached residual and constraint vectors of each
+        kind.
+    hits : int
+        Number of evaluations answered from the cache.
+    misses : int
+        Number of evaluations passed on to the solver.
+    """
+
+    def __init__(self, memory, size, vector_size=0):
+        if size < 0 or vector_size < 0:
+            raise ValueError('EvaluationCache() >> ' +
+                             'Cache size cannot be negative.')
+        self.size = size
+        self.vector_size = vector_size
+        self.hits = 0
+        self.misses = 0
+        self._memory = memory
+        self._objective = OrderedDict()
+        self._vectors = {
+            StateVector : OrderedDict(),
+            DualVector : OrderedDict(),
+        }
+        if vector_size > 0:
+            memory.state_factory.request_num_vectors(vector_size)
+            memory.dual_factory.request_num_vectors(vector_size)
+
+    def _key(self, at_design, at_state):
+        return (at_design._version, at_state._version)
+
+    def get_objective(self, at_design, at_state):
+        """
+        Looks up the objective value at the given point.
+
+        Parameters
+        ----------
+        at_design : PrimalVector
+        at_state : StateVector
+
+        Returns
+        -------
+        float or None
+            Cached objective value, or None if it is not in the cache.
+        """
+        if self.size == 0:
+            return None
+        key = self._key(at_design, at_state)
+        value = self._objective.pop(key, None)
+        if value is None:
+            self.misses += 1
+            return None
+        self._objective[key] = value
+        self.hits += 1
+        return value
+
+    def put_objective(self, at_design, at_state, value):
+        """
+        Stores the objective value at the given point.
+
+        Parameters
+        ----------
+        at_design : PrimalVector
+        at_state : StateVector
+        value : float
+        """
+        if self.size == 0:
+            return
+        if len(self._objective) >= self.size:
+            self._objective.popitem(last=False)
+        self._objective[self._key(at_design, at_state)] = value
+
+    def get_vector(self, result, at_design, at_state):
+        """
+        Copies the cached residual or constraint vector at the given point
+        into ``result``, if there is one.
+
+        Parameters
+        ----------
+        result : StateVector or DualVector
+            Vector receiving the cached evaluation.
+        at_design : PrimalVector
+        at_state : StateVector
+
+        Returns
+        -------
+        boolean
+            True if the evaluation was found in the cache.
+        """
+        if self.vector_size == 0:
+            return False
+        entries = self._vectors[type(result)]
+        key = self._key(at_design, at_state)
+        cached = entries.pop(key, None)
+        if cached is None:
+            self.misses += 1
+            return False
+        entries[key] = cached
+        result.equals(cached)
+        self.hits += 1
+        return True
+
+    def put_vector(self, result, at_design, at_state):
+        """
+        Stores a copy of the residual or constraint vector evaluated at the
+        given point.
+
+        Parameters
+        ----------
+        result : StateVector or DualVector
+            Evaluation to be stored.
+        at_design : PrimalVector
+        at_state : StateVector
+        """
+        if self.vector_size == 0:
+            return
+        entries = self._vectors[type(result)]
+        if len(entries) >= self.vector_size:
+            cached = entries.popitem(last=False)[1]
+        else:
+            cached = self._memory._factories[type(result)].generate()
+        cached.equals(result)
+        entries[self._key(at_design, at_state)] = cached
+
+class StateCache(object):
+    """
+    Bounded cache of converged state solutions, keyed by design point.
+
+    Globalization strategies often return to designs whose state has
+    already been solved for, e.g. when a trust-region step is rejected. A
+    nonlinear solve is the most expensive operation in the optimization, so
+    converged solutions are kept in state vectors generated from the memory
+    manager, together with a copy of the design they were solved at. A
+    design matches a cached one if it has the same version stamp, or if the
+    two differ only by round-off. The least recently used solution is
+    evicted first, and its vectors are returned to the memory stack.
+
+    Parameters
+    ----------
+    memory : KonaMemory
+    size : int
+        Maximum number of cached state solutions. Zero turns the cache off.
+
+    Attributes
+    ----------
+    size : int
+        Maximum number of cached state solutions.
+    hits : int
+        Number of nonlinear solves answered from the cache.
+    misses : int
+        Number of nonlinear solves passed on to the solver.
+    """
+
+    def __init__(self, memory, size):
+        if size < 0:
+            raise ValueError('StateCache() >> ' +
+                             'Cache size cannot be negative.')
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._memory = memory
+        # (design, state) pairs, most recently used last
+        self._entries = []
+        if size > 0:
+            memory.primal_factory.request_num_vectors(size + 1)
+            memory.state_factory.request_num_vectors(size)
+
+    def _matches(self, at_design, design, work):
+        if design._version == at_design._version:
+            return True
+        work.equals_ax_p_by(1., at_design, -1., design)
+        scale = max(at_design.infty, design.infty)
+        return work.infty <= 10*EPS*scale
+
+    def get_state(self, result, at_design):
+        """
+        Copies the cached state solution at the given design into
+        ``result``, if there is one.
+
+        Parameters
+        ----------
+        result : StateVector
+            Vector receiving the cached solution.
+        at_design : PrimalVector
+
+        Returns
+        -------
+        boolean
+            True if the solution was found in the cache.
+        """
+        if self.size == 0:
+            return False
+        if len(self._entries) > 0:
+            work = self._memory.primal_factory.generate()
+            for i in xrange(len(self._entries) - 1, -1, -1):
+                design, state = self._entries[i]
+                if self._matches(at_design, design, work):
+                    work.release()
+                    self._entries.append(self._entries.pop(i))
+                    result.equals(state)
+                    self.hits += 1
+                    return True
+            work.release()
+        self.misses += 1
+        return False
+
+    def put_state(self, result, at_design):
+        """
+        Stores a copy of the state solution at the given design.
+
+        Parameters
+        ----------
+        result : StateVector
+            Converged state solution.
+        at_design : PrimalVector
+        """
+        if self.size == 0:
+            return
+        if len(self._entries) >= self.size:
+            design, state = self._entries.pop(0)
+            design.release()
+            state.release()
+        design = self._memory.primal_factory.generate()
+        state = self._memory.state_factory.generate()
+        design.equals(at_design)
+        state.equals(result)
+        self._entries.append((design, state))
+
+def _vector_bytes(user_vectors):
+    """
+    Size in bytes of one user vector, if the vectors store a NumPy-like
+    ``data`` array.
+
+    Parameters
+    ----------
+    user_vectors : list of BaseVector
+
+    Returns
+    -------
+    int or None
+    """
+    if len(user_vectors) == 0:
+        return None
+    nbytes = getattr(getattr(user_vectors[0], 'data', None), 'nbytes', None)
+    if nbytes is None:
+        return None
+    return int(nbytes)
+
+def _optional_method(allocator, name, base):
+    """
+    Looks up an optional allocator method, such as ``alloc_primal_low``.
+
+    The method is only used if it comes from the same class as the matching
+    required method (or from a subclass of it). Otherwise, an allocator that
+    overrides ``alloc_primal`` would inherit a method that produces vectors
+    of a different type than its own.
+
+    Parameters
+    ----------
+    allocator : BaseAllocator
+    name : string
+        Name of the optional method, e.g. ``'alloc_primal_low'``.
+    base : string
+        Name of the required method it belongs with, e.g.
+        ``'alloc_primal'``.
+
+    Returns
+    -------
+    function or None
+    """
+    method = getattr(allocator, name, None)
+    if method is None or name in getattr(allocator, '__dict__', {}):
+        return method
+
+    def owner(attr):
+        for cls in type(allocator).__mro__:
+            if attr in cls.__dict__:
+                return cls
+        return None
+
+    base_owner = owner(base)
+    method_owner = owner(name)
+    if base_owner is None or method_owner is None or \
+            issubclass(method_owner, base_owner):
+        return method
+    return None
+
+def _factory_report(factory):
+    """
+    Summarizes the vector memory usage of one factory.
+
+    Parameters
+    ----------
+    factory : VectorFactory
+
+    Returns
+    -------
+    dict
+    """
+    if factory.bytes_per_vec is None:
+        peak_bytes = None
+    else:
+        peak_bytes = factory.bytes_per_vec*factory.peak_live
+    components = {}
+    for comp, counts in factory.components.items():
+        components[comp] = dict(counts)
+    return {
+        'requested' : factory.num_vecs,
+        'requested_low' : factory.num_low_vecs,
+        'allocated' : factory.num_allocated,
+        'live' : factory.num_live,
+        'peak' : factory.peak_live,
+        'bytes_per_vec' : factory.bytes_per_vec,
+        'peak_bytes' : peak_bytes,
+        'components' : components,
+    }
+
 class KonaFile(object):
 
     def __init__(self, filename, rank):
@@ -90,6 +798,15 @@ class KonaMemory(object):
     ----------
     solver : UserSolver
         A user-defined solver object that implements specific elementary tasks.
+    optns : dict, optional
+        Memory options. ``'pool'`` turns on pool mode, where vectors are
+        allocated lazily in chunks of ``'chunk_size'`` vectors, up to at most
+        ``'max_vecs'`` vectors of each type (unlimited if None).
+        ``'eval_cache'`` sets the number of objective values kept by the
+        `EvaluationCache`, ``'eval_cache_vecs'`` the number of residual and
+        constraint vectors it keeps, and
+        ``'state_cache'`` the number of state solutions kept by the
+        `StateCache`.
 
     Attributes
     ----------
@@ -105,29 +822,98 @@ class KonaMemory(object):
         Counter for tracking optimization cost.
     vector_stack : dict
         Memory stack for unused vector data.
+    low_stack : dict
+        Memory stack for unused low-precision vector data.
+    low_ids : dict
+        Identities of all low-precision user data containers, used to return
+        them to the right stack.
+    stacked_ids : dict
+        Identities of the user data containers currently on each memory
+        stack, used to reject duplicate pushes in constant time.
+    packed_ids : set
+        Identities of the component views of packed KKT vectors, which are
+        returned to the memory stack together with their packed vector.
+    complex_ids : dict
+        Complex-valued user data containers keyed by their identities. They
+        are never returned to a memory stack, and are kept alive here so that
+        their identities are not reused.
     rank : int
         Processor rank.
+    pool : boolean
+        If True, vectors are allocated on demand instead of up front.
+    pool_chunk : int
+        Number of vectors allocated at once in pool mode.
+    pool_max_vecs : int or None
+        Cap on the number of vectors of each type in pool mode.
+    profilers : list
+        Active profilers, notified of each new outer iteration by
+        ``current_solution()``.
+    eval_cache : EvaluationCache
+        Cache of objective, residual and constraint evaluations.
+    state_cache : StateCache
+        Cache of converged state solutions.
+    linearization_key : tuple or None
+        Key of the (design, state) point last passed to the solver's
+        ``set_linearization()``.
     """
 
-    def __init__(self, solver):
+    def __init__(self, solver, optns={}):
         # assign user object
         self.solver = solver
         self.rank = self.solver.get_rank()
 
+        # pool mode settings
+        self.pool = get_opt(optns, False, 'pool')
+        self.pool_chunk = get_opt(optns, 8, 'chunk_size')
+        self.pool_max_vecs = get_opt(optns, None, 'max_vecs')
+        if self.pool_chunk < 1:
+            raise ValueError('KonaMemory() >> ' +
+                             'Pool chunk size must be at least 1.')
+
         # allocate vec assignments
         self.vector_stack = {
             PrimalVector : [],
             StateVector : [],
             DualVector : [],
         }
+        self.stacked_ids = {
+            PrimalVector : set(),
+            StateVector : set(),
+            DualVector : set(),
+        }
+        self.low_stack = {
+            PrimalVector : [],
+            StateVector : [],
+            DualVector : [],
+        }
+        self.low_ids = {
+            PrimalVector : set(),
+            StateVector : set(),
+            DualVector : set(),
+        }
+        self.packed_ids = set()
+        self.complex_ids = {}
 
         # prepare vector factories
         self.primal_factory = VectorFactory(self, PrimalVector)
         self.state_factory = VectorFactory(self, StateVector)
         self.dual_factory = VectorFactory(self, DualVector)
+        self._factories = {
+            PrimalVector : self.primal_factory,
+            StateVector : self.state_factory,
+            DualVector : self.dual_factory,
+        }
+        self._kkt_factories = {}
 
         # cost tracking
         self.cost = 0
+        self.profilers = []
+        self.linearization_key = None
+        self.eval_cache = EvaluationCache(
+            self, get_opt(optns, 8, 'eval_cache'),
+            get_opt(optns, 0, 'eval_cache_vecs'))
+        self.state_cache = StateCache(
+            self, get_opt(optns, 0, 'state_cache'))
 
         self.is_allocated = False
 
@@ -143,10 +929,18 @@ class KonaMemory(object):
         user_data : BaseVector
             Unused user vector data container.
         """
-        if user_data not in self.vector_stack[vec_type]:
-            self.vector_stack[vec_type].append(user_data)
+        if id(user_data) in self.packed_ids or \
+                id(user_data) in self.complex_ids:
+            return
+        if id(user_data) not in self.stacked_ids[vec_type]:
+            self.stacked_ids[vec_type].add(id(user_data))
+            if id(user_data) in self.low_ids[vec_type]:
+                self.low_stack[vec_type].append(user_data)
+            else:
+                self.vector_stack[vec_type].append(user_data)
+            self._factories[vec_type]._checkin(user_data)
 
-    def pop_vector(self, vec_type):
+    def pop_vector(self, vec_type, low_precision=False):
         """
         Take an unused user vector object out of the memory stack and serve it
         to the vector factory.
@@ -155,6 +949,8 @@ class KonaMemory(object):
         ----------
         vec_type : KonaVector
             Vector type to be popped from the stack.
+        low_precision : boolean, optional
+            If True, pop from the low-precision memory stack.
 
         Returns
         -------
@@ -164,8 +960,143 @@ class KonaMemory(object):
         if vec_type not in self.vector_stack.keys():
             raise TypeError('KonaMemory.pop_vector() >> ' +
                             'Unknown vector type!')
+        elif low_precision:
+            user_data = self.low_stack[vec_type].pop()
         else:
-            return self.vector_stack[vec_type].pop()
+            user_data = self.vector_stack[vec_type].pop()
+        self.stacked_ids[vec_type].discard(id(user_data))
+        return user_data
+
+    def kkt_factory(self, slack=False):
+        """
+        Returns the factory for `ReducedKKTVector` objects with or without
+        slack components, creating it on first use.
+
+        Parameters
+        ----------
+        slack : boolean, optional
+            If True, the vectors include slack components.
+
+        Returns
+        -------
+        KKTVectorFactory
+        """
+        factory = self._kkt_factories.get(slack)
+        if factory is None:
+            if self.is_allocated:
+                raise RuntimeError('KonaMemory() >> ' +
+                                   'Memory already allocated.')
+            factory = KKTVectorFactory(self, slack)
+            self._kkt_factories[slack] = factory
+        return factory
+
+    def _alloc_user_vectors(self, vec_type, count, low_precision=False):
+        allocator = self.solver.allocator
+        if vec_type is PrimalVector:
+            name = 'alloc_primal'
+        elif vec_type is StateVector:
+            name = 'alloc_state'
+        else:
+            name = 'alloc_dual'
+        # allocators without a low-precision path fall back to full precision
+        alloc = None
+        if low_precision:
+            alloc = _optional_method(allocator, name + '_low', name)
+        if alloc is None:
+            alloc = getattr(allocator, name)
+        new_data = alloc(count)
+        if low_precision:
+            self.low_ids[vec_type].update(id(data) for data in new_data)
+        return new_data
+
+    def dense_design_size(self):
+        """
+        Global size of the design space, if the user allocator supports
+        assembling dense matrices on it (see
+        `BaseAllocator.dense_primal_size`).
+
+        Returns
+        -------
+        int or None
+            Number of design variables, or None if dense assembly is not
+            supported.
+        """
+        size = _optional_method(
+            self.solver.allocator, 'dense_primal_size', 'alloc_primal')
+        if size is None:
+            return None
+        return size()
+
+    def alloc_complex(self, vec_type, count):
+        """
+        Allocate complex-valued vectors for complex-step differentiation.
+
+        These vectors are allocated directly from the user allocator's
+        ``alloc_*_complex()`` methods, outside of the vector factories and
+        the memory stacks. As with the low-precision methods, these are only
+        used if they are defined alongside the matching ``alloc_*()``
+        method. They are owned by the caller for the rest of the
+        optimization.
+
+        Parameters
+        ----------
+        vec_type : KonaVector
+            Vector type, either `PrimalVector` or `StateVector`.
+        count : int
+            Number of vectors requested.
+
+        Returns
+        -------
+        list of KonaVector
+            Vectors of the given type, wrapping complex-valued user data.
+        """
+        if vec_type is PrimalVector:
+            name = 'alloc_primal'
+        elif vec_type is StateVector:
+            name = 'alloc_state'
+        else:
+            raise TypeError('KonaMemory.alloc_complex() >> ' +
+                            'Unknown vector type!')
+        # inherited complex allocators would not match the user's vectors
+        alloc = _optional_method(
+            self.solver.allocator, name + '_complex', name)
+        if alloc is None:
+            raise NotImplementedError(
+                'KonaMemory.alloc_complex() >> ' +
+                'Allocator does not implement %s_complex()!'%name)
+        new_data = alloc(count)
+        self.complex_ids.update((id(data), data) for data in new_data)
+        return [vec_type(self, data) for data in new_data]
+
+    def grow_pool(self, vec_type, low_precision=False):
+        """
+        Allocate one more chunk of user vectors of the given type and push
+        them onto the memory stack, without exceeding the pool cap.
+
+        Parameters
+        ----------
+        vec_type : KonaVector
+            Vector type of the memory stack.
+        low_precision : boolean, optional
+            If True, grow the low-precision memory stack.
+        """
+        factory = self._factories[vec_type]
+        count = self.pool_chunk
+        if self.pool_max_vecs is not None:
+            count = min(count, self.pool_max_vecs - factory.num_allocated)
+        if count < 1:
+            return
+        new_data = self._alloc_user_vectors(vec_type, count, low_precision)
+        factory.num_allocated += count
+        if low_precision:
+            stack = self.low_stack[vec_type]
+        else:
+            stack = self.vector_stack[vec_type]
+            factory.bytes_per_vec = _vector_bytes(new_data)
+        # keep the stack ordered so the chunk is handed out front to back
+        for user_data in reversed(new_data):
+            self.stacked_ids[vec_type].add(id(user_data))
+            stack.append(user_data)
 
     def allocate_memory(self):
         """
@@ -174,21 +1105,96 @@ class KonaMemory(object):
         Once the number of required vectors are tallied up inside vector
         factories, this function will manipulate the user-defined solver object
         to allocate all actual, real memory required for the optimization.
+
+        In pool mode, nothing is allocated here. Vectors are allocated in
+        chunks as they are generated.
         """
 
         if self.is_allocated:
             raise RuntimeError('Memory allready allocated, can-not re-allocate')
 
-        allocator = self.solver.allocator
+        # KKT factories either allocate packed vectors, or hand their
+        # requests over to the component factories
+        for factory in self._kkt_factories.values():
+            factory._setup()
 
-        self.vector_stack[PrimalVector] = \
-            allocator.alloc_primal(self.primal_factory.num_vecs)
-        self.vector_stack[StateVector] = \
-            allocator.alloc_state(self.state_factory.num_vecs)
-        self.vector_stack[DualVector] = \
-            allocator.alloc_dual(self.dual_factory.num_vecs)
+        if not self.pool:
+            for vec_type in [PrimalVector, StateVector, DualVector]:
+                factory = self._factories[vec_type]
+                self.vector_stack[vec_type] = \
+                    self._alloc_user_vectors(vec_type, factory.num_vecs)
+                factory.num_allocated = factory.num_vecs
+                factory.bytes_per_vec = _vector_bytes(
+                    self.vector_stack[vec_type])
+                if factory.num_low_vecs > 0:
+                    self.low_stack[vec_type] = self._alloc_user_vectors(
+                        vec_type, factory.num_low_vecs, low_precision=True)
+                    factory.num_allocated += factory.num_low_vecs
+        for vec_type in self.vector_stack.keys():
+            self.stacked_ids[vec_type] = set(
+                id(data) for data in
+                self.vector_stack[vec_type] + self.low_stack[vec_type])
 
         self.is_allocated = True
 
+    def memory_report(self):
+        """
+        Summarizes vector memory usage for each vector type.
+
+        Returns
+        -------
+        dict
+            For each of ``'primal'``, ``'state'`` and ``'dual'``, a dictionary
+            with the requested (full and low precision), allocated, live and
+            peak vector counts, the bytes per full-precision vector and at the
+            peak (None if unknown), and the live and peak counts of each
+            component that generated vectors. Packed KKT vectors (see
+            `KKTVectorFactory`) are reported in the same way under ``'kkt'``
+            and ``'kkt_slack'``.
+        """
+        report = {}
+        for name, factory in [('primal', self.primal_factory),
+                              ('state', self.state_factory),
+                              ('dual', self.dual_factory)]:
+            report[name] = _factory_report(factory)
+        for slack, factory in self._kkt_factories.items():
+            if factory.packed:
+                if slack:
+                    report['kkt_slack'] = _factory_report(factory)
+                else:
+                    report['kkt'] = _factory_report(factory)
+        return report
+
+    def write_memory_report(self, out_file):
+        """
+        Writes the memory usage summary to the given file.
+
+        Parameters
+        ----------
+        out_file : file
+        """
+        report = self.memory_report()
+        out_file.write('\n' +
+            '# Kona vector memory usage\n' +
+            '# %-8s %10s %10s %10s %10s %14s\n'%(
+                'type', 'requested', 'allocated', 'live', 'peak',
+                'peak bytes'))
+        for name in ['primal', 'state', 'dual', 'kkt', 'kkt_slack']:
+            if name not in report:
+                continue
+            entry = report[name]
+            peak_bytes = entry['peak_bytes']
+            if peak_bytes is None:
+                peak_bytes = 'n/a'
+            out_file.write(
+                '# %-8s %10d %10d %10d %10d %14s\n'%(
+                    name, entry['requested'], entry['allocated'],
+                    entry['live'], entry['peak'], peak_bytes))
+            for comp in sorted(entry['components'].keys()):
+                counts = entry['components'][comp]
+                out_file.write(
+                    '#   %-28s %10d %10d\n'%(
+                        comp, counts['live'], counts['peak']))
+
     def open_file(self, filename):
         return KonaFile(filename, self.rank)
@@ -0,0 +1,394 @@
+import json
+from timeit import default_timer
+
+import numpy as np
+
+from kona.linalg.vectors.common import KonaVector
+from kona.linalg.vectors.composite import CompositeVector
+
+# vector algebra methods instrumented by the VectorProfiler
+_vector_methods = [
+    'equals', 'plus', 'minus', 'times', 'divide_by', 'equals_ax_p_by',
+    'equals_lin_comb', 'exp', 'log', 'pow', 'inner', 'inner_many',
+]
+_vector_properties = ['norm2', 'infty']
+
+# user solver callbacks instrumented by the SolverProfiler
+_solver_callbacks = [
+    'eval_obj', 'eval_residual', 'eval_constraints',
+    'multiply_dRdX', 'multiply_dRdU', 'multiply_dRdX_T', 'multiply_dRdU_T',
+    'set_linearization', 'factor_linear_system', 'apply_precond',
+    'apply_precond_T',
+    'multiply_dCdX', 'multiply_dCdU', 'multiply_dCdX_T', 'multiply_dCdU_T',
+    'multiply_dRdX_block', 'multiply_dRdU_block', 'multiply_dRdX_T_block',
+    'multiply_dRdU_T_block', 'multiply_dCdX_block', 'multiply_dCdU_block',
+    'multiply_dCdX_T_block', 'multiply_dCdU_T_block',
+    'multiply_d2LdX2', 'multiply_d2LdXdU', 'multiply_d2LdXdU_T',
+    'multiply_d2LdU2',
+    'restrict_dual', 'eval_dFdX', 'eval_dFdU', 'init_design',
+    'solve_nonlinear', 'solve_linear', 'solve_adjoint', 'current_solution',
+    'solve_linear_block', 'solve_adjoint_block',
+    'restrict_design', 'copy_dual_to_targstate', 'copy_targstate_to_dual',
+]
+
+def _nbytes(vector):
+    """
+    Number of bytes held by a Kona vector, if its user data stores a
+    NumPy-like ``data`` array.
+
+    Parameters
+    ----------
+    vector : KonaVector or CompositeVector
+
+    Returns
+    -------
+    int
+    """
+    if isinstance(vector, CompositeVector):
+        if vector._packed is not None:
+            return getattr(getattr(vector._packed, 'data', None), 'nbytes', 0)
+        return sum(_nbytes(component) for component in vector._vectors)
+    return getattr(getattr(vector._data, 'data', None), 'nbytes', 0)
+
+def _operand_bytes(vector, args):
+    """
+    Number of bytes touched by a vector operation, counting each vector
+    operand once.
+
+    Parameters
+    ----------
+    vector : KonaVector or CompositeVector
+        Vector the operation is called on.
+    args : tuple
+        Arguments of the operation.
+
+    Returns
+    -------
+    int
+    """
+    total = _nbytes(vector)
+    for arg in args:
+        if isinstance(arg, (KonaVector, CompositeVector)):
+            total += _nbytes(arg)
+        elif isinstance(arg, list):
+            for item in arg:
+                if isinstance(item, (KonaVector, CompositeVector)):
+                    total += _nbytes(item)
+    return total
+
+class VectorProfiler(object):
+    """
+    Opt-in instrumentation of Kona's vector algebra.
+
+    While the profiler is running, every algebra operation on `KonaVector`
+    and `CompositeVector` objects (e.g.: ``inner``, ``equals_ax_p_by``,
+    ``norm2``) records its call count, the bytes of vector data it touches
+    and its wall time. Records are kept per outer iteration of the
+    optimization, and per call stack of vector operations, so that the time
+    a composite operation spends in its components can be told apart. The
+    time of an operation includes the time of any nested operations.
+
+    Outer iterations are advanced by ``current_solution()``, which every
+    optimization algorithm calls once per iteration.
+
+    .. note::
+
+        The profiler patches the vector classes, so only one profiler can
+        run at a time, and all vectors are profiled while it runs.
+
+    Attributes
+    ----------
+    iteration : int
+        Outer iteration that operations are currently recorded under.
+    records : dict
+        For each outer iteration, a dictionary mapping call stacks (tuples
+        of ``'VectorType.operation'`` strings, outermost first) to
+        ``[calls, bytes, time]`` lists.
+    """
+
+    _running = None
+
+    def __init__(self):
+        self.iteration = 0
+        self.records = {}
+        self._stack = []
+        self._saved = {}
+
+    def start(self):
+        """
+        Starts recording vector operations.
+        """
+        if VectorProfiler._running is not None:
+            raise RuntimeError('VectorProfiler() >> ' +
+                               'Another profiler is already running.')
+        VectorProfiler._running = self
+        for cls in [KonaVector, CompositeVector]:
+            for name in _vector_methods:
+                func = cls.__dict__[name]
+                self._saved[(cls, name)] = func
+                setattr(cls, name, self._wrap(name, func))
+            for name in _vector_properties:
+                prop = cls.__dict__[name]
+                self._saved[(cls, name)] = prop
+                setattr(cls, name, property(self._wrap(name, prop.fget)))
+
+    def stop(self):
+        """
+        Stops recording and restores the original vector operations.
+        """
+        if VectorProfiler._running is not self:
+            return
+        for (cls, name), func in self._saved.items():
+            setattr(cls, name, func)
+        self._saved = {}
+        self._stack = []
+        VectorProfiler._running = None
+
+    def next_iteration(self, num_iter):
+        """
+        Records subsequent operations under the given outer iteration.
+
+        Parameters
+        ----------
+        num_iter : int
+        """
+        self.iteration = num_iter
+
+    def _wrap(self, name, func):
+        profiler = self
+
+        def wrapper(vector, *args):
+            profiler._stack.append('%s.%s'%(type(vector).__name__, name))
+            start = default_timer()
+            try:
+                return func(vector, *args)
+            finally:
+                elapsed = default_timer() - start
+                stack = tuple(profiler._stack)
+                profiler._stack.pop()
+                records = profiler.records.setdefault(profiler.iteration, {})
+                record = records.get(stack)
+                if record is None:
+                    record = [0, 0, 0.0]
+                    records[stack] = record
+                record[0] += 1
+                record[1] += _operand_bytes(vector, args)
+                record[2] += elapsed
+
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+
+    def summary(self):
+        """
+        Totals per outer iteration and operation, over all call stacks.
+
+        Returns
+        -------
+        dict
+            For each outer iteration, a dictionary mapping
+            ``'VectorType.operation'`` strings to dictionaries with the
+            ``'calls'``, ``'bytes'`` and ``'time'`` totals.
+        """
+        summary = {}
+        for iteration, records in self.records.items():
+            totals = {}
+            for stack, record in records.items():
+                entry = totals.setdefault(
+                    stack[-1], {'calls' : 0, 'bytes' : 0, 'time' : 0.0})
+                entry['calls'] += record[0]
+                entry['bytes'] += record[1]
+                entry['time'] += record[2]
+            summary[iteration] = totals
+        return summary
+
+    def write_summary(self, out_file):
+        """
+        Writes the per-iteration operation totals to the given file.
+
+        Parameters
+        ----------
+        out_file : file
+        """
+        summary = self.summary()
+        out_file.write('\n' +
+            '# Kona vector operation profile\n' +
+            '# %6s %-40s %10s %14s %14s\n'%(
+                'iter', 'operation', 'calls', 'bytes', 'time (s)'))
+        for iteration in sorted(summary.keys()):
+            totals = summary[iteration]
+            for op in sorted(totals.keys()):
+                entry = totals[op]
+                out_file.write(
+                    '# %6i %-40s %10i %14i %14e\n'%(
+                        iteration, op, entry['calls'], entry['bytes'],
+                        entry['time']))
+
+    def write_json(self, out_file):
+        """
+        Writes the raw records as JSON, with one entry per outer iteration
+        and call stack. The stacks can be converted directly into the
+        folded format used by flame graph tools.
+
+        Parameters
+        ----------
+        out_file : file or string
+            File object, or the name of the file to write.
+        """
+        data = {'iterations' : []}
+        for iteration in sorted(self.records.keys()):
+            stacks = []
+            for stack, record in sorted(self.records[iteration].items()):
+                stacks.append({
+                    'stack' : list(stack),
+                    'calls' : record[0],
+                    'bytes' : record[1],
+                    'time' : record[2],
+                })
+            data['iterations'].append(
+                {'iteration' : iteration, 'stacks' : stacks})
+        if isinstance(out_file, str):
+            with open(out_file, 'w') as json_file:
+                json.dump(data, json_file, indent=1)
+        else:
+            json.dump(data, out_file, indent=1)
+
+class SolverProfiler(object):
+    """
+    Opt-in instrumentation of the user solver callbacks.
+
+    While the profiler is running, every call Kona makes to the user solver
+    (e.g.: ``multiply_dRdU_T``, ``solve_nonlinear``, ``eval_constraints``)
+    is counted and timed. Durations are kept per outer iteration, which is
+    advanced by ``current_solution()`` like for the `VectorProfiler`.
+
+    The callbacks are wrapped on the solver instance only, so other solver
+    objects are not affected. Calls the solver makes to its own callbacks
+    are recorded as well.
+
+    Parameters
+    ----------
+    solver : UserSolver
+        Solver to be profiled.
+
+    Attributes
+    ----------
+    solver : UserSolver
+        Solver being profiled.
+    iteration : int
+        Outer iteration that calls are currently recorded under.
+    records : dict
+        For each outer iteration, a dictionary mapping callback names to
+        lists of call durations in seconds.
+    """
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.iteration = 0
+        self.records = {}
+        self._saved = None
+
+    def start(self):
+        """
+        Starts recording solver callbacks.
+        """
+        if self._saved is not None:
+            raise RuntimeError('SolverProfiler() >> ' +
+                               'Profiler is already running.')
+        self._saved = {}
+        for name in _solver_callbacks:
+            if not hasattr(self.solver, name):
+                continue
+            # remember instance attributes that shadow the class methods
+            self._saved[name] = self.solver.__dict__.get(name)
+            setattr(self.solver, name,
+                    self._wrap(name, getattr(self.solver, name)))
+
+    def stop(self):
+        """
+        Stops recording and restores the original solver callbacks.
+        """
+        if self._saved is None:
+            return
+        for name, func in self._saved.items():
+            if func is None:
+                delattr(self.solver, name)
+            else:
+                setattr(self.solver, name, func)
+        self._saved = None
+
+    def next_iteration(self, num_iter):
+        """
+        Records subsequent calls under the given outer iteration.
+
+        Parameters
+        ----------
+        num_iter : int
+        """
+        self.iteration = num_iter
+
+    def _wrap(self, name, func):
+        profiler = self
+
+        def wrapper(*args, **kwargs):
+            start = default_timer()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = default_timer() - start
+                records = profiler.records.setdefault(profiler.iteration, {})
+                records.setdefault(name, []).append(elapsed)
+
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+
+    def summary(self):
+        """
+        Call statistics per outer iteration and callback.
+
+        Returns
+        -------
+        dict
+            For each outer iteration, a dictionary mapping callback names to
+            dictionaries with the number of ``'calls'``, the ``'total'``
+            time, and the 50th, 90th and 100th percentiles ``'p50'``,
+            ``'p90'`` and ``'max'`` of the call durations.
+        """
+        summary = {}
+        for iteration, records in self.records.items():
+            stats = {}
+            for name, durations in records.items():
+                p50, p90, pmax = np.percentile(durations, [50, 90, 100])
+                stats[name] = {
+                    'calls' : len(durations),
+                    'total' : sum(durations),
+                    'p50' : p50,
+                    'p90' : p90,
+                    'max' : pmax,
+                }
+            summary[iteration] = stats
+        return summary
+
+    def write_summary(self, out_file):
+        """
+        Writes the per-iteration callback statistics to the given file.
+
+        Parameters
+        ----------
+        out_file : file
+        """
+        summary = self.summary()
+        out_file.write('\n' +
+            '# Kona solver callback profile\n' +
+            '# %6s %-24s %8s %12s %12s %12s %12s\n'%(
+                'iter', 'callback', 'calls', 'total (s)', 'p50 (s)',
+                'p90 (s)', 'max (s)'))
+        for iteration in sorted(summary.keys()):
+            stats = summary[iteration]
+            for name in sorted(stats.keys()):
+                entry = stats[name]
+                out_file.write(
+                    '# %6i %-24s %8i %12e %12e %12e %12e\n'%(
+                        iteration, name, entry['calls'], entry['total'],
+                        entry['p50'], entry['p90'], entry['max']))
@@ -1,16 +1,25 @@
 import numpy
 
 from kona.options import get_opt
-from kona.linalg.vectors.composite import ReducedKKTVector
-from kona.linalg.vectors.composite import CompositePrimalVector
 from kona.linalg.solvers.krylov.basic import KrylovSolver
 from kona.linalg.solvers.util import \
     EPS, write_header, write_history, \
-    generate_givens, apply_givens, mod_gram_schmidt
+    generate_givens, apply_givens, mod_gram_schmidt, cgs2
 
 class FGMRES(KrylovSolver):
     """
     Flexible Generalized Minimum RESidual solver.
+
+    Attributes
+    ----------
+    orthog : string
+        Gram-Schmidt variant used in the Arnoldi process: ``'mgs'`` for
+        modified Gram-Schmidt, or ``'cgs2'`` for classical Gram-Schmidt with
+        re-orthogonalization.
+    basis_precision : string
+        Storage precision of the Krylov basis vectors: ``'double'``, or
+        ``'single'`` to store the basis in low-precision vectors. Residuals,
+        solutions and inner products remain in double precision.
     """
 
     def __init__(self, vector_factory, optns={}, dual_factory=None):
@@ -19,21 +28,38 @@ class FGMRES(KrylovSolver):
         # get relative tolerance
         self.rel_tol = get_opt(optns, 0.5, 'rel_tol')
 
+        # get the orthogonalization method
+        self.orthog = get_opt(optns, 'mgs', 'orthogonalization')
+
+        # get the storage precision of the basis
+        self.basis_precision = get_opt(optns, 'double', 'basis_precision')
+        low = (self.basis_precision == 'single')
+
         # put in memory request
-        self.vec_fac.request_num_vectors(2*self.max_iter + 1)
         self.dual_fac = dual_factory
-        if self.dual_fac is not None:
-            self.dual_fac.request_num_vectors(4*self.max_iter + 2)
-
-    def _generate_vector(self):
         if self.dual_fac is None:
-            return self.vec_fac.generate()
+            fac = self.vec_fac
         else:
-            design = self.vec_fac.generate()
-            slack = self.dual_fac.generate()
-            primal = CompositePrimalVector(design, slack)
-            dual = self.dual_fac.generate()
-            return ReducedKKTVector(primal, dual)
+            self.kkt_fac = self.vec_fac._memory.kkt_factory(slack=True)
+            fac = self.kkt_fac
+        fac.request_num_vectors(2*self.max_iter + 1, low)
+        if low:
+            # double precision work vector for the Arnoldi process
+            fac.request_num_vectors(1)
+
+    def _validate_options(self):
+        super(FGMRES, self)._validate_options()
+        if self.orthog not in ['mgs', 'cgs2']:
+            raise ValueError('orthogonalization must be \'mgs\' or \'cgs2\'')
+        if self.basis_precision not in ['double', 'single']:
+            raise ValueError(
+                'basis_precision must be \'double\' or \'single\'')
+
+    def _generate_vector(self, low_precision=False):
+        if self.dual_fac is None:
+            return self.vec_fac.generate(low_precision)
+        else:
+            return self.kkt_fac.generate(low_precision)
 
     def solve(self, mat_vec, b, x, precond):
         # validate solver options
@@ -49,14 +75,24 @@ class FGMRES(KrylovSolver):
         H = numpy.matrix(numpy.zeros((self.max_iter + 1, self.max_iter)))
         iters = 0
 
+        # with a low-precision basis, new basis vectors are built in a double
+        # precision work vector and only stored once orthonormalized
+        low = (self.basis_precision == 'single')
+        if low:
+            work = self._generate_vector()
+
         # calculate norm of rhs vector
         norm0 = b.norm2
 
         # calculate and store the initial residual
-        W.append(self._generate_vector())
-        mat_vec(x, W[0])
-        W[0].minus(b)
-        beta = W[0].norm2
+        W.append(self._generate_vector(low))
+        if low:
+            res = work
+        else:
+            res = W[0]
+        mat_vec(x, res)
+        res.minus(b)
+        beta = res.norm2
 
         if (beta < self.rel_tol*norm0) or (beta < EPS):
             # system is already solved
@@ -64,7 +100,9 @@ class FGMRES(KrylovSolver):
             return iters, beta
 
         # normalize the residual
-        W[0].divide_by(beta)
+        res.divide_by(beta)
+        if low:
+            W[0].equals(res)
 
         # initialize RHS of reduced system
         g[0] = beta
@@ -91,18 +129,27 @@ class FGMRES(KrylovSolver):
             iters += 1
 
             # precondition W[i] and store result in Z[i]
-            Z.append(self._generate_vector())
+            Z.append(self._generate_vector(low))
             precond(W[i], Z[i])
 
             # add to krylov subspace
-            W.append(self._generate_vector())
-            mat_vec(Z[i], W[i+1])
-
-            # try modified Gram-Schmidt orthogonalization
+            W.append(self._generate_vector(low))
+            if low:
+                new_vec = work
+            else:
+                new_vec = W[i+1]
+            mat_vec(Z[i], new_vec)
+
+            # try Gram-Schmidt orthogonalization
             try:
-                mod_gram_schmidt(i, H, W)
+                if self.orthog == 'cgs2':
+                    cgs2(i, H, W[:i+1] + [new_vec])
+                else:
+                    mod_gram_schmidt(i, H, W[:i+1] + [new_vec])
             except numpy.linalg.LinAlgError:
                 self.lin_depend = True
+            if low:
+                W[i+1].equals(new_vec)
 
             # apply old Givens rotations to new column of the Hessenberg matrix
             # then generate new Givens rotation matrix and apply it to the last
@@ -124,14 +171,17 @@ class FGMRES(KrylovSolver):
 
         # solve the least squares system
         y[:i] = numpy.linalg.solve(H[:i, :i], -g[:i])
-        for k in xrange(i):
-            x.equals_ax_p_by(1.0, x, y[k], Z[k])
+        x.equals_lin_comb(numpy.concatenate(([1.0], y[:i])), [x] + Z[:i])
 
         if self.check_res:
             # recalculate explicitly and check final residual
-            mat_vec(x, W[0])
-            W[0].equals_ax_p_by(1.0, b, -1.0, W[0])
-            true_res = W[0].norm2
+            if low:
+                res = work
+            else:
+                res = W[0]
+            mat_vec(x, res)
+            res.equals_ax_p_by(1.0, b, -1.0, res)
+            true_res = res.norm2
             self.out_file.write(
                 '# FGMRES final (true) residual : ' +
                 '|res|/|res0| = %e\n'%(true_res/norm0)
@@ -1,14 +1,11 @@
-import gc
 import numpy
 from numpy import sqrt
 
 from kona.options import get_opt
 from kona.linalg.vectors.common import PrimalVector, DualVector
-from kona.linalg.vectors.composite import ReducedKKTVector
-from kona.linalg.vectors.composite import CompositePrimalVector
 from kona.linalg.solvers.krylov.basic import KrylovSolver
 from kona.linalg.solvers.util import \
-    solve_tri, solve_trust_reduced, eigen_decomp, mod_gram_schmidt, EPS
+    solve_tri, solve_trust_reduced, eigen_decomp, mod_gram_schmidt, cgs2, EPS
 
 class FLECS(KrylovSolver):
     """
@@ -24,6 +21,8 @@ class FLECS(KrylovSolver):
         Factory for PrimalVector objects.
     dual_factory : VectorFactory
         Factory for DualVector objects.
+    kkt_factory : KKTVectorFactory
+        Factory for the ReducedKKTVector objects used by the solver.
     mu : float
         Quadratic subproblem constraint penalty factor.
     grad_scale : float
@@ -36,6 +35,14 @@ class FLECS(KrylovSolver):
         Flag for negative curvature in the search direction.
     trust_active : boolean
         Flag for trust-region detection.
+    orthog : string
+        Gram-Schmidt variant used in the Arnoldi process: ``'mgs'`` for
+        modified Gram-Schmidt, or ``'cgs2'`` for classical Gram-Schmidt with
+        re-orthogonalization.
+    basis_precision : string
+        Storage precision of the Krylov basis vectors: ``'double'``, or
+        ``'single'`` to store the basis in low-precision vectors. Residuals,
+        solutions and inner products remain in double precision.
 
     Parameters
     ----------
@@ -62,6 +69,12 @@ class FLECS(KrylovSolver):
         self.grad_scale = get_opt(optns, 1.0, 'grad_scale')
         self.feas_scale = get_opt(optns, 1.0, 'feas_scale')
 
+        # get the orthogonalization method
+        self.orthog = get_opt(optns, 'mgs', 'orthogonalization')
+
+        # get the storage precision of the basis
+        self.basis_precision = get_opt(optns, 'double', 'basis_precision')
+
         # extract vector factories from the factory array
         self.primal_factory = None
         self.dual_factory = None
@@ -72,19 +85,20 @@ class FLECS(KrylovSolver):
                 self.dual_factory = factory
 
         # put in memory request
-        self.primal_factory.request_num_vectors(2*self.max_iter + 2)
-        self.dual_factory.request_num_vectors(2*(2*self.max_iter + 2))
+        self.kkt_factory = self.primal_factory._memory.kkt_factory(slack=True)
+        if self.basis_precision == 'single':
+            # V and Z in low precision, residual and work vector in double
+            self.kkt_factory.request_num_vectors(2*self.max_iter + 1, True)
+            self.kkt_factory.request_num_vectors(2)
+        else:
+            self.kkt_factory.request_num_vectors(2*self.max_iter + 2)
 
         # initialize vector holder arrays
         self.V = []
         self.Z = []
 
-    def _generate_vector(self):
-        design = self.primal_factory.generate()
-        slack = self.dual_factory.generate()
-        primal = CompositePrimalVector(design, slack)
-        dual = self.dual_factory.generate()
-        return ReducedKKTVector(primal, dual)
+    def _generate_vector(self, low_precision=False):
+        return self.kkt_factory.generate(low_precision)
 
     def _validate_options(self):
         super(FLECS, self)._validate_options()
@@ -92,30 +106,23 @@ class FLECS(KrylovSolver):
         if (self.primal_factory is None) or (self.dual_factory is None):
             raise TypeError('wrong vector factory types')
 
+        if self.orthog not in ['mgs', 'cgs2']:
+            raise ValueError('orthogonalization must be \'mgs\' or \'cgs2\'')
+
+        if self.basis_precision not in ['double', 'single']:
+            raise ValueError(
+                'basis_precision must be \'double\' or \'single\'')
+
     def _reset(self):
-        # clear out all the vectors stored in V
-        # the data goes back to the stack and is used again later
+        # return all the vectors stored in V and Z to the memory stack
+        # the data is used again later
         for vector in self.V:
-            del vector._primal._design
-            del vector._primal._slack
-            del vector._primal
-            del vector._dual
-            del vector
+            vector.release()
         self.V = []
-
-        # clear out all vectors stored in Z
-        # the data goes back to the stack and is used again later
         for vector in self.Z:
-            del vector._primal._design
-            del vector._primal._slack
-            del vector._primal
-            del vector._dual
-            del vector
+            vector.release()
         self.Z = []
 
-        # force garbage collection
-        gc.collect()
-
     def _write_header(self, norm0, grad0, feas0):
         self.out_file.write(
             '#-------------------------------------------------\n' +
@@ -162,10 +169,9 @@ class FLECS(KrylovSolver):
 
         # construct the design update
         # leave the dual solution untouched
-        step._primal.equals(0.0)
-        for k in xrange(self.iters):
-            step._primal.equals_ax_p_by(
-                1.0, step._primal, self.y[k], self.Z[k]._primal)
+        step._primal.equals_lin_comb(
+            self.y[:self.iters],
+            [self.Z[k]._primal for k in xrange(self.iters)])
 
         # trust radius check
         # NOTE: THIS IS TEMPORARY
@@ -297,20 +303,32 @@ class FLECS(KrylovSolver):
         res = self._generate_vector()
         res.equals(b)
 
+        # with a low-precision basis, new basis vectors are built in a double
+        # precision work vector and only stored once orthonormalized
+        low = (self.basis_precision == 'single')
+        if low:
+            work = self._generate_vector()
+
         # calculate norm of rhs vector
         grad0 = b._primal.norm2
         feas0 = max(b._dual.norm2, EPS)
         norm0 = b.norm2
 
         # calculate initial (negative) residual and compute its norm
-        self.V.append(self._generate_vector())
-        self.V[0].equals(b)
-        self.V[0]._primal.times(self.grad_scale)
-        self.V[0]._dual.times(self.feas_scale)
+        self.V.append(self._generate_vector(low))
+        if low:
+            new_vec = work
+        else:
+            new_vec = self.V[0]
+        new_vec.equals(b)
+        new_vec._primal.times(self.grad_scale)
+        new_vec._dual.times(self.feas_scale)
 
         # normalize the residual
-        self.beta = self.V[0].norm2
-        self.V[0].divide_by(self.beta)
+        self.beta = new_vec.norm2
+        new_vec.divide_by(self.beta)
+        if low:
+            self.V[0].equals(new_vec)
         self.VtV_dual[0, 0] = self.V[0]._dual.inner(self.V[0]._dual)
         self.gamma = self.beta*sqrt(max(self.VtV_dual[0, 0], 0.0))
         self.omega = sqrt(max(self.beta**2 - self.gamma**2, 0.0))
@@ -341,42 +359,53 @@ class FLECS(KrylovSolver):
             self.iters += 1
 
             # precondition self.V[i] and store results in self.Z[i]
-            self.Z.append(self._generate_vector())
+            self.Z.append(self._generate_vector(low))
             precond(self.V[i], self.Z[i])
 
             # add to Krylov subspace
-            self.V.append(self._generate_vector())
+            self.V.append(self._generate_vector(low))
+            if not low:
+                new_vec = self.V[i+1]
             self.Z[i]._primal.times(self.grad_scale)
             self.Z[i]._dual.times(self.feas_scale)
-            mat_vec(self.Z[i], self.V[i+1])
+            mat_vec(self.Z[i], new_vec)
             self.Z[i]._primal.divide_by(self.grad_scale)
             self.Z[i]._dual.divide_by(self.feas_scale)
-            self.V[i+1]._primal.times(self.grad_scale)
-            self.V[i+1]._dual.times(self.feas_scale)
+            new_vec._primal.times(self.grad_scale)
+            new_vec._dual.times(self.feas_scale)
 
-            # modified Gram-Schmidt orthonogalization
+            # Gram-Schmidt orthonogalization
             try:
-                mod_gram_schmidt(i, self.H, self.V)
+                if self.orthog == 'cgs2':
+                    cgs2(i, self.H, self.V[:i+1] + [new_vec])
+                else:
+                    mod_gram_schmidt(i, self.H, self.V[:i+1] + [new_vec])
             except numpy.linalg.LinAlgError:
                 self.lin_depend = True
+            if low:
+                self.V[i+1].equals(new_vec)
 
             # compute new row and column of the VtZ matrix
-            for k in xrange(i+1):
-                self.VtZ_prim[k, i] = self.V[k]._primal.inner(self.Z[i]._primal)
-                self.VtZ_prim[i+1, k] = self.V[i+1]._primal.inner(
-                    self.Z[k]._primal)
+            V_prim = [self.V[k]._primal for k in xrange(i+1)]
+            V_dual = [self.V[k]._dual for k in xrange(i+1)]
+            Z_prim = [self.Z[k]._primal for k in xrange(i+1)]
+            Z_dual = [self.Z[k]._dual for k in xrange(i+1)]
+
+            self.VtZ_prim[:i+1, i] = self.Z[i]._primal.inner_many(V_prim)
+            self.VtZ_prim[i+1, :i+1] = self.V[i+1]._primal.inner_many(Z_prim)
 
-                self.VtZ_dual[k, i] = self.V[k]._dual.inner(self.Z[i]._dual)
-                self.VtZ_dual[i+1, k] = self.V[i+1]._dual.inner(self.Z[k]._dual)
+            self.VtZ_dual[:i+1, i] = self.Z[i]._dual.inner_many(V_dual)
+            self.VtZ_dual[i+1, :i+1] = self.V[i+1]._dual.inner_many(Z_dual)
 
-                self.VtZ[k, i] = self.VtZ_prim[k, i] + self.VtZ_dual[k, i]
-                self.VtZ[i+1, k] = self.VtZ_prim[i+1, k] + self.VtZ_dual[i+1, k]
+            self.VtZ[:i+1, i] = self.VtZ_prim[:i+1, i] + self.VtZ_dual[:i+1, i]
+            self.VtZ[i+1, :i+1] = \
+                self.VtZ_prim[i+1, :i+1] + self.VtZ_dual[i+1, :i+1]
 
-                self.ZtZ_prim[k, i] = self.Z[k]._primal.inner(self.Z[i]._primal)
-                self.ZtZ_prim[i, k] = self.Z[i]._primal.inner(self.Z[k]._primal)
+            self.ZtZ_prim[:i+1, i] = self.Z[i]._primal.inner_many(Z_prim)
+            self.ZtZ_prim[i, :i+1] = self.ZtZ_prim[:i+1, i]
 
-                self.VtV_dual[k, i+1] = self.V[k]._dual.inner(self.V[i+1]._dual)
-                self.VtV_dual[i+1, k] = self.V[i+1]._dual.inner(self.V[k]._dual)
+            self.VtV_dual[:i+1, i+1] = self.V[i+1]._dual.inner_many(V_dual)
+            self.VtV_dual[i+1, :i+1] = self.VtV_dual[:i+1, i+1]
 
             self.VtV_dual[i+1, i+1] = self.V[i+1]._dual.inner(self.V[i+1]._dual)
 
@@ -413,12 +442,12 @@ class FLECS(KrylovSolver):
             self.out_file.write('# trust-radius constraint active\n')
 
         # compute solution: augmented-Lagrangian for primal, FGMRES for dual
-        x.equals(0.0)
-        for k in xrange(self.iters):
-            x._primal.equals_ax_p_by(
-                1.0, x._primal, self.y_aug[k], self.Z[k]._primal)
-            x._dual.equals_ax_p_by(
-                1.0, x._dual, self.y_mult[k], self.Z[k]._dual)
+        x._primal.equals_lin_comb(
+            self.y_aug[:self.iters],
+            [self.Z[k]._primal for k in xrange(self.iters)])
+        x._dual.equals_lin_comb(
+            self.y_mult[:self.iters],
+            [self.Z[k]._dual for k in xrange(self.iters)])
 
         # scale the solution
         x._primal.times(self.grad_scale)
@@ -427,11 +456,13 @@ class FLECS(KrylovSolver):
         # check residual
         if self.check_res:
             # calculate true residual for the solution
-            self.V[0].equals(0.0)
-            for k in xrange(self.iters):
-                self.V[0].equals_ax_p_by(
-                    1.0, self.V[0], self.y_mult[k], self.Z[k])
-            mat_vec(self.V[0], res)
+            if low:
+                sol = work
+            else:
+                sol = self.V[0]
+            sol.equals_lin_comb(
+                self.y_mult[:self.iters], self.Z[:self.iters])
+            mat_vec(sol, res)
             res.equals_ax_p_by(1.0, b, -1.0, res)
             true_res = res.norm2
             true_feas = res._dual.norm2
@@ -499,11 +530,11 @@ class FLECS(KrylovSolver):
             self.out_file.write('# trust-radius constraint active\n')
 
         # always use composite-step approach in re-solve
-        x.equals(0.0)
-        for k in xrange(self.iters):
-            x._primal.equals_ax_p_by(
-                1.0, x._primal, self.y_aug[k], self.Z[k]._primal)
-            x._dual.equals_ax_p_by(
-                1.0, x._dual, self.y_mult[k], self.Z[k]._dual)
+        x._primal.equals_lin_comb(
+            self.y_aug[:self.iters],
+            [self.Z[k]._primal for k in xrange(self.iters)])
+        x._dual.equals_lin_comb(
+            self.y_mult[:self.iters],
+            [self.Z[k]._dual for k in xrange(self.iters)])
         x._primal.times(self.grad_scale)
         x._dual.times(self.feas_scale)
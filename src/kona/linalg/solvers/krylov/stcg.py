@@ -1,3 +1,4 @@
+import numpy
 from numpy import sqrt
 
 from kona.options import get_opt
@@ -13,6 +14,20 @@ class STCG(KrylovSolver):
     radius : float
         Trust region radius.
     proj_cg : boolean
+    recycle : int
+        Number of approximate eigenvectors of the matrix that are kept from
+        one solution to the next. The next solution starts from the Galerkin
+        solution in their span, and its search directions are kept
+        A-orthogonal to them (deflated CG), so that the corresponding part of
+        the spectrum no longer slows down convergence. The vectors are the
+        Ritz vectors of the smallest Ritz values over the recycled subspace
+        and the search directions of the last solution. The directions are
+        collected in a window of ``2*recycle`` vectors, which is compressed
+        into ``recycle`` Ritz vectors whenever it fills up, so the storage
+        cost is ``10*recycle`` extra vectors independent of ``max_iter``.
+        Each solution costs ``recycle`` extra matrix-vector products.
+    U : list of KonaVector
+        Recycled vectors.
     """
     def __init__(self, vector_factory, optns={}):
         super(STCG, self).__init__(vector_factory, optns)
@@ -23,14 +38,119 @@ class STCG(KrylovSolver):
 
         # get other options
         self.proj_cg = get_opt(optns, False, 'proj_cg')
+        self.recycle = get_opt(optns, 0, 'recycle')
 
         # set factory and request vectors needed in solve() method
         self.vec_fac.request_num_vectors(7)
 
+        # recycled vectors and their products, the compressed Ritz vectors
+        # and products of the current solution (twice, while they are
+        # replaced), and the window of search directions and products
+        self.U = []
+        self._window = 2*self.recycle
+        if self.recycle > 0:
+            self.vec_fac.request_num_vectors(
+                6*self.recycle + 2*self._window)
+
     def _validate_options(self):
         super(STCG, self)._validate_options()
         if self.radius < 0:
             raise ValueError('radius must be postive')
+        if self.recycle < 0:
+            raise ValueError('recycle must be nonnegative')
+
+    def _release(self, vectors):
+        for vector in vectors:
+            vector.release()
+
+    def _deflate(self, mat_vec, b, x, r):
+        # products of the recycled vectors with the current matrix
+        C = []
+        for k in xrange(len(self.U)):
+            C.append(self.vec_fac.generate())
+            mat_vec(self.U[k], C[k])
+        UtC = numpy.array([C[k].inner_many(self.U) for k in xrange(len(C))])
+        self._UtC = 0.5*(UtC + UtC.T)
+
+        # start from the Galerkin solution in the recycled subspace, unless
+        # the matrix is not positive definite on it, or the solution leaves
+        # the trust region
+        try:
+            numpy.linalg.cholesky(self._UtC)
+            y = numpy.linalg.solve(self._UtC, b.inner_many(self.U))
+            x.equals_lin_comb(y, self.U)
+            usable = x.norm2 < self.radius
+        except numpy.linalg.LinAlgError:
+            usable = False
+        if not usable:
+            x.equals(0.0)
+            self._release(self.U + C)
+            self.U = []
+            return []
+        r.equals_lin_comb(numpy.append(1.0, -y), [b] + C)
+        self.out_file.write(
+            '# deflated %i recycled vectors\n'%len(self.U))
+        return C
+
+    def _project(self, z, p, C):
+        # p = p - U*inv(U^T*A*U)*C^T*z keeps p A-orthogonal to U
+        if len(C) == 0:
+            return
+        mu = numpy.linalg.solve(self._UtC, z.inner_many(C))
+        p.equals_lin_comb(numpy.append(1.0, -mu), [p] + self.U)
+
+    def _ritz(self, W, AW):
+        # Rayleigh-Ritz over the span of W, given the products AW
+        num_w = len(W)
+        G = numpy.array([AW[j].inner_many(W) for j in xrange(num_w)])
+        G = 0.5*(G + G.T)
+        F = numpy.array([W[j].inner_many(W) for j in xrange(num_w)])
+        F = 0.5*(F + F.T)
+
+        # orthonormalize the basis implicitly, dropping dependent directions
+        f_vals, f_vecs = numpy.linalg.eigh(F)
+        if f_vals[-1] <= 0.0:
+            return None
+        keep = f_vals > 1e-10*f_vals[-1]
+        T = f_vecs[:, keep]/sqrt(f_vals[keep])
+        theta, S = numpy.linalg.eigh(T.T.dot(G).dot(T))
+
+        # coefficients of the Ritz vectors of the smallest Ritz values
+        return T.dot(S[:, :min(self.recycle, len(theta))])
+
+    def _combine(self, Y, W):
+        out = []
+        for k in xrange(Y.shape[1]):
+            out.append(self.vec_fac.generate())
+            out[k].equals_lin_comb(Y[:, k], W)
+        return out
+
+    def _compress(self, C, V, AV, P, AP):
+        # replace the compressed vectors and the full window of directions
+        # with the Ritz vectors over them, whose products are the same
+        # combinations of the stored products
+        Y = self._ritz(self.U + V + P, C + AV + AP)
+        if Y is None:
+            self._release(P + AP)
+            return V, AV
+        W = self.U + V + P
+        AW = C + AV + AP
+        V_new = self._combine(Y, W)
+        AV_new = self._combine(Y, AW)
+        self._release(V + AV + P + AP)
+        return V_new, AV_new
+
+    def _update_recycled(self, C, V, AV, P, AP):
+        # Rayleigh-Ritz over the old recycled vectors and the new directions
+        W = self.U + V + P
+        AW = C + AV + AP
+        Y = self._ritz(W, AW)
+        if Y is None:
+            U = []
+        else:
+            U = self._combine(Y, W)
+        self._release(W + AW)
+        self.U = U
 
     def solve(self, mat_vec, b, x, precond):
         self._validate_options()
@@ -43,7 +163,6 @@ class STCG(KrylovSolver):
         # define initial residual and other scalars
         r.equals(b)
         x.equals(0.0)
-        x_norm2 = x.norm2
 
         norm0 = r.norm2
         res_norm2 = norm0
@@ -52,7 +171,22 @@ class STCG(KrylovSolver):
         if self.proj_cg:
             norm0 = r_dot_z
 
+        # deflate the subspace recycled from the previous solution
+        C = []
+        V = []
+        AV = []
+        P = []
+        AP = []
+        if self.recycle > 0 and len(self.U) > 0:
+            C = self._deflate(mat_vec, b, x, r)
+            if len(C) > 0:
+                res_norm2 = r.norm2
+                precond(r, z)
+                r_dot_z = r.inner(z)
+        x_norm2 = x.norm2
+
         p.equals(z)
+        self._project(z, p, C)
         # Ap.equals(p)
         active = False
 
@@ -71,6 +205,17 @@ class STCG(KrylovSolver):
             # calculate alpha
             mat_vec(p, Ap)
             alpha = p.inner(Ap)
+
+            # keep the direction for the next recycled vectors
+            if self.recycle > 0:
+                if len(P) == self._window:
+                    V, AV = self._compress(C, V, AV, P, AP)
+                    P = []
+                    AP = []
+                P.append(self.vec_fac.generate())
+                P[-1].equals(p)
+                AP.append(self.vec_fac.generate())
+                AP[-1].equals(Ap)
             # check alpha for non-positive curvature
             if alpha <= -1e-8:
                 # direction of non-positive curvature detected
@@ -170,9 +315,14 @@ class STCG(KrylovSolver):
             # perform p = z + beta*p
             p.times(beta)
             p.plus(z)
+            self._project(z, p, C)
         #####################
         # END OF BIG FOR LOOP
 
+        # extract the vectors recycled into the next solution
+        if self.recycle > 0:
+            self._update_recycled(C, V, AV, P, AP)
+
         # compute the predicted decrease in objective
         r.plus(b)
         pred = 0.5*x.inner(r)
@@ -484,6 +484,64 @@ def mod_gram_schmidt(i, Hsbg, w):
         w[i+1].divide_by(nrm)
         return
 
+def cgs2(i, Hsbg, w):
+    """
+    Classical Gram-Schmidt orthogonalization with one full
+    re-orthogonalization pass (CGS2).
+
+    Orthogonalizes ``w[i+1]`` against ``w[0], ..., w[i]`` and normalizes it,
+    storing the projection coefficients in column ``i`` of ``Hsbg``. Each pass
+    evaluates all projections with a single ``inner_many()`` call, so there is
+    one sweep over memory per pass instead of one per basis vector.
+
+    Parameters
+    ----------
+    i : int
+        Index of the last vector already in the orthonormal basis.
+    Hsbg : 2-D numpy.ndarray
+        Upper Hessenberg matrix updated in column ``i``.
+    w : list of KonaVector
+        Basis vectors, with the vector being orthogonalized at ``w[i+1]``.
+    """
+    # get the norm of the vector being orthogonalized
+    nrm = w[i+1].inner(w[i+1])
+    if abs(nrm) <= EPS:
+        # norm of w[i+1] is effectively zero; it is linearly dependent
+        # raise a LinAlgError to catch later
+        raise np.linalg.LinAlgError
+    elif nrm < -EPS:
+        # the norm of w[i+1] < 0.0
+        raise ValueError('cgs2 failed : w[i+1].inner(w[i+1]) < 0.0')
+    elif np.isnan(nrm):
+        raise ValueError('cgs2 failed : w[i+1] = NaN')
+
+    if i < 0:
+        # just normalize and exit
+        w[i+1].divide_by(np.sqrt(nrm))
+        return
+
+    # project out the basis twice
+    for k in xrange(i+1):
+        Hsbg[k, i] = 0.0
+    for orth_pass in xrange(2):
+        prod = w[i+1].inner_many(w[:i+1])
+        for k in xrange(i+1):
+            Hsbg[k, i] += prod[k]
+        w[i+1].equals_lin_comb(
+            np.concatenate(([1.0], -prod)), [w[i+1]] + w[:i+1])
+
+    # test the resulting vector
+    nrm = w[i+1].norm2
+    Hsbg[i+1, i] = nrm
+    if (nrm <= 0.0):
+        # norm of w[i+1] is effectively zero; it is linearly dependent
+        # raise a LinAlgError to catch later
+        raise np.linalg.LinAlgError
+    else:
+        # scale the resulting vector and exit
+        w[i+1].divide_by(nrm)
+        return
+
 def write_header(out_file, solver_name, res_tol, res_init):
     """
     Writes krylov solver data file header text.
@@ -1,7 +1,12 @@
+import itertools
+
 import numpy as np
 
 from kona.linalg.matrices.common import dRdX, dRdU, dCdX
 
+# version stamps shared by all Kona vectors, so that a stamp is never reused
+_versions = itertools.count(1)
+
 class KonaVector(object):
     """
     An abstract vector class connected to the Kona memory, containing a
@@ -21,14 +26,37 @@ class KonaVector(object):
         Pointer to the Kona user memory.
     _data : BaseVector
         User defined vector object that contains data and operations on data.
+    _storage : PackedStorage or None
+        Owner of the packed KKT vector this vector is a component of, if any.
+    _version : int
+        Version stamp of the vector data. A new stamp is drawn from a counter
+        shared by all vectors whenever the data is modified, so two equal
+        stamps always refer to the same data.
     """
 
     def __init__(self, memory_obj, user_vector=None):
         self._memory = memory_obj
         self._data = user_vector
+        self._storage = None
+        self._version = next(_versions)
 
     def __del__(self):
-        self._memory.push_vector(type(self), self._data)
+        if self._data is not None:
+            self._memory.push_vector(type(self), self._data)
+
+    def release(self):
+        """
+        Returns the user data container to the memory stack immediately,
+        instead of waiting for this vector to be garbage collected.
+
+        The vector must not be used after it has been released.
+        """
+        if self._data is not None:
+            self._memory.push_vector(type(self), self._data)
+            self._data = None
+
+    def _modified(self):
+        self._version = next(_versions)
 
     def _check_type(self, vector):
         if not isinstance(vector, type(self)):
@@ -47,6 +75,7 @@ class KonaVector(object):
         val : float or KonaVector
             Right hand side term for assignment.
         """
+        self._modified()
         if isinstance(val,
                       (float, np.float32, np.float64, int, np.int32, np.int64)):
             self._data.equals_value(val)
@@ -65,6 +94,7 @@ class KonaVector(object):
         vector : KonaVector
             Vector to be added.
         """
+        self._modified()
         self._check_type(vector)
         self._data.plus(vector._data)
 
@@ -79,6 +109,7 @@ class KonaVector(object):
         vector : KonaVector
             Vector to be subtracted.
         """
+        self._modified()
         if vector == self: # special case...
             self.equals(0)
 
@@ -98,6 +129,7 @@ class KonaVector(object):
         factor : float or KonaVector
             Scalar or vector-valued multiplication factor.
         """
+        self._modified()
         if isinstance(factor,
                       (float, np.float32, np.float64, int, np.int32, np.int64)):
             self._data.times_scalar(factor)
@@ -134,10 +166,81 @@ class KonaVector(object):
         Y : KonaVector
             Vector for the operation.
         """
+        self._modified()
         self._check_type(X)
         self._check_type(Y)
         self._data.equals_ax_p_by(a, X._data, b, Y._data)
 
+    def equals_unit(self, index):
+        """
+        Sets this vector equal to the unit vector along the given index of
+        its space.
+
+        Parameters
+        ----------
+        index : int
+            Index of the non-zero element.
+        """
+        self._modified()
+        self._data.equals_unit(index)
+
+    def equals_imag(self, vector):
+        """
+        Sets this vector equal to the imaginary part of the given vector,
+        which wraps complex-valued data (see `KonaMemory.alloc_complex`).
+
+        Parameters
+        ----------
+        vector : KonaVector
+            Complex-valued vector of the same type.
+        """
+        self._modified()
+        self._check_type(vector)
+        self._data.equals_imag(vector._data)
+
+    def equals_lin_comb(self, coeffs, vectors):
+        """
+        Performs the linear combination ``sum(coeffs[k]*vectors[k])`` and
+        stores the result in place. This vector may appear in the list.
+
+        Uses the user vector's ``equals_lin_comb()`` method when available, so
+        that the update is done in one pass. Otherwise falls back to one
+        ``equals_ax_p_by()`` call per vector.
+
+        Parameters
+        ----------
+        coeffs : array_like
+            Scalar coefficients, one per vector.
+        vectors : list of KonaVector
+            Vectors for the operation.
+        """
+        self._modified()
+        if len(coeffs) != len(vectors):
+            raise ValueError(
+                'number of coefficients must match the number of vectors')
+        user_vectors = []
+        for vector in vectors:
+            self._check_type(vector)
+            user_vectors.append(vector._data)
+        if hasattr(self._data, 'equals_lin_comb'):
+            self._data.equals_lin_comb(coeffs, user_vectors)
+            return
+        # scale any aliases of this vector first so they are not overwritten
+        self_coeff = 0.0
+        aliased = False
+        for k in xrange(len(user_vectors)):
+            if user_vectors[k] is self._data:
+                self_coeff += coeffs[k]
+                aliased = True
+        if aliased:
+            self._data.times_scalar(self_coeff)
+        else:
+            self._data.equals_value(0.0)
+        for k in xrange(len(user_vectors)):
+            if user_vectors[k] is not self._data:
+                self._data.equals_ax_p_by(
+                    1.0, self._data, coeffs[k], user_vectors[k])
+
     def exp(self, vector):
         """
         Performs an element-wise exponential operation on the given vector
@@ -148,6 +251,7 @@ class KonaVector(object):
         vector : KonaVector
             Vector for the operation.
         """
+        self._modified()
         self._check_type(vector)
         self._data.exp(vector._data)
 
@@ -161,6 +265,7 @@ class KonaVector(object):
         vector : KonaVector
             Vector for the operation.
         """
+        self._modified()
         self._check_type(vector)
         self._data.log(vector._data)
 
@@ -172,6 +277,7 @@ class KonaVector(object):
         ----------
         power : float
         """
+        self._modified()
         self._data.pow(power)
 
     def inner(self, vector):
@@ -186,6 +292,35 @@ class KonaVector(object):
         self._check_type(vector)
         return self._data.inner(vector._data)
 
+    def inner_many(self, vectors):
+        """
+        Computes inner products with each vector in the given list.
+
+        Uses the user vector's ``inner_many()`` method when available, so that
+        all products can be evaluated in one sweep over memory. Otherwise falls
+        back to one ``inner()`` call per vector.
+
+        Parameters
+        ----------
+        vectors : list of KonaVector
+            Vectors for the operation.
+
+        Returns
+        -------
+        numpy.ndarray
+            Inner products, in the same order as the given vectors.
+        """
+        user_vectors = []
+        for vector in vectors:
+            self._check_type(vector)
+            user_vectors.append(vector._data)
+        if hasattr(self._data, 'inner_many'):
+            return np.asarray(self._data.inner_many(user_vectors), dtype=float)
+        out = np.empty(len(user_vectors))
+        for i in xrange(len(user_vectors)):
+            out[i] = self._data.inner(user_vectors[i])
+        return out
+
     @property
     def norm2(self): # this takes the L2 norm of the vector
         """
@@ -223,6 +358,7 @@ class PrimalVector(KonaVector):
 
         Used only for IDF problems.
         """
+        self._modified()
         self._memory.solver.restrict_design(0, self._data)
 
     def restrict_to_target(self):
@@ -231,6 +367,7 @@ class PrimalVector(KonaVector):
 
         Used only for IDF problems.
         """
+        self._modified()
         self._memory.solver.restrict_design(1, self._data)
 
     def convert(self, dual_vector):
@@ -244,6 +381,7 @@ class PrimalVector(KonaVector):
         dual_vector : DualVector
             Source vector for target state variable data.
         """
+        self._modified()
         self._memory.solver.copy_dual_to_targstate(
             dual_vector._data, self._data)
 
@@ -251,6 +389,7 @@ class PrimalVector(KonaVector):
         """
         Sets this vector equal to the initial design point.
         """
+        self._modified()
         self._memory.solver.init_design(self._data)
 
     def equals_objective_partial(self, at_primal, at_state):
@@ -265,6 +404,7 @@ class PrimalVector(KonaVector):
         at_state : StateVector
             Current state point.
         """
+        self._modified()
         self._memory.solver.eval_dFdX(at_primal._data,
                                       at_state._data,
                                       self._data)
@@ -334,6 +474,7 @@ class StateVector(KonaVector):
         at_state : StateVector
             Current state point.
         """
+        self._modified()
         self._memory.solver.eval_dFdU(
             at_primal._data, at_state._data, self._data)
 
@@ -348,8 +489,13 @@ class StateVector(KonaVector):
         at_state : StateVector
             Current state point.
         """
+        self._modified()
+        cache = self._memory.eval_cache
+        if cache.get_vector(self, at_primal, at_state):
+            return
         self._memory.solver.eval_residual(
             at_primal._data, at_state._data, self._data)
+        cache.put_vector(self, at_primal, at_state)
 
     def equals_primal_solution(self, at_primal):
         """
@@ -361,17 +507,23 @@ class StateVector(KonaVector):
         at_primal : PrimalVector
             Current primal point.
         """
+        self._modified()
+        cache = self._memory.state_cache
+        if cache.get_state(self, at_primal):
+            return True
         cost = self._memory.solver.solve_nonlinear(at_primal._data, self._data)
         self._memory.cost += abs(cost)
         if cost < 0:
             return False
         else:
+            cache.put_state(self, at_primal)
             return True
 
     def equals_adjoint_solution(self, at_primal, at_state, state_work):
         """
         Computes in-place the adjoint variables for the objective function,
-        linearized at the given primal and state points.
+        linearized at the given primal and state points. The current contents
+        of this vector are the initial guess for the adjoint solution.
 
         Parameters
         ----------
@@ -401,6 +553,7 @@ class DualVector(KonaVector):
         primal_vector : PrimalVector
             Source vector for target state variable data.
         """
+        self._modified()
         self._memory.solver.copy_targstate_to_dual(
             primal_vector._data, self._data)
 
@@ -408,6 +561,7 @@ class DualVector(KonaVector):
         """
         Sets the dual variables corresponding to equality constraints to zero.
         """
+        self._modified()
         self._memory.solver.restrict_dual(self._data)
 
     def equals_constraints(self, at_primal, at_state):
@@ -422,5 +576,10 @@ class DualVector(KonaVector):
         at_state : StateVector
             Current state point.
         """
+        self._modified()
+        cache = self._memory.eval_cache
+        if cache.get_vector(self, at_primal, at_state):
+            return
         self._memory.solver.eval_constraints(
             at_primal._data, at_state._data, self._data)
+        cache.put_vector(self, at_primal, at_state)
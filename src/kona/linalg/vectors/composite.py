@@ -5,16 +5,55 @@ from kona.linalg.vectors.common import KonaVector, PrimalVector, DualVector
 class CompositeVector(object):
     """
     Base class shell for all composite vectors.
+
+    Composite vectors generated by a `KKTVectorFactory` may be packed: their
+    components are views into one user vector, stored in ``_packed``.
+    Operations between packed vectors with the same layout act on the packed
+    user vectors with a single call. All other operations are carried out
+    component by component.
+
+    Attributes
+    ----------
+    _packed : BaseVector or None
+        User vector holding the data of all components, if packed.
+    _storage : PackedStorage or None
+        Owner of the packed user vector, if packed.
     """
     def __init__(self, vectors):
         self._vectors = vectors
         self._memory = self._vectors[0]._memory
+        self._packed = None
+        self._storage = None
 
     def _check_type(self, vec):
         if not isinstance(vec, type(self)):
             raise TypeError('CompositeVector() >> ' +
                             'Wrong vector type. Must be %s' % type(self))
 
+    def _is_packed_with(self, vectors):
+        if self._packed is None:
+            return False
+        for vector in vectors:
+            if vector._packed is None or \
+                    type(vector._vectors[0]) is not type(self._vectors[0]):
+                return False
+        return True
+
+    def _modified(self):
+        for vector in self._vectors:
+            vector._modified()
+
+    def release(self):
+        """
+        Returns the memory of all component vectors to the memory stack.
+
+        The vector must not be used after it has been released.
+        """
+        for i in xrange(len(self._vectors)):
+            self._vectors[i].release()
+        if self._storage is not None:
+            self._storage.release()
+
     def equals(self, rhs):
         """
         Used as the assignment operator.
@@ -30,10 +69,18 @@ class CompositeVector(object):
         """
         if isinstance(rhs,
                       (float, int, np.float64, np.int64, np.float32, np.int32)):
+            if self._packed is not None:
+                self._packed.equals_value(rhs)
+                self._modified()
+                return
             for i in xrange(len(self._vectors)):
                 self._vectors[i].equals(rhs)
         else:
             self._check_type(rhs)
+            if self._is_packed_with([rhs]):
+                self._packed.equals_vector(rhs._packed)
+                self._modified()
+                return
             for i in xrange(len(self._vectors)):
                 self._vectors[i].equals(rhs._vectors[i])
 
@@ -49,6 +96,10 @@ class CompositeVector(object):
             Vector to be added.
         """
         self._check_type(vector)
+        if self._is_packed_with([vector]):
+            self._packed.plus(vector._packed)
+            self._modified()
+            return
         for i in xrange(len(self._vectors)):
             self._vectors[i].plus(vector._vectors[i])
 
@@ -64,6 +115,13 @@ class CompositeVector(object):
             Vector to be subtracted.
         """
         self._check_type(vector)
+        if vector is self:
+            self.equals(0.)
+            return
+        if self._is_packed_with([vector]):
+            self._packed.equals_ax_p_by(1., self._packed, -1., vector._packed)
+            self._modified()
+            return
         for i in xrange(len(self._vectors)):
             self._vectors[i].minus(vector._vectors[i])
 
@@ -80,10 +138,18 @@ class CompositeVector(object):
         """
         if isinstance(factor,
                       (float, int, np.float64, np.int64, np.float32, np.int32)):
+            if self._packed is not None:
+                self._packed.times_scalar(factor)
+                self._modified()
+                return
             for i in xrange(len(self._vectors)):
                 self._vectors[i].times(factor)
         else:
             self._check_type(factor)
+            if self._is_packed_with([factor]):
+                self._packed.times_vector(factor._packed)
+                self._modified()
+                return
             for i in xrange(len(self._vectors)):
                 self._vectors[i].times(factor._vectors[i])
 
@@ -100,6 +166,10 @@ class CompositeVector(object):
         """
         if isinstance(value,
                       (float, int, np.float64, np.int64, np.float32, np.int32)):
+            if self._packed is not None:
+                self._packed.times_scalar(1./value)
+                self._modified()
+                return
             for i in xrange(len(self._vectors)):
                 self._vectors[i].divide_by(value)
         else:
@@ -120,6 +190,10 @@ class CompositeVector(object):
         """
         self._check_type(x)
         self._check_type(y)
+        if self._is_packed_with([x, y]):
+            self._packed.equals_ax_p_by(a, x._packed, b, y._packed)
+            self._modified()
+            return
         for i in xrange(len(self._vectors)):
             self._vectors[i].equals_ax_p_by(a, x._vectors[i], b, y._vectors[i])
 
@@ -132,11 +206,60 @@ class CompositeVector(object):
         float : Inner product.
         """
         self._check_type(vector)
+        if self._is_packed_with([vector]):
+            return self._packed.inner(vector._packed)
         total_prod = 0.
         for i in xrange(len(self._vectors)):
             total_prod += self._vectors[i].inner(vector._vectors[i])
         return total_prod
 
+    def inner_many(self, vectors):
+        """
+        Computes inner products with each vector in the given list.
+
+        Parameters
+        ----------
+        vectors : list of CompositeVector
+            Vectors for the operation.
+
+        Returns
+        -------
+        numpy.ndarray : Inner products, in the same order as the given vectors.
+        """
+        for vector in vectors:
+            self._check_type(vector)
+        if self._is_packed_with(vectors):
+            return np.asarray(self._packed.inner_many(
+                [vector._packed for vector in vectors]), dtype=float)
+        total_prod = np.zeros(len(vectors))
+        for i in xrange(len(self._vectors)):
+            total_prod += self._vectors[i].inner_many(
+                [vector._vectors[i] for vector in vectors])
+        return total_prod
+
+    def equals_lin_comb(self, coeffs, vectors):
+        """
+        Performs the linear combination ``sum(coeffs[k]*vectors[k])`` and
+        stores the result in place. This vector may appear in the list.
+
+        Parameters
+        ----------
+        coeffs : array_like
+            Scalar coefficients, one per vector.
+        vectors : list of CompositeVector
+            Vectors for the operation.
+        """
+        for vector in vectors:
+            self._check_type(vector)
+        if self._is_packed_with(vectors):
+            self._packed.equals_lin_comb(
+                coeffs, [vector._packed for vector in vectors])
+            self._modified()
+            return
+        for i in xrange(len(self._vectors)):
+            self._vectors[i].equals_lin_comb(
+                coeffs, [vector._vectors[i] for vector in vectors])
+
     def exp(self, vector):
         """
         Computes the element-wise exponential of the given vector and stores it
@@ -147,8 +270,12 @@ class CompositeVector(object):
         vector : CompositeVector
         """
         self._check_type(vector)
+        if self._is_packed_with([vector]):
+            self._packed.exp(vector._packed)
+            self._modified()
+            return
         for i in xrange(len(self._vectors)):
-            self._vectors[i].exp(vector)
+            self._vectors[i].exp(vector._vectors[i])
 
     def log(self, vector):
         """
@@ -160,8 +287,12 @@ class CompositeVector(object):
         vector : CompositeVector
         """
         self._check_type(vector)
+        if self._is_packed_with([vector]):
+            self._packed.log(vector._packed)
+            self._modified()
+            return
         for i in xrange(len(self._vectors)):
-            self._vectors[i].log(vector)
+            self._vectors[i].log(vector._vectors[i])
 
     def pow(self, power):
         """
@@ -171,6 +302,10 @@ class CompositeVector(object):
         ----------
         power : float
         """
+        if self._packed is not None:
+            self._packed.pow(power)
+            self._modified()
+            return
         for i in xrange(len(self._vectors)):
             self._vectors[i].pow(power)
 
@@ -199,6 +334,8 @@ class CompositeVector(object):
         -------
         float : Infinity norm.
         """
+        if self._packed is not None:
+            return self._packed.infty
         norms = []
         for i in xrange(len(self._vectors)):
             norms.append(self._vectors[i].infty)
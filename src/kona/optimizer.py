@@ -1,6 +1,8 @@
+from kona.options import get_opt
 from kona.user import UserSolver
 from kona.algorithms import Verifier
 from kona.linalg.memory import KonaMemory
+from kona.linalg.profiler import VectorProfiler, SolverProfiler
 
 class Optimizer(object):
     """
@@ -13,6 +15,15 @@ class Optimizer(object):
         All-knowing Kona memory controller.
     _algorithm : OptimizationAlgorithm
         Optimization algorithm object.
+    memory_report : dict
+        Vector memory usage summary from ``KonaMemory.memory_report()``,
+        available after ``solve()``.
+    vector_profiler : VectorProfiler or None
+        Vector operation profiler, if turned on with the
+        ``['profile']['vectors']`` option.
+    solver_profiler : SolverProfiler or None
+        User solver callback profiler, if turned on with the
+        ``['profile']['solver']`` option.
 
     Parameters
     ----------
@@ -25,8 +36,13 @@ class Optimizer(object):
         # if not isinstance(solver, UserSolver):
         #     raise TypeError('Kona.Optimizer() >> ' +
         #                     'Unknown solver type!')
+        # check the options type
+        if optns is None:
+            optns = {}
+        elif not isinstance(optns, dict):
+            raise TypeError('Kona.Optimizer >> Options must be a dictionary!')
         # initialize optimization memory
-        self._memory = KonaMemory(solver)
+        self._memory = KonaMemory(solver, get_opt(optns, {}, 'memory'))
         # set default file handles
         self._optns = {
             'info_file' : 'kona_info.dat',
@@ -36,11 +52,18 @@ class Optimizer(object):
             },
         }
         # process the final options
-        if optns is None:
-            optns = {}
-        elif not isinstance(optns, dict):
-            raise TypeError('Kona.Optimizer >> Options must be a dictionary!')
         self._process_options(optns)
+        self.memory_report = None
+        # set up the optional profilers
+        self.vector_profiler = None
+        if get_opt(optns, False, 'profile', 'vectors'):
+            self.vector_profiler = VectorProfiler()
+            self._memory.profilers.append(self.vector_profiler)
+        self.solver_profiler = None
+        if get_opt(optns, False, 'profile', 'solver'):
+            self.solver_profiler = SolverProfiler(solver)
+            self._memory.profilers.append(self.solver_profiler)
+        self._profile_json = get_opt(optns, None, 'profile', 'json_file')
         # get vector factories
         primal_factory = self._memory.primal_factory
         state_factory = self._memory.state_factory
@@ -71,4 +94,17 @@ class Optimizer(object):
 
     def solve(self):
         self._memory.allocate_memory()
-        self._algorithm.solve()
+        for profiler in self._memory.profilers:
+            profiler.start()
+        try:
+            self._algorithm.solve()
+        finally:
+            for profiler in self._memory.profilers:
+                profiler.stop()
+        self.memory_report = self._memory.memory_report()
+        self._memory.write_memory_report(self._optns['info_file'])
+        for profiler in self._memory.profilers:
+            profiler.write_summary(self._optns['hist_file'])
+        if self.vector_profiler is not None and \
+                self._profile_json is not None and self._memory.rank == 0:
+            self.vector_profiler.write_json(self._profile_json)
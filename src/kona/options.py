@@ -67,6 +67,21 @@ defaults = {
     'hist_file'         : 'kona_hist.dat',
     'matrix_explicit'   : False,
 
+    'memory' : {
+        'pool'          : False,
+        'chunk_size'    : 8,
+        'max_vecs'      : None,
+        'eval_cache'    : 8,
+        'eval_cache_vecs' : 0,
+        'state_cache'   : 0,
+    },
+
+    'profile' : {
+        'vectors'       : False,
+        'solver'        : False,
+        'json_file'     : None,
+    },
+
     'merit_function' : {
         'type'          : ObjectiveMerit,
     },
@@ -91,6 +106,10 @@ defaults = {
         'scale'         : 0.0,
         'nu'            : 0.95,
         'dynamic_tol'   : False,
+        'block_size'    : 1,
+        'adjoint_guess' : 0,
+        'complex_step'  : False,
+        'dense_max'     : 30,
     },
 
     'quasi_newton' : {
@@ -122,8 +141,11 @@ defaults = {
         'rel_tol'       : 0.05,
         'check_res'     : True,
         'proj_cg'       : False, # STCG
+        'recycle'       : 0, # STCG
         'grad_scale'    : 1.0, # FLECS
         'feas_scale'    : 1.0, # FLECS
+        'orthogonalization' : 'mgs', # FGMRES, FLECS
+        'basis_precision' : 'double', # FGMRES, FLECS
     },
 
     'verify' : {
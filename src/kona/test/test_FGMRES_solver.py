@@ -48,6 +48,41 @@ class FLECSSolverTestCase(unittest.TestCase):
         diff = max(diff)
         self.assertTrue(diff < 1.e-6)
 
+    def test_solve_single_basis(self):
+        # solve with the basis stored in single precision
+        km = KonaMemory(UserSolver(4,0,0))
+        pf = km.primal_factory
+        pf.request_num_vectors(2)
+        krylov = FGMRES(
+            pf, {'max_iter' : 30, 'rel_tol' : 1e-3,
+                 'basis_precision' : 'single'})
+        km.allocate_memory()
+        x = pf.generate()
+        b = pf.generate()
+        b.equals(1)
+        x.equals(0)
+        iters, res = krylov.solve(
+            self.mat_vec, b, x, self.precond.product)
+        self.assertTrue(x._data.data.dtype == numpy.float64)
+        # basis vectors come from the low-precision stack
+        self.assertEqual(len(km.low_stack[type(x)]), 61)
+        # compare with the double precision solve
+        self.x.equals(0)
+        iters_dbl, res_dbl = self.krylov.solve(
+            self.mat_vec, self.b, self.x, self.precond.product)
+        self.assertEqual(iters, iters_dbl)
+        diff = max(abs(self.x._data.data - x._data.data))
+        self.assertTrue(diff < 1.e-5)
+
+    def test_solve_cgs2(self):
+        # switch to classical Gram-Schmidt with re-orthogonalization
+        self.krylov.orthog = 'cgs2'
+        self.x.equals(0)
+        self.krylov.solve(self.mat_vec, self.b, self.x, self.precond.product)
+        expected = numpy.linalg.solve(self.A, self.b._data.data)
+        diff = max(abs(self.x._data.data - expected))
+        self.assertTrue(diff < 1.e-6)
+
 if __name__ == "__main__":
 
     unittest.main()
@@ -6,7 +6,7 @@ from kona.linalg.solvers.krylov import FLECS
 from kona.linalg.vectors.composite import ReducedKKTVector
 from kona.linalg.vectors.composite import CompositePrimalVector
 from kona.linalg.matrices.common import IdentityMatrix
-from kona.user import UserSolver
+from kona.user import UserSolver, BlockAllocator
 from kona.linalg.memory import KonaMemory
 
 class FLECSSolverTestCase(unittest.TestCase):
@@ -111,6 +111,102 @@ class FLECSSolverTestCase(unittest.TestCase):
         self.assertTrue(
             (exp_norm - actual_norm) <= 1e-1 and self.krylov.trust_active)
 
+    def test_radius_inactive_cgs2(self):
+        # switch to classical Gram-Schmidt with re-orthogonalization
+        self.krylov.orthog = 'cgs2'
+        self.x.equals(0)
+        self.b.equals(1)
+        self.krylov.radius = 100.0
+        self.krylov.mu = 100000.0
+        self.krylov.solve(self.mat_vec, self.b, self.x, self.precond.product)
+        # calculate expected result
+        self.b.equals(1)
+        rhs = numpy.ones(4)
+        expected = numpy.linalg.solve(self.A, rhs)
+        # compare actual result to expected
+        total_data = numpy.zeros(4)
+        total_data[0:2] = self.x._primal._design._data.data[:]
+        total_data[2] = self.x._primal._slack._data.data[:]
+        total_data[3] = self.x._dual._data.data[:]
+        diff = max(abs(total_data - expected))
+        self.assertTrue(diff <= 1.e-3 and not self.krylov.trust_active)
+
+    def test_single_basis(self):
+        # solve with the basis stored in single precision
+        km = KonaMemory(UserSolver(2,0,1))
+        pf = km.primal_factory
+        df = km.dual_factory
+        pf.request_num_vectors(2)
+        df.request_num_vectors(4)
+        krylov = FLECS(
+            [pf, df], {'max_iter' : 10, 'rel_tol' : 1e-6,
+                       'basis_precision' : 'single'})
+        km.allocate_memory()
+        x = ReducedKKTVector(
+            CompositePrimalVector(pf.generate(), df.generate()),
+            df.generate())
+        b = ReducedKKTVector(
+            CompositePrimalVector(pf.generate(), df.generate()),
+            df.generate())
+        x.equals(0)
+        b.equals(1)
+        krylov.radius = 100.0
+        krylov.mu = 100000.0
+        krylov.solve(self.mat_vec, b, x, self.precond.product)
+        self.assertEqual(krylov.V[1]._dual._data.data.dtype, numpy.float32)
+
+        # compare with the double precision solve
+        self.x.equals(0)
+        self.b.equals(1)
+        self.krylov.radius = 100.0
+        self.krylov.mu = 100000.0
+        self.krylov.solve(self.mat_vec, self.b, self.x, self.precond.product)
+        self.assertEqual(krylov.iters, self.krylov.iters)
+        n = krylov.iters
+        self.assertTrue(numpy.allclose(
+            krylov.H[:n+1, :n], self.krylov.H[:n+1, :n], atol=1e-5))
+        x.minus(self.x)
+        self.assertTrue(x.norm2 < 1e-6)
+
+    def test_packed(self):
+        # solve with packed KKT vectors
+        km = KonaMemory(UserSolver(allocator=BlockAllocator(2, 0, 1)))
+        krylov = FLECS(
+            [km.primal_factory, km.dual_factory],
+            {'max_iter' : 10, 'rel_tol' : 1e-6})
+        kf = km.kkt_factory(slack=True)
+        kf.request_num_vectors(2)
+        km.allocate_memory()
+        x = kf.generate()
+        b = kf.generate()
+        x.equals(0)
+        b.equals(1)
+        krylov.radius = 100.0
+        krylov.mu = 100000.0
+        krylov.solve(self.mat_vec, b, x, self.precond.product)
+        self.assertTrue(krylov.V[1]._packed is not None)
+        self.assertEqual(km.memory_report()['kkt_slack']['allocated'], 24)
+
+        # compare with the unpacked solve
+        self.x.equals(0)
+        self.b.equals(1)
+        self.krylov.radius = 100.0
+        self.krylov.mu = 100000.0
+        self.krylov.solve(self.mat_vec, self.b, self.x, self.precond.product)
+        self.assertEqual(krylov.iters, self.krylov.iters)
+        x.minus(self.x)
+        self.assertTrue(x.norm2 < 1e-10)
+
+    def test_bad_orthogonalization(self):
+        self.krylov.orthog = 'cgs'
+        try:
+            self.krylov._validate_options()
+        except ValueError as err:
+            self.assertEqual(
+                str(err), 'orthogonalization must be \'mgs\' or \'cgs2\'')
+        else:
+            self.fail('ValueError expected')
+
 if __name__ == "__main__":
 
     unittest.main()
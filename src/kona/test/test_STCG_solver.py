@@ -71,6 +71,60 @@ class STCGSolverTestCase(unittest.TestCase):
         actual_norm = self.x.norm2
         self.assertTrue(abs(actual_norm - exp_norm) <= 1e-5)
 
+    def test_recycle(self):
+        n = 20
+        rng = numpy.random.RandomState(0)
+        Q, _ = numpy.linalg.qr(rng.randn(n, n))
+        # a few small eigenvalues slow down plain CG
+        eigs = numpy.concatenate([[1e-3, 1e-2], numpy.linspace(1., 2., n-2)])
+        A0 = Q.dot(numpy.diag(eigs)).dot(Q.T)
+        S = rng.randn(n, n)
+        S = 1e-4*(S + S.T)
+
+        counts = {}
+        for recycle in [0, 2]:
+            km = KonaMemory(UserSolver(n, 0, 0))
+            pf = km.primal_factory
+            pf.request_num_vectors(2)
+            krylov = STCG(pf, {
+                'max_iter' : 40,
+                'rel_tol' : 1e-8,
+                'check_res' : False,
+                'recycle' : recycle,
+            })
+            # storage for recycling does not grow with max_iter
+            self.assertEqual(pf.num_vecs, 2 + 7 + 10*recycle)
+            km.allocate_memory()
+            x = pf.generate()
+            b = pf.generate()
+            krylov.radius = 1e6
+            counts[recycle] = []
+            for j in xrange(4):
+                A = A0 + j*S
+                num_prod = [0]
+
+                def mat_vec(in_vec, out_vec):
+                    num_prod[0] += 1
+                    out_vec._data.data[:] = A.dot(in_vec._data.data)
+
+                b._data.data[:] = numpy.sin(numpy.arange(n) + j)
+                krylov.solve(mat_vec, b, x, self.precond.product)
+                counts[recycle].append(num_prod[0])
+                expected = numpy.linalg.solve(A, b._data.data)
+                self.assertTrue(numpy.linalg.norm(
+                    x._data.data - expected) < 1e-5*numpy.linalg.norm(expected))
+            self.assertEqual(len(krylov.U), recycle)
+
+        # later solutions need fewer products, including the recycled ones
+        self.assertEqual(counts[0][0], counts[2][0])
+        for j in xrange(1, 4):
+            self.assertTrue(counts[2][j] < counts[0][j])
+
+        # the deflated start is discarded if it leaves the trust region
+        krylov.radius = 1e-2
+        krylov.solve(mat_vec, b, x, self.precond.product)
+        self.assertTrue(x.norm2 <= krylov.radius + 1e-8)
+
 if __name__ == "__main__":
 
     unittest.main()
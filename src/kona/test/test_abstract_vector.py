@@ -4,6 +4,7 @@ import numpy as np
 
 from kona.user import BaseVector
 from kona.user import BaseAllocator
+from kona.user import BlockAllocator
 # from kona.user_vectors.petsc_vector import NumpyVector # should follow this exact interface
 
 class AbsVectorTestCase(unittest.TestCase):
@@ -52,6 +53,37 @@ class AbsVectorTestCase(unittest.TestCase):
 
         self.z_vec.equals_ax_p_by(2, self.x_vec, 3, self.y_vec)
 
+    def test_equals_ax_p_by_aliased(self):
+        '''BaseVector.equals_ax_p_by() with aliased operands'''
+        self.x_vec.equals_ax_p_by(2, self.x_vec, 3, self.y_vec)
+        self.assertTrue(np.all(self.x_vec.data == 8.))
+        self.x_vec.equals_ax_p_by(2, self.y_vec, 0.5, self.x_vec)
+        self.assertTrue(np.all(self.x_vec.data == 8.))
+        self.x_vec.equals_ax_p_by(1, self.x_vec, 1, self.x_vec)
+        self.assertTrue(np.all(self.x_vec.data == 16.))
+        self.x_vec.equals_ax_p_by(2, self.x_vec, 3, self.x_vec)
+        self.assertTrue(np.all(self.x_vec.data == 80.))
+        self.x_vec.equals_ax_p_by(1, self.x_vec, -1, self.x_vec)
+        self.assertTrue(np.all(self.x_vec.data == 0.))
+
+    def test_operations_in_place(self):
+        '''BaseVector operations do not re-bind the data array'''
+        data = self.z_vec.data
+        self.z_vec.plus(self.x_vec)
+        self.z_vec.times_scalar(2.)
+        self.z_vec.times_vector(self.y_vec)
+        self.z_vec.equals_ax_p_by(1., self.x_vec, 2., self.y_vec)
+        self.z_vec.exp(self.x_vec)
+        self.z_vec.log(self.y_vec)
+        self.z_vec.pow(2.)
+        self.assertTrue(self.z_vec.data is data)
+        self.assertAlmostEqual(self.z_vec.data[0], np.log(2.)**2)
+
+    def test_infty(self):
+        '''BaseVector.infty'''
+        self.z_vec.times_scalar(-1.)
+        self.assertEqual(self.z_vec.infty, 10.)
+
     def test_bad_value(self):
         '''BaseVector.__init__() error tests'''
         try:
@@ -92,5 +124,125 @@ class TestCaseProblemAllocator(unittest.TestCase):
 
         self.assertEqual(base_var.data.shape[0], 5)
 
+    def test_low_vecs(self):
+        low = self.alloc.alloc_dual_low(2)
+        self.assertEqual(low[0].data.dtype, np.float32)
+        self.assertEqual(len(low[0].data), 5)
+
+    def test_mixed_precision(self):
+        x = BaseVector(3, val=[1., 2., 3.])
+        y = BaseVector(3, val=[1., 2., 3.], dtype=np.float32)
+        # inner products are accumulated in double precision
+        val = y.inner(y)
+        self.assertTrue(isinstance(val, np.float64))
+        self.assertEqual(val, 14.)
+        self.assertEqual(x.inner(y), 14.)
+        self.assertTrue(np.all(x.inner_many([y, x]) == [14., 14.]))
+        # updates keep each vector's own precision
+        y.equals_ax_p_by(1., x, 2., y)
+        self.assertEqual(y.data.dtype, np.float32)
+        x.equals_lin_comb([1., -1.], [x, y])
+        self.assertEqual(x.data.dtype, np.float64)
+        self.assertTrue(np.all(x.data == [-2., -4., -6.]))
+
+    def test_complex_vecs(self):
+        x, y = self.alloc.alloc_state_complex(2)
+        self.assertEqual(x.data.dtype, np.complex128)
+        self.assertEqual(len(x.data), 4)
+        real = BaseVector(4, val=2.)
+        # complex coefficients and real operands give complex results
+        x.equals_ax_p_by(1., real, 1e-30j, real)
+        y.equals_ax_p_by(1., x, 1j, real)
+        real.equals_imag(y)
+        self.assertTrue(np.all(real.data == 2. + 2e-30))
+
+class TestCaseBlockAllocator(unittest.TestCase):
+
+    def setUp(self):
+        self.alloc = BlockAllocator(3, 4, 5)
+
+    def test_contiguous_views(self):
+        vecs = self.alloc.alloc_state(6)
+        self.assertEqual(len(vecs), 6)
+        block = self.alloc.state_blocks[0]
+        self.assertEqual(block.shape, (6, 4))
+        for i, vec in enumerate(vecs):
+            self.assertTrue(isinstance(vec, BaseVector))
+            self.assertTrue(vec.data.base is block)
+            vec.equals_value(float(i))
+        self.assertEqual(block[5, 0], 5.)
+
+    def test_operations_keep_views(self):
+        x, y, z = self.alloc.alloc_primal(3)
+        block = self.alloc.primal_blocks[0]
+        x.equals_value(1.)
+        y.equals_value(2.)
+        z.equals_ax_p_by(2., x, 3., y)
+        z.plus(x)
+        z.times_scalar(2.)
+        z.times_vector(y)
+        z.pow(1.)
+        self.assertTrue(z.data.base is block)
+        self.assertTrue(np.all(block[2] == 36.))
+        self.assertTrue(np.all(block[0] == 1.))
+
+    def test_low_vecs(self):
+        low = self.alloc.alloc_state_low(3)
+        block = self.alloc.state_blocks[-1]
+        self.assertEqual(block.dtype, np.float32)
+        self.assertTrue(low[1].data.base is block)
+        full = BaseVector(4, val=2.)
+        self.assertTrue(np.all(full.inner_many(low) == 0.))
+        low[0].equals_value(1.)
+        full.equals_lin_comb([1., 1.], [low[0], low[2]])
+        self.assertTrue(np.all(full.data == 1.))
+
+    def test_inner_many(self):
+        vecs = self.alloc.alloc_dual(4)
+        for i, vec in enumerate(vecs):
+            vec.equals_value(float(i+1))
+        x = BaseVector(5, val=1.)
+        # contiguous, strided and reversed rows all take the block path
+        for subset in [vecs, vecs[::2], vecs[::-1]]:
+            prods = x.inner_many(subset)
+            expected = [x.inner(vec) for vec in subset]
+            self.assertTrue(np.allclose(prods, expected))
+        # irregular spacing falls back to individual products
+        subset = [vecs[0], vecs[1], vecs[3]]
+        self.assertTrue(np.allclose(x.inner_many(subset), [5., 10., 20.]))
+        self.assertEqual(len(x.inner_many([])), 0)
+
+    def test_equals_lin_comb(self):
+        vecs = self.alloc.alloc_dual(4)
+        for i, vec in enumerate(vecs):
+            vec.equals_value(float(i+1))
+        x = BaseVector(5, val=1.)
+        # block path
+        x.equals_lin_comb([1., 2., 3.], vecs[:3])
+        self.assertTrue(np.all(x.data == 14.))
+        # block path with this vector aliased in the list
+        x.equals_lin_comb([0.5, 1., -1.], [x, vecs[3], vecs[1]])
+        self.assertTrue(np.all(x.data == 9.))
+        # the result is one of the block's own rows
+        vecs[0].equals_lin_comb([2., 1., 1.], vecs[::-2] + [vecs[0]])
+        self.assertTrue(np.all(vecs[0].data == 11.))
+        # the result lies between rows of the block view
+        vecs[1].equals_lin_comb([1., 1.], [vecs[0], vecs[2]])
+        self.assertTrue(np.all(vecs[1].data == 14.))
+        # irregular spacing falls back to repeated updates
+        vecs[0].equals_value(1.)
+        x.equals_lin_comb([1., 1., 1.], [vecs[0], vecs[1], vecs[3]])
+        self.assertTrue(np.all(x.data == 19.))
+        x.equals_lin_comb([], [])
+        self.assertTrue(np.all(x.data == 0.))
+        try:
+            x.equals_lin_comb([1.], vecs[:2])
+        except ValueError as err:
+            self.assertEqual(
+                str(err),
+                'number of coefficients must match the number of vectors')
+        else:
+            self.fail('ValueError expected')
+
 if __name__ == "__main__":
     unittest.main()
@@ -9,7 +9,7 @@ class DualVectorTestCase(unittest.TestCase):
 
     def setUp(self):
         solver = DummySolver(10, 10, 10)
-        self.km = km = KonaMemory(solver)
+        self.km = km = KonaMemory(solver, {'eval_cache_vecs' : 2})
 
         km.primal_factory.request_num_vectors(1)
         km.state_factory.request_num_vectors(1)
@@ -28,6 +28,45 @@ class DualVectorTestCase(unittest.TestCase):
         self.dv.equals_constraints(at_design, at_state)
         self.assertEqual(self.dv.inner(self.dv), 9000)
 
+    def test_cached_constraints(self):
+        calls = []
+        eval_constraints = self.km.solver.eval_constraints
+
+        def counted(at_design, at_state, store_here):
+            calls.append(1)
+            eval_constraints(at_design, at_state, store_here)
+
+        self.km.solver.eval_constraints = counted
+        self.pv.equals(1)
+        self.sv.equals(2)
+        self.dv.equals_constraints(self.pv, self.sv)
+        # the result is restored from the cache after being overwritten
+        self.dv.equals(0)
+        self.dv.equals_constraints(self.pv, self.sv)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.dv.inner(self.dv), 9000)
+        # a modified point is evaluated again
+        self.pv.equals(2)
+        self.dv.equals_constraints(self.pv, self.sv)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.dv.inner(self.dv), 16000)
+        self.assertEqual(self.km.eval_cache.hits, 1)
+
+        # the cached copies are generated from the dual factory
+        self.assertEqual(self.km.dual_factory.num_vecs, 3)
+        self.assertEqual(self.km.dual_factory.num_live, 3)
+
+    def test_cache_disabled(self):
+        # vector evaluations are only cached on request
+        km = KonaMemory(DummySolver(10, 10, 10))
+        self.assertEqual(km.eval_cache.size, 8)
+        self.assertEqual(km.eval_cache.vector_size, 0)
+        self.assertEqual(km.dual_factory.num_vecs, 0)
+        km.eval_cache.put_vector(self.dv, self.pv, self.sv)
+        self.assertFalse(
+            km.eval_cache.get_vector(self.dv, self.pv, self.sv))
+        self.assertEqual(km.eval_cache.misses, 0)
+
 class TestCaseDualVectorIDF(unittest.TestCase):
 
     def setUp(self):
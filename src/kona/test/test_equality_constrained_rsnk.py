@@ -4,17 +4,57 @@ import unittest
 from kona import Optimizer
 from kona.algorithms import ConstrainedRSNK
 from kona.examples import SimpleConstrained
+from kona.examples import Constrained2x2
+
+class AnalyticConstrained(SimpleConstrained):
+
+    def multiply_d2LdX2(self, at_design, at_state, at_adjoint, at_dual,
+                        in_vec, out_vec):
+        out_vec.data[:] = -2.*at_dual.data[0]*in_vec.data
+
+    def multiply_d2LdXdU(self, at_design, at_state, at_adjoint, at_dual,
+                         in_vec, out_vec):
+        out_vec.data[:] = 0.
+
+    def multiply_d2LdXdU_T(self, at_design, at_state, at_adjoint, at_dual,
+                           in_vec, out_vec):
+        pass
+
+    def multiply_d2LdU2(self, at_design, at_state, at_adjoint, at_dual,
+                        in_vec, out_vec):
+        pass
+
+class GuessConstrained(Constrained2x2):
+    """
+    Records the initial guesses of the adjoint solutions, with a constraint
+    jacobian that couples the multipliers into the adjoint right hand side.
+    """
+
+    def __init__(self):
+        super(GuessConstrained, self).__init__()
+        self.guesses = []
+        self.solutions = []
+
+    def multiply_dCdU(self, at_design, at_state, in_vec, out_vec):
+        out_vec.data[0] = numpy.sum(in_vec.data)
+
+    def multiply_dCdU_T(self, at_design, at_state, in_vec, out_vec):
+        out_vec.data[:] = in_vec.data[0]
+
+    def solve_adjoint(self, at_design, at_state, rhs_vec, rel_tol, result):
+        self.guesses.append(result.data.copy())
+        cost = super(GuessConstrained, self).solve_adjoint(
+            at_design, at_state, rhs_vec, rel_tol, result)
+        self.solutions.append(result.data.copy())
+        return cost
 
 class EqualityConstrainedRSNKTestCase(unittest.TestCase):
 
     # def test_dummy(self):
     #     self.failUnless('Untested')
 
-    def test_with_simple_constrained(self):
-
-        solver = SimpleConstrained(ineq=False)
-
-        optns = {
+    def get_options(self):
+        return {
             'info_file' : 'kona_info.dat',
             'max_iter' : 50,
             'primal_tol' : 1e-5,
@@ -51,6 +91,11 @@ class EqualityConstrainedRSNKTestCase(unittest.TestCase):
             },
         }
 
+    def test_with_simple_constrained(self):
+
+        solver = SimpleConstrained(ineq=False)
+        optns = self.get_options()
+
         algorithm = ConstrainedRSNK
         optimizer = Optimizer(solver, algorithm, optns)
         optimizer.solve()
@@ -61,5 +106,53 @@ class EqualityConstrainedRSNKTestCase(unittest.TestCase):
         diff = abs(solver.curr_design - expected)
         self.assertTrue(max(diff) < 1e-4)
 
+    def test_analytic_second_derivatives(self):
+
+        solver = AnalyticConstrained(ineq=False)
+        optimizer = Optimizer(solver, ConstrainedRSNK, self.get_options())
+        optimizer.solve()
+
+        expected = -1.*numpy.ones(solver.num_primal)
+        diff = abs(solver.curr_design - expected)
+        self.assertTrue(max(diff) < 1e-4)
+
+    def test_accepted_state_reused(self):
+
+        solver = SimpleConstrained(ineq=False)
+        designs = []
+        solve_nonlinear = solver.solve_nonlinear
+
+        def recorded(at_design, result):
+            designs.append(at_design.data.copy())
+            return solve_nonlinear(at_design, result)
+
+        solver.solve_nonlinear = recorded
+        optimizer = Optimizer(solver, ConstrainedRSNK, self.get_options())
+        optimizer.solve()
+
+        # accepted trial points are never solved for a second time
+        self.assertTrue(len(designs) > 2)
+        for i in xrange(1, len(designs)):
+            self.assertFalse(numpy.all(designs[i] == designs[i-1]))
+
+    def test_adjoint_initial_guess(self):
+
+        solver = GuessConstrained()
+        optns = self.get_options()
+        optns['max_iter'] = 5
+        optimizer = Optimizer(solver, ConstrainedRSNK, optns)
+        optimizer.solve()
+
+        # adjoint solutions start from zero or from a previous adjoint,
+        # never from scratch data
+        warm = 0
+        for guess in solver.guesses:
+            if numpy.all(guess == 0.):
+                continue
+            self.assertTrue(any(
+                numpy.all(guess == sol) for sol in solver.solutions))
+            warm += 1
+        self.assertTrue(warm > 0)
+
 if __name__ == "__main__":
     unittest.main()
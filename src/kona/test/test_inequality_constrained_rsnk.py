@@ -4,6 +4,7 @@ import unittest
 from kona import Optimizer
 from kona.algorithms import ConstrainedRSNK
 from kona.examples import SimpleConstrained, ExponentialConstrained
+from kona.user import BlockAllocator
 
 class InequalityConstrainedRSNKTestCase(unittest.TestCase):
 
@@ -70,7 +71,7 @@ class InequalityConstrainedRSNKTestCase(unittest.TestCase):
     #     diff = abs(solver.curr_design - expected)
     #     self.assertTrue(max(diff) < 1e-4)
 
-    def test_with_simple_constrained(self):
+    def test_with_simple_constrained(self, packed=False):
 
         feasible = False
         if feasible:
@@ -79,6 +80,9 @@ class InequalityConstrainedRSNKTestCase(unittest.TestCase):
             init_x = [1.51, 1.52, 1.53]
 
         solver = SimpleConstrained(init_x=init_x, ineq=True)
+        if packed:
+            solver.allocator = BlockAllocator(
+                solver.num_primal, solver.num_state, solver.num_dual)
 
         optns = {
             'info_file' : 'kona_info.dat',
@@ -126,6 +130,13 @@ class InequalityConstrainedRSNKTestCase(unittest.TestCase):
         expected = -1.*numpy.ones(solver.num_primal)
         diff = abs(solver.curr_design - expected)
         self.assertTrue(max(diff) < 1e-4)
+        return optimizer
+
+    def test_packed_simple_constrained(self):
+        optimizer = self.test_with_simple_constrained(packed=True)
+        kf = optimizer._memory.kkt_factory(slack=True)
+        self.assertTrue(kf.packed)
+        self.assertTrue(kf.peak_live > 0)
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,29 @@
 import gc
 import unittest
+from StringIO import StringIO
+
+import numpy as np
 
 from kona.linalg.memory import KonaMemory
-from kona.linalg.vectors.common import PrimalVector
+from kona.linalg.vectors.common import PrimalVector, StateVector
 from kona.user.user_solver import UserSolver
+from kona.user.base_vectors import BaseVector, BaseAllocator
+
+class CustomVector(BaseVector):
+    pass
+
+class CustomAllocator(BaseAllocator):
+
+    def alloc_primal(self, count):
+        return [CustomVector(self.num_primal) for i in xrange(count)]
+
+class VectorConsumer(object):
+
+    def __init__(self, factory):
+        self.factory = factory
+
+    def make_vectors(self, count):
+        return [self.factory.generate() for i in xrange(count)]
 
 class VectorFactoryTestCase(unittest.TestCase):
 
@@ -28,6 +48,204 @@ class VectorFactoryTestCase(unittest.TestCase):
         gc.collect()
         self.assertEqual(len(km.vector_stack[PrimalVector]), 12)
 
+    def test_release(self):
+        solver = UserSolver()
+        km = KonaMemory(solver)
+        vf = km.primal_factory
+
+        vf.request_num_vectors(3)
+        km.allocate_memory()
+
+        vec0 = vf.generate()
+        vec1 = vf.generate()
+        self.assertEqual(len(km.vector_stack[PrimalVector]), 1)
+
+        vec0.release()
+        self.assertEqual(len(km.vector_stack[PrimalVector]), 2)
+        self.assertTrue(vec0._data is None)
+
+        # releasing twice and deleting a released vector are both no-ops
+        vec0.release()
+        del vec0
+        self.assertEqual(len(km.vector_stack[PrimalVector]), 2)
+
+        # pushing the same data twice does not duplicate it on the stack
+        km.push_vector(PrimalVector, vec1._data)
+        km.push_vector(PrimalVector, vec1._data)
+        self.assertEqual(len(km.vector_stack[PrimalVector]), 3)
+
+    def test_scope(self):
+        solver = UserSolver()
+        km = KonaMemory(solver)
+        vf = km.primal_factory
+
+        vf.request_num_vectors(4)
+        km.allocate_memory()
+
+        outside = vf.generate()
+        with vf.scope() as scope:
+            vec0 = vf.generate()
+            with vf.scope():
+                vec1 = vf.generate()
+                vec2 = vf.generate()
+            self.assertEqual(len(km.vector_stack[PrimalVector]), 2)
+            self.assertTrue(vec1._data is None and vec2._data is None)
+            self.assertEqual(scope.vectors, [vec0])
+        self.assertEqual(len(km.vector_stack[PrimalVector]), 3)
+        self.assertTrue(vec0._data is None)
+        self.assertTrue(outside._data is not None)
+
+    def test_pool(self):
+        solver = UserSolver()
+        km = KonaMemory(solver, {'pool' : True, 'chunk_size' : 3})
+        vf = km.primal_factory
+
+        # nothing is allocated up front
+        km.allocate_memory()
+        self.assertEqual(len(km.vector_stack[PrimalVector]), 0)
+        self.assertEqual(vf.num_allocated, 0)
+
+        vecs = [vf.generate() for i in xrange(4)]
+        self.assertEqual(vf.num_allocated, 6)
+        self.assertEqual(len(km.vector_stack[PrimalVector]), 2)
+        self.assertEqual(vf.num_live, 4)
+
+        # returned vectors are reused before the pool grows again
+        vecs[0].release()
+        vecs[1].release()
+        self.assertEqual(vf.num_live, 2)
+        vecs = vecs[2:] + [vf.generate() for i in xrange(4)]
+        self.assertEqual(vf.num_allocated, 6)
+        self.assertEqual(vf.num_live, 6)
+        self.assertEqual(vf.peak_live, 6)
+
+    def test_pool_cap(self):
+        solver = UserSolver()
+        km = KonaMemory(
+            solver, {'pool' : True, 'chunk_size' : 4, 'max_vecs' : 5})
+        vf = km.state_factory
+        km.allocate_memory()
+
+        vecs = [vf.generate() for i in xrange(5)]
+        self.assertEqual(vf.num_allocated, 5)
+        try:
+            vf.generate()
+        except MemoryError as err:
+            self.assertEqual(
+                str(err),
+                'No more vector memory available. ' +
+                'Vector pool is capped at 5 vectors')
+        else:
+            self.fail('MemoryError expected')
+
+    def test_memory_report(self):
+        solver = UserSolver(3, 4, 0)
+        km = KonaMemory(solver)
+        km.primal_factory.request_num_vectors(5)
+        km.state_factory.request_num_vectors(2)
+        km.allocate_memory()
+
+        consumer = VectorConsumer(km.primal_factory)
+        vecs = consumer.make_vectors(3)
+        other = km.primal_factory.generate()
+        vecs[0].release()
+        vecs[1].release()
+
+        report = km.memory_report()
+        primal = report['primal']
+        self.assertEqual(primal['requested'], 5)
+        self.assertEqual(primal['allocated'], 5)
+        self.assertEqual(primal['live'], 2)
+        self.assertEqual(primal['peak'], 4)
+        self.assertEqual(primal['bytes_per_vec'], 3*8)
+        self.assertEqual(primal['peak_bytes'], 4*3*8)
+        self.assertEqual(
+            primal['components']['VectorConsumer'], {'live' : 1, 'peak' : 3})
+        self.assertEqual(
+            primal['components']['VectorFactoryTestCase'],
+            {'live' : 1, 'peak' : 1})
+        self.assertEqual(report['state']['peak'], 0)
+        self.assertEqual(report['state']['bytes_per_vec'], 4*8)
+        self.assertEqual(report['dual']['peak_bytes'], None)
+
+        out_file = StringIO()
+        km.write_memory_report(out_file)
+        self.assertTrue('VectorConsumer' in out_file.getvalue())
+
+    def test_low_precision(self):
+        solver = UserSolver(3, 0, 0)
+        km = KonaMemory(solver)
+        vf = km.primal_factory
+        vf.request_num_vectors(1)
+        vf.request_num_vectors(2, low_precision=True)
+        km.allocate_memory()
+        self.assertEqual(len(km.vector_stack[PrimalVector]), 1)
+        self.assertEqual(len(km.low_stack[PrimalVector]), 2)
+
+        vec = vf.generate(low_precision=True)
+        self.assertEqual(vec._data.data.dtype, np.float32)
+        self.assertEqual(vf.generate()._data.data.dtype, np.float64)
+
+        # released vectors go back to the stack they came from
+        vec.release()
+        self.assertEqual(len(km.vector_stack[PrimalVector]), 1)
+        self.assertEqual(len(km.low_stack[PrimalVector]), 2)
+
+        # pool mode grows the low-precision stack separately
+        km = KonaMemory(solver, {'pool' : True, 'chunk_size' : 2})
+        vf = km.primal_factory
+        km.allocate_memory()
+        vec = vf.generate(low_precision=True)
+        self.assertEqual(vec._data.data.dtype, np.float32)
+        self.assertEqual(len(km.low_stack[PrimalVector]), 1)
+        self.assertEqual(len(km.vector_stack[PrimalVector]), 0)
+
+    def test_low_precision_fallback(self):
+        # allocators that only override the full precision methods must not
+        # inherit the default single precision vectors
+        solver = UserSolver(3, 0, 0)
+        solver.allocator = CustomAllocator(3, 0, 0)
+        km = KonaMemory(solver)
+        vf = km.primal_factory
+        vf.request_num_vectors(2, low_precision=True)
+        km.allocate_memory()
+        vec = vf.generate(low_precision=True)
+        self.assertTrue(isinstance(vec._data, CustomVector))
+        self.assertEqual(vec._data.data.dtype, np.float64)
+
+        km = KonaMemory(solver, {'pool' : True, 'chunk_size' : 2})
+        vf = km.primal_factory
+        km.allocate_memory()
+        vec = vf.generate(low_precision=True)
+        self.assertTrue(isinstance(vec._data, CustomVector))
+
+    def test_alloc_complex(self):
+        solver = UserSolver(3, 2, 0)
+        km = KonaMemory(solver)
+        km.primal_factory.request_num_vectors(1)
+        km.allocate_memory()
+        vecs = km.alloc_complex(PrimalVector, 2)
+        self.assertTrue(isinstance(vecs[0], PrimalVector))
+        self.assertEqual(vecs[0]._data.data.dtype, np.complex128)
+
+        # complex vectors never enter the memory stacks
+        del vecs
+        gc.collect()
+        self.assertEqual(len(km.vector_stack[PrimalVector]), 1)
+        self.assertEqual(len(km.complex_ids), 2)
+
+        # a custom allocator does not inherit the default complex vectors
+        solver.allocator = CustomAllocator(3, 2, 0)
+        try:
+            km.alloc_complex(PrimalVector, 1)
+        except NotImplementedError as err:
+            self.assertEqual(
+                str(err),
+                'KonaMemory.alloc_complex() >> ' +
+                'Allocator does not implement alloc_primal_complex()!')
+        else:
+            self.fail('NotImplementedError expected')
+
     def test_error_generate(self):
         solver = UserSolver()
         km = KonaMemory(solver)
@@ -76,6 +294,36 @@ class VectorFactoryTestCase(unittest.TestCase):
         else:
             self.fail('MemoryError expected')
 
+    def test_eval_cache(self):
+        solver = UserSolver(2)
+        km = KonaMemory(solver, {'eval_cache' : 2})
+        km.primal_factory.request_num_vectors(3)
+        km.state_factory.request_num_vectors(1)
+        km.allocate_memory()
+        designs = [km.primal_factory.generate() for i in xrange(3)]
+        state = km.state_factory.generate()
+        cache = km.eval_cache
+
+        for i, design in enumerate(designs):
+            cache.put_objective(design, state, float(i))
+        # the least recently used entry was evicted
+        self.assertEqual(cache.get_objective(designs[0], state), None)
+        self.assertEqual(cache.get_objective(designs[1], state), 1.)
+        self.assertEqual(cache.get_objective(designs[2], state), 2.)
+        designs[2].equals(1.)
+        self.assertEqual(cache.get_objective(designs[2], state), None)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 2)
+
+        try:
+            KonaMemory(solver, {'eval_cache' : -1})
+        except ValueError as err:
+            self.assertEqual(
+                str(err),
+                'EvaluationCache() >> Cache size cannot be negative.')
+        else:
+            self.fail('ValueError expected')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -7,7 +7,7 @@ import kona
 from kona.linalg.solvers.util import eigen_decomp, abs_sign, calc_epsilon
 from kona.linalg.solvers.util import apply_givens, generate_givens, solve_tri
 from kona.linalg.solvers.util import secular_function, solve_trust_reduced, EPS
-from kona.linalg.solvers.util import lanczos
+from kona.linalg.solvers.util import lanczos, mod_gram_schmidt, cgs2
 from kona.user import UserSolver
 from kona.linalg.memory import KonaMemory
 
@@ -161,6 +161,37 @@ class KrylovUtilTestCase(unittest.TestCase):
 
         self.assertTrue(rel_error <= 0.1)
 
+    def test_cgs2(self):
+        solver = UserSolver(6, 0, 0)
+        km = KonaMemory(solver)
+        pf = km.primal_factory
+        pf.request_num_vectors(8)
+        km.allocate_memory()
+
+        A = np.random.random_sample((6, 4))
+        W = []
+        W_mgs = []
+        for j in xrange(4):
+            W.append(pf.generate())
+            W[j]._data.data[:] = A[:, j]
+            W_mgs.append(pf.generate())
+            W_mgs[j]._data.data[:] = A[:, j]
+
+        H = np.zeros((4, 3))
+        H_mgs = np.zeros((4, 3))
+        cgs2(-1, H, W)
+        mod_gram_schmidt(-1, H_mgs, W_mgs)
+        for i in xrange(3):
+            cgs2(i, H, W)
+            mod_gram_schmidt(i, H_mgs, W_mgs)
+
+        # basis must be orthonormal and match modified Gram-Schmidt
+        Q = np.array([w._data.data for w in W]).T
+        self.assertTrue(np.allclose(Q.T.dot(Q), np.eye(4)))
+        Q_mgs = np.array([w._data.data for w in W_mgs]).T
+        self.assertTrue(np.allclose(Q, Q_mgs))
+        self.assertTrue(np.allclose(H, H_mgs))
+
     def test_secular_function(self):
 
         # The eigenvalues of the following matrix are (1e-5, 0.01, 1)
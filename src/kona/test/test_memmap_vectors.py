@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from kona.user import BaseVector
+from kona.user import MemmapVector
+from kona.user import MemmapAllocator
+from kona.linalg.memory import KonaMemory
+from kona.linalg.solvers.krylov import FGMRES
+from kona.linalg.matrices.common import IdentityMatrix
+from kona.user import UserSolver
+
+class MemmapVectorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.scratch = tempfile.mkdtemp()
+        # chunk size does not divide the vector size, to test the last chunk
+        self.alloc = MemmapAllocator(
+            0, 10, 0, scratch_dir=self.scratch, in_core=1, chunk_size=3)
+        self.x, self.y, self.z, self.r = self.alloc.alloc_state(4)
+        self.x.equals_value(1.)
+        self.y.equals_value(2.)
+        self.z.data[:] = np.linspace(0, 10, 10)
+
+    def tearDown(self):
+        shutil.rmtree(self.scratch)
+
+    def test_allocation(self):
+        for vec in [self.x, self.y, self.z]:
+            self.assertTrue(isinstance(vec, MemmapVector))
+            self.assertTrue(isinstance(vec.data, np.memmap))
+        self.assertFalse(isinstance(self.r, MemmapVector))
+        self.assertTrue(isinstance(self.r, BaseVector))
+        self.assertEqual(len(self.alloc.alloc_primal(2)[0].data), 0)
+        # scratch files are removed as soon as they are mapped
+        self.assertEqual(os.listdir(self.scratch), [])
+
+    def test_in_core_budget(self):
+        # the in-core vectors are shared by all requests in a space
+        self.assertEqual(len(self.alloc.alloc_state(3)), 3)
+        self.assertTrue(all(
+            isinstance(vec, MemmapVector)
+            for vec in self.alloc.alloc_state(3)))
+        low = self.alloc.alloc_state_low(1)[0]
+        self.assertTrue(isinstance(low, MemmapVector))
+
+        # this also holds for the chunks of a vector pool
+        solver = UserSolver(
+            allocator=MemmapAllocator(
+                4, 0, 0, scratch_dir=self.scratch, in_core=2,
+                spaces=['primal']))
+        km = KonaMemory(solver, {'pool' : True, 'chunk_size' : 3})
+        pf = km.primal_factory
+        km.allocate_memory()
+        vecs = [pf.generate() for i in xrange(9)]
+        num_in_core = len([vec for vec in vecs
+                           if not isinstance(vec._data, MemmapVector)])
+        self.assertEqual(num_in_core, 2)
+
+    def test_bad_space(self):
+        try:
+            MemmapAllocator(1, 1, 1, spaces=['design'])
+        except ValueError as err:
+            self.assertEqual(
+                str(err), 'MemmapAllocator() >> Unknown vector space: design')
+        else:
+            self.fail('ValueError expected')
+
+    def test_operations(self):
+        ref = BaseVector(10, val=np.linspace(0, 10, 10))
+        x_ref = BaseVector(10, val=1.)
+        y_ref = BaseVector(10, val=2.)
+        for vec, x, y in [(self.z, self.x, self.y), (ref, x_ref, y_ref)]:
+            vec.plus(x)
+            vec.times_scalar(2.)
+            vec.times_vector(y)
+            vec.equals_ax_p_by(0.5, vec, 3., y)
+            vec.equals_lin_comb([1., -1., 2.], [vec, x, y])
+            vec.pow(0.5)
+            vec.log(vec)
+            vec.exp(vec)
+        self.assertTrue(np.allclose(self.z.data, ref.data))
+        self.assertAlmostEqual(self.z.inner(self.y), ref.inner(y_ref))
+        self.assertTrue(np.allclose(
+            self.z.inner_many([self.x, self.y, self.z]),
+            [ref.inner(x_ref), ref.inner(y_ref), ref.inner(ref)]))
+        self.assertAlmostEqual(self.z.infty, ref.infty)
+
+    def test_mixed_operands(self):
+        # in-core and out-of-core vectors can be combined freely
+        self.r.equals_value(3.)
+        self.x.equals_ax_p_by(1., self.r, 2., self.y)
+        self.assertTrue(np.all(self.x.data == 7.))
+        self.r.equals_ax_p_by(1., self.x, -1., self.r)
+        self.assertTrue(np.all(self.r.data == 4.))
+        self.assertEqual(self.r.inner(self.y), 80.)
+        self.assertEqual(self.y.inner(self.r), 80.)
+
+    def test_fgmres(self):
+        solver = UserSolver(
+            allocator=MemmapAllocator(
+                4, 0, 0, scratch_dir=self.scratch, in_core=2, chunk_size=3,
+                spaces=['primal']))
+        km = KonaMemory(solver)
+        pf = km.primal_factory
+        pf.request_num_vectors(2)
+        krylov = FGMRES(pf, {'max_iter' : 30, 'rel_tol' : 1e-3})
+        km.allocate_memory()
+
+        x = pf.generate()
+        b = pf.generate()
+        b.equals(1)
+        A = np.array([[4, 3, 2, 1],
+                      [3, 4, 3, 2],
+                      [2, 3, 4, 3],
+                      [1, 2, 3, 4]])
+
+        def mat_vec(in_vec, out_vec):
+            out_vec._data.data[:] = A.dot(in_vec._data.data)
+
+        x.equals(0)
+        krylov.solve(mat_vec, b, x, IdentityMatrix().product)
+        expected = np.linalg.solve(A, np.ones(4))
+        self.assertTrue(max(abs(x._data.data - expected)) < 1.e-6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Tests for the MPI vector backend. These run on any number of processes, e.g.:
+
+    mpirun -n 4 python -m unittest kona.test.test_mpi_vectors
+"""
+import unittest
+
+import numpy as np
+
+from kona.user import BaseVector
+from kona.user import MPIVector
+from kona.user import MPIAllocator
+from kona.user.mpi_vectors import mpi4py_exists
+from kona.linalg.memory import KonaMemory
+from kona.linalg.solvers.krylov import FGMRES
+from kona.linalg.matrices.common import IdentityMatrix
+from kona.user import UserSolver
+
+if mpi4py_exists:
+    from mpi4py import MPI
+
+@unittest.skipIf(not mpi4py_exists, 'mpi4py not installed')
+class MPIVectorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.comm = MPI.COMM_WORLD
+        self.rank = self.comm.rank
+        self.size = self.comm.size
+        # rank 0 owns an empty slice of the dual space
+        self.alloc = MPIAllocator(
+            3, 3, 1 if self.rank > 0 else 0, distributed=['state', 'dual'])
+        self.x, self.y = self.alloc.alloc_state(2)
+        self.x.equals_value(1.)
+        # global y is 1, 2, ..., 3*size
+        self.y.data[:] = np.arange(3*self.rank + 1, 3*self.rank + 4)
+
+    def test_allocation(self):
+        self.assertTrue(isinstance(self.x, MPIVector))
+        self.assertTrue(self.x.comm is self.comm)
+        self.assertTrue(isinstance(self.alloc.alloc_dual(1)[0], MPIVector))
+        # replicated spaces use plain vectors
+        primal = self.alloc.alloc_primal(1)[0]
+        self.assertFalse(isinstance(primal, MPIVector))
+        self.assertTrue(isinstance(primal, BaseVector))
+        low = self.alloc.alloc_state_low(1)[0]
+        self.assertEqual(low.data.dtype, np.float32)
+
+    def test_dense_primal_size(self):
+        # distributed design spaces stay matrix-free
+        self.assertEqual(self.alloc.dense_primal_size(), 3)
+        alloc = MPIAllocator(3, 3, 0)
+        self.assertEqual(alloc.dense_primal_size(), None)
+        km = KonaMemory(UserSolver(3, 3, 0))
+        km.solver.allocator = alloc
+        self.assertEqual(km.dense_design_size(), None)
+
+    def test_bad_space(self):
+        try:
+            MPIAllocator(1, 1, 1, distributed=['design'])
+        except ValueError as err:
+            self.assertEqual(
+                str(err), 'MPIAllocator() >> Unknown vector space: design')
+        else:
+            self.fail('ValueError expected')
+
+    def test_reductions(self):
+        n = 3*self.size
+        self.assertEqual(self.x.inner(self.x), n)
+        self.assertEqual(self.x.inner(self.y), n*(n + 1)/2)
+        self.assertTrue(np.all(
+            self.x.inner_many([self.x, self.y]) == [n, n*(n + 1)/2]))
+        self.y.times_scalar(-1.)
+        self.assertEqual(self.y.infty, n)
+        dual = self.alloc.alloc_dual(1)[0]
+        dual.equals_value(2.)
+        self.assertEqual(dual.inner(dual), 4.*(self.size - 1))
+        self.assertEqual(dual.infty, 2. if self.size > 1 else 0.)
+
+    def test_local_operations(self):
+        self.x.equals_ax_p_by(2., self.x, 1., self.y)
+        self.assertTrue(np.all(self.x.data == self.y.data + 2.))
+        self.x.equals_lin_comb([1., -1.], [self.x, self.y])
+        self.assertTrue(np.all(self.x.data == 2.))
+
+    def test_fgmres(self):
+        solver = UserSolver(allocator=MPIAllocator(2, 0, 0))
+        km = KonaMemory(solver)
+        pf = km.primal_factory
+        pf.request_num_vectors(2)
+        krylov = FGMRES(pf, {'max_iter' : 30, 'rel_tol' : 1e-8})
+        km.allocate_memory()
+
+        x = pf.generate()
+        b = pf.generate()
+        b.equals(1)
+        # block diagonal system, each process owns one 2x2 block
+        A = np.array([[4., 1.],
+                      [1., 3. + self.rank]])
+
+        def mat_vec(in_vec, out_vec):
+            out_vec._data.data[:] = A.dot(in_vec._data.data)
+
+        x.equals(0)
+        krylov.solve(mat_vec, b, x, IdentityMatrix().product)
+        expected = np.linalg.solve(A, np.ones(2))
+        self.assertTrue(max(abs(x._data.data - expected)) < 1.e-6)
+
+if __name__ == "__main__":
+    unittest.main()
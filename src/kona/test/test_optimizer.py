@@ -1,4 +1,7 @@
+import json
 import unittest
+from StringIO import StringIO
+
 import numpy
 
 import kona
@@ -19,5 +22,67 @@ class OptimizerTestCase(unittest.TestCase):
         diff = max(abs(solver.curr_design - expected))
         self.assertTrue(diff < 1.e-5)
 
+    def test_rosenbrock_pool(self):
+        num_design = 2
+        solver = kona.examples.Rosenbrock(num_design)
+        optns = {
+            'primal_tol' : 1e-12,
+            'memory' : {
+                'pool' : True,
+                'chunk_size' : 2,
+            },
+        }
+        algorithm = kona.algorithms.ReducedSpaceQuasiNewton
+        optimizer = kona.Optimizer(solver, algorithm, optns)
+        optimizer.solve()
+
+        expected = numpy.ones(num_design)
+        diff = max(abs(solver.curr_design - expected))
+        self.assertTrue(diff < 1.e-5)
+
+        # only what was actually used gets allocated
+        pf = optimizer._memory.primal_factory
+        self.assertTrue(pf.peak_live <= pf.num_allocated)
+        self.assertTrue(pf.num_allocated < pf.peak_live + 2)
+
+        # the memory report is available after the solve
+        report = optimizer.memory_report
+        self.assertEqual(report['primal']['peak'], pf.peak_live)
+        self.assertTrue(
+            'LimitedMemoryBFGS' in report['primal']['components'])
+
+    def test_rosenbrock_profile(self):
+        solver = kona.examples.Rosenbrock(2)
+        hist_file = StringIO()
+        json_file = StringIO()
+        optns = {
+            'primal_tol' : 1e-12,
+            'hist_file' : hist_file,
+            'profile' : {
+                'vectors' : True,
+                'solver' : True,
+                'json_file' : json_file,
+            },
+        }
+        algorithm = kona.algorithms.ReducedSpaceQuasiNewton
+        optimizer = kona.Optimizer(solver, algorithm, optns)
+        optimizer.solve()
+
+        summary = optimizer.vector_profiler.summary()
+        self.assertTrue(len(summary) > 1)
+        self.assertTrue(summary[1]['PrimalVector.inner']['calls'] > 0)
+        self.assertTrue(
+            '# Kona vector operation profile' in hist_file.getvalue())
+        data = json.loads(json_file.getvalue())
+        self.assertEqual(len(data['iterations']), len(summary))
+
+        # every solver callback is counted per outer iteration
+        summary = optimizer.solver_profiler.summary()
+        self.assertEqual(summary[1]['current_solution']['calls'], 1)
+        self.assertTrue(summary[1]['eval_obj']['calls'] > 0)
+        self.assertTrue(
+            '# Kona solver callback profile' in hist_file.getvalue())
+        self.assertFalse('eval_obj' in solver.__dict__)
+
 if __name__ == "__main__":
     unittest.main()
@@ -5,6 +5,24 @@ from kona.linalg.memory import KonaMemory
 from kona.user import UserSolverIDF
 from dummy_solver import DummySolver
 
+class LegacyVector(object):
+    """User vector that only implements the required interface."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def equals_value(self, val):
+        self.data[:] = val
+
+    def times_scalar(self, val):
+        self.data[:] = val*self.data
+
+    def equals_ax_p_by(self, a, x, b, y):
+        self.data[:] = a*x.data + b*y.data
+
+    def inner(self, vector):
+        return np.inner(self.data, vector.data)
+
 class PrimalVectorTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -116,6 +134,34 @@ class PrimalVectorTestCase(unittest.TestCase):
         pv2.equals_ax_p_by(2, self.pv, 3, pv2)
         self.assertEqual(pv2.inner(self.pv), 50)
 
+    def test_inner_many(self):
+        pv2 = self.km.primal_factory.generate()
+        self.pv.equals(1)
+        pv2.equals(2)
+        prods = self.pv.inner_many([self.pv, pv2])
+        self.assertTrue(np.all(prods == [10., 20.]))
+
+        # user vectors without inner_many() fall back to inner()
+        self.pv._data = LegacyVector(self.pv._data.data)
+        pv2._data = LegacyVector(pv2._data.data)
+        prods = self.pv.inner_many([self.pv, pv2])
+        self.assertTrue(np.all(prods == [10., 20.]))
+
+    def test_equals_lin_comb(self):
+        pv2 = self.km.primal_factory.generate()
+        self.pv.equals(1)
+        pv2.equals(2)
+        self.pv.equals_lin_comb([3., 2.], [self.pv, pv2])
+        self.assertTrue(np.all(self.pv._data.data == 7.))
+
+        # user vectors without equals_lin_comb() fall back to equals_ax_p_by()
+        self.pv._data = LegacyVector(self.pv._data.data)
+        pv2._data = LegacyVector(pv2._data.data)
+        self.pv.equals_lin_comb([2., 1., 1.], [pv2, self.pv, pv2])
+        self.assertTrue(np.all(self.pv._data.data == 13.))
+        self.pv.equals_lin_comb([3.], [pv2])
+        self.assertTrue(np.all(self.pv._data.data == 6.))
+
     def test_init_design(self):
         self.pv.equals_init_design()
         self.assertEqual(self.pv.inner(self.pv), 1000)
@@ -154,6 +200,25 @@ class PrimalVectorTestCase(unittest.TestCase):
             at_design, at_state, at_adjoint, at_dual, primal_work)
         self.assertEqual(self.pv.inner(self.pv), 256000)
 
+    def test_version(self):
+        pv2 = self.km.primal_factory.generate()
+        self.assertNotEqual(self.pv._version, pv2._version)
+        # reads keep the version
+        version = self.pv._version
+        self.pv.inner(pv2)
+        self.pv.norm2
+        self.assertEqual(self.pv._version, version)
+        # every modification draws a new, larger stamp
+        for op in [lambda: self.pv.equals(1.),
+                   lambda: self.pv.plus(pv2),
+                   lambda: self.pv.divide_by(2.),
+                   lambda: self.pv.equals_lin_comb([1.], [pv2]),
+                   lambda: self.pv.equals_init_design(),
+                   lambda: self.pv.equals_objective_partial(pv2, self.sv)]:
+            op()
+            self.assertTrue(self.pv._version > version)
+            version = self.pv._version
+
 class TestCasePrimalVectorIDF(unittest.TestCase):
 
     def setUp(self):
@@ -0,0 +1,165 @@
+import json
+import unittest
+from StringIO import StringIO
+
+from kona.linalg import current_solution
+from kona.linalg.memory import KonaMemory
+from kona.linalg.profiler import VectorProfiler, SolverProfiler
+from kona.linalg.vectors.common import KonaVector
+from kona.linalg.vectors.composite import CompositeVector
+from kona.user import UserSolver
+
+class CountingSolver(UserSolver):
+
+    def eval_obj(self, at_design, at_state):
+        return at_design.inner(at_design)
+
+    def eval_dFdX(self, at_design, at_state, store_here):
+        # internal calls to other callbacks are recorded too
+        self.eval_obj(at_design, at_state)
+        store_here.equals_vector(at_design)
+        store_here.times_scalar(2.)
+
+class VectorProfilerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.km = KonaMemory(UserSolver(3, 0, 2))
+        self.km.primal_factory.request_num_vectors(2)
+        self.kf = self.km.kkt_factory()
+        self.kf.request_num_vectors(2)
+        self.km.allocate_memory()
+        self.profiler = VectorProfiler()
+        self.km.profilers.append(self.profiler)
+
+    def tearDown(self):
+        self.profiler.stop()
+
+    def test_records(self):
+        x = self.km.primal_factory.generate()
+        y = self.km.primal_factory.generate()
+        inner = KonaVector.__dict__['inner']
+        self.profiler.start()
+        x.equals(1.)
+        y.equals_ax_p_by(2., x, 0., x)
+        self.assertEqual(x.inner(y), 6.)
+        current_solution(x, num_iter=1)
+        self.assertEqual(y.norm2, 12.**0.5)
+        self.profiler.stop()
+        # the original methods are restored
+        self.assertTrue(KonaVector.__dict__['inner'] is inner)
+        x.inner(y)
+
+        records = self.profiler.records
+        self.assertEqual(sorted(records.keys()), [0, 1])
+        self.assertEqual(
+            records[0][('PrimalVector.equals_ax_p_by',)][:2], [1, 72])
+        # nested operations are recorded under their caller
+        self.assertEqual(
+            records[1][('PrimalVector.norm2', 'PrimalVector.inner')][:2],
+            [1, 48])
+        summary = self.profiler.summary()
+        self.assertEqual(summary[0]['PrimalVector.inner']['calls'], 1)
+        self.assertEqual(summary[0]['PrimalVector.inner']['bytes'], 48)
+        self.assertEqual(summary[1]['PrimalVector.norm2']['bytes'], 24)
+        self.assertTrue(summary[1]['PrimalVector.norm2']['time'] >=
+                        summary[1]['PrimalVector.inner']['time'])
+
+    def test_composite(self):
+        x = self.kf.generate()
+        y = self.kf.generate()
+        self.profiler.start()
+        x.equals(1.)
+        y.equals_lin_comb([1., 2.], [x, x])
+        self.assertEqual(x.inner_many([y])[0], 15.)
+        self.profiler.stop()
+        summary = self.profiler.summary()[0]
+        self.assertEqual(summary['ReducedKKTVector.equals']['calls'], 1)
+        self.assertEqual(summary['PrimalVector.equals']['calls'], 1)
+        self.assertEqual(summary['DualVector.equals']['calls'], 1)
+        self.assertEqual(
+            summary['ReducedKKTVector.equals_lin_comb']['bytes'], 3*40)
+
+        out_file = StringIO()
+        self.profiler.write_summary(out_file)
+        lines = out_file.getvalue().split('\n')
+        self.assertEqual(lines[1], '# Kona vector operation profile')
+        self.assertTrue('ReducedKKTVector.inner_many' in out_file.getvalue())
+
+        out_file = StringIO()
+        self.profiler.write_json(out_file)
+        data = json.loads(out_file.getvalue())
+        self.assertEqual(len(data['iterations']), 1)
+        stacks = [entry['stack'] for entry in data['iterations'][0]['stacks']]
+        self.assertTrue(
+            ['ReducedKKTVector.inner_many', 'DualVector.inner_many'] in stacks)
+
+    def test_one_at_a_time(self):
+        self.profiler.start()
+        try:
+            VectorProfiler().start()
+        except RuntimeError as err:
+            self.assertEqual(
+                str(err),
+                'VectorProfiler() >> Another profiler is already running.')
+        else:
+            self.fail('RuntimeError expected')
+        self.profiler.stop()
+        self.assertTrue(isinstance(CompositeVector.__dict__['norm2'], property))
+
+class SolverProfilerTestCase(unittest.TestCase):
+
+    def test_records(self):
+        solver = CountingSolver(3, 1, 0)
+        km = KonaMemory(solver)
+        km.primal_factory.request_num_vectors(2)
+        km.state_factory.request_num_vectors(1)
+        km.allocate_memory()
+        profiler = SolverProfiler(solver)
+        km.profilers.append(profiler)
+        x = km.primal_factory.generate()
+        grad = km.primal_factory.generate()
+        state = km.state_factory.generate()
+        x.equals(1.)
+
+        profiler.start()
+        self.assertTrue('eval_obj' in solver.__dict__)
+        grad.equals_objective_partial(x, state)
+        current_solution(x, num_iter=1)
+        for i in xrange(3):
+            grad.equals_objective_partial(x, state)
+        profiler.stop()
+        self.assertFalse('eval_obj' in solver.__dict__)
+        self.assertEqual(solver.eval_obj.__name__, 'eval_obj')
+
+        summary = profiler.summary()
+        self.assertEqual(sorted(summary.keys()), [0, 1])
+        self.assertEqual(summary[0]['eval_dFdX']['calls'], 1)
+        self.assertEqual(summary[0]['eval_obj']['calls'], 1)
+        self.assertEqual(summary[1]['current_solution']['calls'], 1)
+        self.assertEqual(summary[1]['eval_dFdX']['calls'], 3)
+        entry = summary[1]['eval_dFdX']
+        self.assertTrue(entry['p50'] <= entry['p90'] <= entry['max'])
+        self.assertTrue(entry['max'] <= entry['total'])
+        self.assertTrue(summary[1]['eval_obj']['total'] <= entry['total'])
+
+        out_file = StringIO()
+        profiler.write_summary(out_file)
+        lines = out_file.getvalue().split('\n')
+        self.assertEqual(lines[1], '# Kona solver callback profile')
+        self.assertEqual(len(lines), 3 + 5 + 1)
+
+    def test_running(self):
+        profiler = SolverProfiler(UserSolver())
+        profiler.start()
+        try:
+            profiler.start()
+        except RuntimeError as err:
+            self.assertEqual(
+                str(err), 'SolverProfiler() >> Profiler is already running.')
+        else:
+            self.fail('RuntimeError expected')
+        profiler.stop()
+        profiler.stop()
+
+if __name__ == "__main__":
+    unittest.main()
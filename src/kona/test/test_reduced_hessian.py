@@ -5,8 +5,93 @@ import numpy as np
 from kona.linalg.memory import KonaMemory
 from kona.examples import Simple2x2
 from kona.linalg.matrices.hessian import ReducedHessian
+from kona.linalg.solvers.krylov import STCG
+from kona.user import BaseVector, BaseAllocator
 
 
+class LinearizationSolver(Simple2x2):
+
+    def __init__(self):
+        super(LinearizationSolver, self).__init__()
+        self.keys = []
+
+    def set_linearization(self, at_design, at_state, key):
+        self.keys.append(key)
+
+class GuessSolver(Simple2x2):
+
+    def __init__(self):
+        super(GuessSolver, self).__init__()
+        self.guesses = []
+        self.solutions = []
+
+    def solve_linear(self, at_design, at_state, rhs_vec, rel_tol, result):
+        self.guesses.append(result.data.copy())
+        cost = super(GuessSolver, self).solve_linear(
+            at_design, at_state, rhs_vec, rel_tol, result)
+        self.solutions.append(result.data.copy())
+        return cost
+
+    def solve_adjoint(self, at_design, at_state, rhs_vec, rel_tol, result):
+        self.guesses.append(result.data.copy())
+        cost = super(GuessSolver, self).solve_adjoint(
+            at_design, at_state, rhs_vec, rel_tol, result)
+        self.solutions.append(result.data.copy())
+        return cost
+
+class AnalyticSolver(Simple2x2):
+
+    def multiply_d2LdX2(self, at_design, at_state, at_adjoint, at_dual,
+                        in_vec, out_vec):
+        out_vec.data[:] = 2.*in_vec.data
+
+    def multiply_d2LdXdU(self, at_design, at_state, at_adjoint, at_dual,
+                         in_vec, out_vec):
+        out_vec.data[:] = 0.
+
+    def multiply_d2LdXdU_T(self, at_design, at_state, at_adjoint, at_dual,
+                           in_vec, out_vec):
+        out_vec.data[:] = 0.
+
+    def multiply_d2LdU2(self, at_design, at_state, at_adjoint, at_dual,
+                        in_vec, out_vec):
+        out_vec.data[:] = [2.*in_vec.data[0], 0.]
+
+class CustomVector(BaseVector):
+    pass
+
+class CustomAllocator(BaseAllocator):
+
+    def alloc_primal(self, count):
+        return [CustomVector(self.num_primal) for i in xrange(count)]
+
+class ComplexSolver(Simple2x2):
+    """
+    Objective ``x0**3 + x1**2 + u0**2 + x0*u1`` whose partials accept
+    complex-valued vectors.
+    """
+
+    def eval_obj(self, at_design, at_state):
+        x = at_design.data
+        u = at_state.data
+        return x[0]**3 + x[1]**2 + u[0]**2 + x[0]*u[1]
+
+    def eval_dFdX(self, at_design, at_state, store_here):
+        x = at_design.data
+        u = at_state.data
+        store_here.data[:] = [3.*x[0]**2 + u[1], 2.*x[1]]
+
+    def eval_dFdU(self, at_design, at_state, store_here):
+        x = at_design.data
+        u = at_state.data
+        store_here.data[:] = [2.*u[0], x[0]]
+
+    def multiply_dRdX_T(self, at_design, at_state, in_vec, out_vec):
+        out_vec.data[:] = self.dRdX.T.dot(in_vec.data)
+
+    def multiply_dRdU_T(self, at_design, at_state, in_vec, out_vec):
+        out_vec.data[:] = self.dRdU.T.dot(in_vec.data)
+
 class ReducedHessianTestCase(unittest.TestCase):
     '''Test case for the Reduced Hessian approximation matrix.'''
 
@@ -70,6 +155,262 @@ class ReducedHessianTestCase(unittest.TestCase):
 
         self.assertTrue(diff_norm <= 1e-5*dJdX.norm2)
 
+    def test_product_block(self):
+        solver = Simple2x2()
+        km = KonaMemory(solver)
+        pf = km.primal_factory
+        sf = km.state_factory
+        pf.request_num_vectors(9)
+        sf.request_num_vectors(3)
+        hessian = ReducedHessian([pf, sf], {'block_size' : 2})
+        km.allocate_memory()
+
+        x = pf.generate()
+        primal_work = pf.generate()
+        state = sf.generate()
+        adjoint = sf.generate()
+        state_work = sf.generate()
+        x.equals(1.0)
+        state.equals_primal_solution(x)
+        adjoint.equals_adjoint_solution(x, state, state_work)
+        hessian.linearize(x, state, adjoint)
+
+        # three products take one full and one partial group
+        in_vecs = [pf.generate() for i in xrange(3)]
+        out_vecs = [pf.generate() for i in xrange(3)]
+        for i, in_vec in enumerate(in_vecs):
+            in_vec.equals(i + 1.0)
+        hessian.product_block(in_vecs, out_vecs)
+
+        for in_vec, out_vec in zip(in_vecs, out_vecs):
+            hessian.product(in_vec, primal_work)
+            primal_work.minus(out_vec)
+            self.assertTrue(primal_work.norm2 <= 1e-10*out_vec.norm2)
+
+    def test_linearization_keys(self):
+        solver = LinearizationSolver()
+        km = KonaMemory(solver)
+        pf = km.primal_factory
+        sf = km.state_factory
+        pf.request_num_vectors(4)
+        sf.request_num_vectors(3)
+        hessian = ReducedHessian([pf, sf])
+        km.allocate_memory()
+
+        x = pf.generate()
+        v = pf.generate()
+        out = pf.generate()
+        state = sf.generate()
+        adjoint = sf.generate()
+        state_work = sf.generate()
+        x.equals(1.0)
+        state.equals_primal_solution(x)
+        adjoint.equals_adjoint_solution(x, state, state_work)
+        hessian.linearize(x, state, adjoint)
+        base_key = (x._version, state._version)
+        v.equals(2.0)
+        hessian.product(v, out)
+        num_keys = len(solver.keys)
+        hessian.product(v, out)
+
+        # the solver is only told about changes of the evaluation point
+        for i in xrange(1, len(solver.keys)):
+            self.assertNotEqual(solver.keys[i], solver.keys[i-1])
+        # the unmodified linearization point keeps its key
+        self.assertTrue(base_key in solver.keys[:num_keys])
+        self.assertTrue(base_key in solver.keys[num_keys:])
+        # modifying the design changes the key
+        x.plus(v)
+        self.assertNotEqual((x._version, state._version), base_key)
+
+    def test_adjoint_guess(self):
+        solver = GuessSolver()
+        km = KonaMemory(solver)
+        pf = km.primal_factory
+        sf = km.state_factory
+        pf.request_num_vectors(5)
+        sf.request_num_vectors(3)
+        hessian = ReducedHessian([pf, sf], {'adjoint_guess' : 2})
+        km.allocate_memory()
+
+        x = pf.generate()
+        out = pf.generate()
+        v = [pf.generate() for i in xrange(3)]
+        state = sf.generate()
+        adjoint = sf.generate()
+        state_work = sf.generate()
+        x.equals(1.0)
+        state.equals_primal_solution(x)
+        adjoint.equals_adjoint_solution(x, state, state_work)
+        hessian.linearize(x, state, adjoint)
+
+        v[0].equals(1.0)
+        v[1].equals(v[0])
+        v[1]._data.data[1] = -1.
+        v[2].equals_ax_p_by(2., v[0], -0.5, v[1])
+        del solver.guesses[:]
+        del solver.solutions[:]
+        for in_vec in v:
+            hessian.product(in_vec, out)
+
+        # the first product starts from zero
+        self.assertRelError(solver.guesses[0], np.zeros(2))
+        self.assertRelError(solver.guesses[1], np.zeros(2))
+        # the third input is in the span of the first two, so both of its
+        # 2nd order adjoints are predicted exactly
+        for guess, solution in zip(solver.guesses[4:], solver.solutions[4:]):
+            self.assertRelError(guess, solution, atol=1e-6)
+
+        # a new linearization discards the stored products
+        hessian.linearize(x, state, adjoint)
+        del solver.guesses[:]
+        hessian.product(v[2], out)
+        self.assertRelError(solver.guesses[0], np.zeros(2))
+
+    def test_analytic_product(self):
+        products = []
+        for solver in [Simple2x2(), AnalyticSolver()]:
+            km = KonaMemory(solver)
+            pf = km.primal_factory
+            sf = km.state_factory
+            pf.request_num_vectors(3)
+            sf.request_num_vectors(3)
+            hessian = ReducedHessian([pf, sf])
+            km.allocate_memory()
+
+            x = pf.generate()
+            v = pf.generate()
+            out = pf.generate()
+            state = sf.generate()
+            adjoint = sf.generate()
+            state_work = sf.generate()
+            x.equals(1.0)
+            state.equals_primal_solution(x)
+            adjoint.equals_adjoint_solution(x, state, state_work)
+            hessian.linearize(x, state, adjoint)
+            v.equals(1.0)
+            v._data.data[1] = -2.
+            hessian.product(v, out)
+            products.append(out._data.data.copy())
+            self.assertEqual(
+                hessian.analytic, isinstance(solver, AnalyticSolver))
+
+        self.assertRelError(products[0], products[1], atol=1e-5)
+
+    def test_complex_step_product(self):
+        errors = []
+        for complex_step in [False, True]:
+            km = KonaMemory(ComplexSolver())
+            pf = km.primal_factory
+            sf = km.state_factory
+            pf.request_num_vectors(3)
+            sf.request_num_vectors(3)
+            hessian = ReducedHessian(
+                [pf, sf], {'complex_step' : complex_step})
+            km.allocate_memory()
+
+            x = pf.generate()
+            v = pf.generate()
+            out = pf.generate()
+            state = sf.generate()
+            adjoint = sf.generate()
+            state_work = sf.generate()
+            x.equals(1.5)
+            state.equals_primal_solution(x)
+            adjoint.equals_adjoint_solution(x, state, state_work)
+            hessian.linearize(x, state, adjoint)
+            v.equals(1.0)
+            v._data.data[1] = -2.
+            hessian.product(v, out)
+
+            # exact reduced Hessian of the linear residual R = A*u - x
+            dUdX = np.linalg.inv(km.solver.dRdU)
+            F_xx = np.diag([6.*x._data.data[0], 2.])
+            F_xu = np.array([[0., 1.], [0., 0.]])
+            F_uu = np.diag([2., 0.])
+            H = F_xx + F_xu.dot(dUdX) + dUdX.T.dot(F_xu.T) + \
+                dUdX.T.dot(F_uu).dot(dUdX)
+            exact = H.dot(v._data.data)
+            errors.append(
+                np.linalg.norm(out._data.data - exact)/np.linalg.norm(exact))
+            self.assertEqual(out._data.data.dtype, np.float64)
+
+        # finite differences lose about half of the significant digits
+        self.assertTrue(errors[0] < 1e-5)
+        self.assertTrue(errors[1] < 1e-14)
+
+    def test_dense_assembly(self):
+        km = KonaMemory(ComplexSolver())
+        pf = km.primal_factory
+        sf = km.state_factory
+        pf.request_num_vectors(4)
+        sf.request_num_vectors(3)
+        hessian = ReducedHessian(
+            [pf, sf], {'complex_step' : True, 'block_size' : 2})
+        krylov = STCG(pf, {'max_iter' : 1, 'out_file' : 'kona_krylov.dat'})
+        km.allocate_memory()
+
+        x = pf.generate()
+        b = pf.generate()
+        p = pf.generate()
+        work = pf.generate()
+        state = sf.generate()
+        adjoint = sf.generate()
+        state_work = sf.generate()
+        x.equals(1.5)
+        state.equals_primal_solution(x)
+        adjoint.equals_adjoint_solution(x, state, state_work)
+        hessian.linearize(x, state, adjoint)
+        self.assertTrue(hessian.dense)
+
+        # columns are the products with the unit vectors
+        H = hessian.assemble()
+        b.equals(1.0)
+        b._data.data[1] = -2.
+        hessian.product(b, work)
+        self.assertRelError(H.dot(b._data.data), work._data.data, atol=1e-13)
+
+        # the step is the Newton step inside the trust region...
+        pred, active = hessian.solve_dense(b, p, 100.)
+        self.assertFalse(active)
+        newton = np.linalg.solve(H, b._data.data)
+        self.assertRelError(p._data.data, newton, atol=1e-10)
+        self.assertAlmostEqual(pred, 0.5*newton.dot(b._data.data))
+
+        # ...and lies on the boundary otherwise
+        pred, active = hessian.solve_dense(b, p, 0.1)
+        self.assertTrue(active)
+        self.assertAlmostEqual(p.norm2, 0.1)
+
+        # the Krylov solver would need fewer products
+        hessian.set_krylov_solver(krylov)
+        hessian.linearize(x, state, adjoint)
+        self.assertFalse(hessian.dense)
+
+    def test_dense_unsupported(self):
+        # allocators with their own primal vectors must opt in to assembly
+        solver = ComplexSolver()
+        solver.allocator = CustomAllocator(2, 2, 0)
+        km = KonaMemory(solver)
+        pf = km.primal_factory
+        sf = km.state_factory
+        pf.request_num_vectors(1)
+        sf.request_num_vectors(2)
+        hessian = ReducedHessian([pf, sf], {'block_size' : 2})
+        self.assertEqual(km.dense_design_size(), None)
+        self.assertEqual(pf.num_vecs, 1 + 4)
+        km.allocate_memory()
+
+        x = pf.generate()
+        state = sf.generate()
+        adjoint = sf.generate()
+        x.equals(1.5)
+        state.equals_primal_solution(x)
+        adjoint.equals_adjoint_solution(x, state, sf.generate())
+        hessian.linearize(x, state, adjoint)
+        self.assertFalse(hessian.dense)
+        self.assertFalse(hessian._assemble)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,8 +2,11 @@ import unittest
 import numpy as np
 
 from kona.linalg.memory import KonaMemory
+from kona.linalg.vectors.common import PrimalVector, DualVector
 from dummy_solver import DummySolver
 from kona.linalg.vectors.composite import ReducedKKTVector
+from kona.linalg.vectors.composite import CompositePrimalVector
+from kona.user import UserSolver, BlockAllocator
 
 class ReducedKKTVectorTestCase(unittest.TestCase):
 
@@ -130,6 +133,20 @@ class ReducedKKTVectorTestCase(unittest.TestCase):
         ip = self.rkkt_vec2.inner(self.rkkt_vec1)
         self.assertEqual(ip, 70)
 
+    def test_inner_many(self):
+        prods = self.rkkt_vec2.inner_many([self.rkkt_vec1, self.rkkt_vec2])
+        self.assertTrue(np.all(prods == [70., 60.]))
+
+    def test_equals_lin_comb(self):
+        self.rkkt_vec2.equals_lin_comb(
+            [2., 2.], [self.rkkt_vec1, self.rkkt_vec2])
+
+        err = self.pv2._data.data - 8*np.ones(10)
+        self.assertEqual(np.linalg.norm(err), 0)
+
+        err = self.dv2._data.data - 10*np.ones(5)
+        self.assertEqual(np.linalg.norm(err), 0)
+
     def test_norm2(self):
         ip = self.rkkt_vec2.norm2
         self.assertEqual(ip, 60**.5)
@@ -144,5 +161,110 @@ class ReducedKKTVectorTestCase(unittest.TestCase):
         self.assertEqual(np.linalg.norm(err), 0)
 
 
+class PackedKKTVectorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.alloc = BlockAllocator(3, 0, 2)
+        self.km = km = KonaMemory(UserSolver(allocator=self.alloc))
+        self.kf = km.kkt_factory(slack=True)
+        self.kf.request_num_vectors(3)
+        km.primal_factory.request_num_vectors(1)
+        km.dual_factory.request_num_vectors(2)
+        km.allocate_memory()
+
+        self.x = self.kf.generate()
+        self.y = self.kf.generate()
+        self.x.equals(1.)
+        self.y._primal._design.equals(2.)
+        self.y._primal._slack.equals(3.)
+        self.y._dual.equals(4.)
+
+    def test_views(self):
+        self.assertTrue(self.kf.packed)
+        self.assertTrue(isinstance(self.x._primal, CompositePrimalVector))
+        block = self.alloc.kkt_blocks[0]
+        self.assertEqual(block.shape, (3, 7))
+        self.assertTrue(self.y._packed.data.base is block)
+        self.assertTrue(np.all(
+            self.y._packed.data == [2., 2., 2., 3., 3., 4., 4.]))
+        self.assertTrue(np.all(
+            self.y._primal._packed.data == [2., 2., 2., 3., 3.]))
+
+    def test_operations(self):
+        # unpacked vectors with the same values, for reference
+        km = self.km
+        pf = km.primal_factory
+        df = km.dual_factory
+        ref = ReducedKKTVector(
+            CompositePrimalVector(pf.generate(), df.generate()),
+            df.generate())
+        ref.equals(self.y)
+        self.assertTrue(np.all(ref._dual._data.data == 4.))
+
+        self.y.equals_ax_p_by(2., self.x, -1., self.y)
+        self.assertTrue(np.all(
+            self.y._packed.data == [0., 0., 0., -1., -1., -2., -2.]))
+        self.y.minus(self.x)
+        self.y.times(-2.)
+        self.y.divide_by(2.)
+        self.y.plus(self.x)
+        self.assertEqual(self.y.inner(self.x), 20.)
+        self.assertEqual(self.y.norm2, np.sqrt(62.))
+        self.assertEqual(self.y.infty, 4.)
+        self.y.times(self.y)
+        self.y.pow(0.5)
+        self.y.log(self.y)
+        self.y.exp(self.y)
+        self.y.equals_lin_comb([1., 1.], [self.y, self.x])
+        self.assertTrue(np.allclose(
+            self.y._packed.data, [3., 3., 3., 4., 4., 5., 5.]))
+        self.assertTrue(np.allclose(
+            self.x.inner_many([self.y, self.x]), [27., 7.]))
+        self.assertAlmostEqual(self.y._primal.inner(self.x._primal), 17.)
+
+        # packed and unpacked vectors can be mixed
+        self.assertEqual(ref.inner(self.x), 20.)
+        self.assertEqual(self.x.inner(ref), 20.)
+        ref.equals_ax_p_by(1., self.y, -1., ref)
+        self.assertTrue(np.allclose(ref._primal._design._data.data, 1.))
+        self.assertTrue(np.allclose(ref._dual._data.data, 1.))
+
+    def test_minus_self(self):
+        self.y.minus(self.y)
+        self.assertTrue(np.all(self.y._packed.data == 0.))
+        self.x._primal.minus(self.x._primal)
+        self.assertTrue(np.all(
+            self.x._packed.data == [0., 0., 0., 0., 0., 1., 1.]))
+
+    def test_release(self):
+        dual = self.x._dual
+        self.x.release()
+        self.assertEqual(len(self.kf._stack), 2)
+        self.assertEqual(self.kf.num_live, 1)
+        # component views never enter the dual stack
+        del dual
+        self.assertEqual(len(self.km.vector_stack[DualVector]), 2)
+
+        # a component keeps the packed vector alive
+        design = self.y._primal._design
+        del self.y
+        self.assertEqual(len(self.kf._stack), 2)
+        del design
+        self.assertEqual(len(self.kf._stack), 3)
+        self.assertEqual(self.kf.num_live, 0)
+
+    def test_fallback(self):
+        km = KonaMemory(UserSolver(3, 0, 2))
+        kf = km.kkt_factory()
+        kf.request_num_vectors(2)
+        km.allocate_memory()
+        self.assertFalse(kf.packed)
+        self.assertEqual(len(km.vector_stack[PrimalVector]), 2)
+        self.assertEqual(len(km.vector_stack[DualVector]), 2)
+        vec = kf.generate()
+        self.assertTrue(vec._packed is None)
+        self.assertTrue(isinstance(vec._primal, PrimalVector))
+        self.assertTrue('kkt' not in km.memory_report())
+
 if __name__ == "__main__":
     unittest.main()
@@ -49,5 +49,56 @@ class StateVectorTestCase(unittest.TestCase):
         self.sv.equals_adjoint_solution(at_design, at_state, state_work)
         self.assertEqual(self.sv.inner(self.sv), 729000)
 
+class StateCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.solver = DummySolver(10, 10, 0)
+        self.km = km = KonaMemory(self.solver, {'state_cache' : 2})
+
+        km.primal_factory.request_num_vectors(1)
+        km.state_factory.request_num_vectors(1)
+        km.allocate_memory()
+
+        self.pv = km.primal_factory.generate()
+        self.sv = km.state_factory.generate()
+
+        self.calls = []
+        solve_nonlinear = self.solver.solve_nonlinear
+
+        def counted(at_design, result):
+            self.calls.append(1)
+            return solve_nonlinear(at_design, result)
+
+        self.solver.solve_nonlinear = counted
+
+    def test_revisited_design(self):
+        self.pv.equals(2)
+        self.assertTrue(self.sv.equals_primal_solution(self.pv))
+        self.pv.equals(3)
+        self.sv.equals_primal_solution(self.pv)
+        self.assertEqual(len(self.calls), 2)
+        # same content, new version stamp
+        self.pv.equals(2)
+        self.sv.equals(0)
+        self.assertTrue(self.sv.equals_primal_solution(self.pv))
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.sv.inner(self.sv), 4000)
+        # the design at 3 is evicted as the least recently used
+        self.pv.equals(4)
+        self.sv.equals_primal_solution(self.pv)
+        self.pv.equals(3)
+        self.sv.equals_primal_solution(self.pv)
+        self.assertEqual(len(self.calls), 4)
+        self.assertEqual(self.km.state_cache.hits, 1)
+        # evicted vectors go back to the memory stack
+        self.assertEqual(self.km.state_factory.num_live, 3)
+        self.assertEqual(self.km.primal_factory.num_live, 3)
+
+    def test_failed_solve(self):
+        self.solver.solve_nonlinear = lambda at_design, result: -1
+        self.assertFalse(self.sv.equals_primal_solution(self.pv))
+        self.assertFalse(self.sv.equals_primal_solution(self.pv))
+        self.assertEqual(self.km.state_cache.misses, 2)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+
+import numpy as np
+
+from kona.user import BaseVector
+from kona.user import BlockAllocator
+from kona.user import ThreadedVector
+from kona.user import ThreadedAllocator
+from kona.user import threaded_vectors
+from kona.linalg.memory import KonaMemory
+from kona.linalg.solvers.krylov import FGMRES
+from kona.linalg.matrices.common import IdentityMatrix
+from kona.user import UserSolver
+
+class ThreadedVectorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # thread count does not divide the vector size, to test uneven chunks
+        self.alloc = ThreadedAllocator(0, 10, 0, num_threads=3, threshold=0)
+        self.x, self.y, self.z = self.alloc.alloc_state(3)
+        self.x.equals_value(1.)
+        self.y.equals_value(2.)
+        self.z.data[:] = np.linspace(0, 10, 10)
+
+    def test_allocation(self):
+        for vec in [self.x, self.y, self.z]:
+            self.assertTrue(isinstance(vec, ThreadedVector))
+            self.assertEqual(vec.num_threads, 3)
+            self.assertTrue(vec._threaded())
+        low = self.alloc.alloc_state_low(1)[0]
+        self.assertEqual(low.data.dtype, np.float32)
+        self.assertEqual(len(self.alloc.alloc_primal(1)[0].data), 0)
+        self.assertFalse(ThreadedVector(10, num_threads=3)._threaded())
+
+    def test_operations(self):
+        ref = BaseVector(10, val=np.linspace(0, 10, 10))
+        x_ref = BaseVector(10, val=1.)
+        y_ref = BaseVector(10, val=2.)
+        for vec, x, y in [(self.z, self.x, self.y), (ref, x_ref, y_ref)]:
+            vec.plus(x)
+            vec.times_scalar(2.)
+            vec.times_vector(y)
+            vec.equals_ax_p_by(0.5, vec, 3., y)
+            vec.equals_ax_p_by(1., x, 1., vec)
+            vec.equals_lin_comb([1., -1., 2.], [vec, x, y])
+            vec.pow(0.5)
+            vec.log(vec)
+            vec.exp(vec)
+        self.assertTrue(np.allclose(self.z.data, ref.data))
+        self.assertAlmostEqual(self.z.inner(self.y), ref.inner(y_ref))
+        self.assertTrue(np.allclose(
+            self.z.inner_many([self.x, self.y, self.z]),
+            [ref.inner(x_ref), ref.inner(y_ref), ref.inner(ref)]))
+        self.z.times_scalar(-1.)
+        ref.times_scalar(-1.)
+        self.assertAlmostEqual(self.z.infty, ref.infty)
+        self.x.equals_vector(self.z)
+        self.assertTrue(np.all(self.x.data == self.z.data))
+
+    def test_blocked_kernels(self):
+        # chunks span several scratch blocks, and results alias operands
+        block_size = threaded_vectors._block_size
+        threaded_vectors._block_size = 2
+        try:
+            self.z.equals_ax_p_by(2., self.z, 3., self.y)
+            self.assertTrue(np.allclose(
+                self.z.data, 2.*np.linspace(0, 10, 10) + 6.))
+            self.z.equals_ax_p_by(1., self.x, -1., self.z)
+            self.z.equals_lin_comb([1., 2.], [self.x, self.z])
+            self.assertTrue(np.allclose(
+                self.z.data, 3. - 2.*(2.*np.linspace(0, 10, 10) + 6.)))
+        finally:
+            threaded_vectors._block_size = block_size
+        # scratch space does not grow with the vector size
+        big = ThreadedVector(100000, val=1., num_threads=2)
+        big.equals_ax_p_by(1., big, 1., big)
+        self.assertTrue(np.all(big.data == 2.))
+        work = threaded_vectors._get_scratch(0, np.dtype(float))
+        self.assertEqual(len(work), block_size)
+
+    def test_mixed_operands(self):
+        # threaded, plain and block vectors can be combined freely
+        r = BaseVector(10, val=3.)
+        rows = BlockAllocator(0, 10, 0).alloc_state(2)
+        rows[0].equals_value(1.)
+        rows[1].equals_value(4.)
+        self.x.equals_ax_p_by(1., r, 2., self.y)
+        self.assertTrue(np.all(self.x.data == 7.))
+        self.assertEqual(self.x.inner(r), 210.)
+        self.assertTrue(np.all(self.x.inner_many(rows) == [70., 280.]))
+        self.x.equals_lin_comb([2., 1.], rows)
+        self.assertTrue(np.all(self.x.data == 6.))
+        self.x.equals_lin_comb([1., 1.], [r, rows[0]])
+        self.assertTrue(np.all(self.x.data == 4.))
+
+    def test_fgmres(self):
+        solver = UserSolver(
+            allocator=ThreadedAllocator(4, 0, 0, num_threads=2, threshold=0))
+        km = KonaMemory(solver)
+        pf = km.primal_factory
+        pf.request_num_vectors(2)
+        krylov = FGMRES(pf, {'max_iter' : 30, 'rel_tol' : 1e-3})
+        km.allocate_memory()
+
+        x = pf.generate()
+        b = pf.generate()
+        b.equals(1)
+        A = np.array([[4, 3, 2, 1],
+                      [3, 4, 3, 2],
+                      [2, 3, 4, 3],
+                      [1, 2, 3, 4]])
+
+        def mat_vec(in_vec, out_vec):
+            out_vec._data.data[:] = A.dot(in_vec._data.data)
+
+        x.equals(0)
+        krylov.solve(mat_vec, b, x, IdentityMatrix().product)
+        expected = np.linalg.solve(A, np.ones(4))
+        self.assertTrue(max(abs(x._data.data - expected)) < 1.e-6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -37,6 +37,45 @@ class ReducedSpaceNewtonKrylovTestCase(unittest.TestCase):
         km.allocate_memory()
         rsnk.solve()
 
+        self.assertTrue(rsnk.hessian.dense)
+        diff = abs(solver.curr_design - numpy.ones(num_design))
+        self.assertTrue(max(diff) < 1e-5)
+
+    def test_RSNK_matrix_free(self):
+
+        num_design = 2
+        solver = Rosenbrock(num_design)
+        km = KonaMemory(solver)
+
+        optns = {
+            'info_file' : 'kona_info.dat',
+            'max_iter' : 50,
+            'primal_tol' : 1e-12,
+
+            'trust' : {
+                'radius' : 1.0,
+                'max_radius' : 2.0,
+            },
+
+            'reduced' : {
+                'dense_max' : 0,
+            },
+
+            'krylov' : {
+                'out_file'      : 'kona_krylov.dat',
+                'max_iter'      : num_design,
+                'rel_tol'       : 1e-2,
+                'check_res'     : True,
+                # STCG options
+                'proj_cg'       : False,
+            },
+        }
+        rsnk = ReducedSpaceNewtonKrylov(
+            km.primal_factory, km.state_factory, None, optns)
+        km.allocate_memory()
+        rsnk.solve()
+
+        self.assertFalse(rsnk.hessian.dense)
         diff = abs(solver.curr_design - numpy.ones(num_design))
         self.assertTrue(max(diff) < 1e-5)
 
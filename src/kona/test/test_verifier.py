@@ -0,0 +1,67 @@
+import unittest
+from StringIO import StringIO
+
+import kona
+from kona.examples import Constrained2x2
+
+class BadBlockSolver(Constrained2x2):
+
+    def multiply_dRdU_block(self, at_design, at_state, in_vecs, out_vecs):
+        # scales every product by two
+        for in_vec, out_vec in zip(in_vecs, out_vecs):
+            self.multiply_dRdU(at_design, at_state, in_vec, out_vec)
+            out_vec.data *= 2.
+
+class BadBlockSolveSolver(Constrained2x2):
+
+    def solve_adjoint_block(self, at_design, at_state, rhs_vecs, rel_tol,
+                            results):
+        # solves the forward instead of the adjoint systems
+        return self.solve_linear_block(
+            at_design, at_state, rhs_vecs, rel_tol, results)
+
+class VerifierTestCase(unittest.TestCase):
+
+    def run_verifier(self, solver, out_file=None):
+        optns = {
+            'info_file' : StringIO(),
+            'hist_file' : StringIO(),
+            'krylov' : {
+                'out_file' : StringIO(),
+            },
+            'matrix_explicit' : False,
+            'verify' : {
+                'dual_vec' : True,
+                'cnstr_jac' : True,
+                'lin_solve' : True,
+                'out_file' : out_file or StringIO(),
+            },
+        }
+        optimizer = kona.Optimizer(solver, kona.algorithms.Verifier, optns)
+        optimizer.solve()
+        return optimizer._algorithm
+
+    def test_block_products(self):
+        out_file = StringIO()
+        verifier = self.run_verifier(Constrained2x2(), out_file)
+        for op_name in ['pde_jac', 'cnstr_jac']:
+            for function, failed in verifier.failures[op_name].items():
+                if function.endswith('_block'):
+                    self.assertFalse(failed)
+        report = out_file.getvalue()
+        self.assertTrue('Block product test: multiply_dCdU_T_block' in report)
+        self.assertFalse(verifier.failures['lin_solve']['solve_linear_block'])
+
+    def test_bad_block_product(self):
+        verifier = self.run_verifier(BadBlockSolver())
+        self.assertTrue(verifier.failures['pde_jac']['multiply_dRdU_block'])
+        self.assertFalse(verifier.failures['pde_jac']['multiply_dRdU_T_block'])
+        self.assertFalse(verifier.failures['pde_jac']['multiply_dRdU'])
+
+    def test_bad_block_solve(self):
+        verifier = self.run_verifier(BadBlockSolveSolver())
+        self.assertTrue(verifier.failures['lin_solve']['solve_linear_block'])
+        self.assertFalse(verifier.failures['lin_solve']['solve_linear'])
+
+if __name__ == "__main__":
+    unittest.main()
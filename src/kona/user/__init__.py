@@ -1,4 +1,11 @@
 from base_vectors import BaseVector
 from base_vectors import BaseAllocator
+from base_vectors import BlockAllocator
+from memmap_vectors import MemmapVector
+from memmap_vectors import MemmapAllocator
+from threaded_vectors import ThreadedVector
+from threaded_vectors import ThreadedAllocator
+from mpi_vectors import MPIVector
+from mpi_vectors import MPIAllocator
 from user_solver import UserSolver
 from user_solver import UserSolverIDF
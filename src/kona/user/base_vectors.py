@@ -1,5 +1,121 @@
 import numpy as np
 
+try:
+    from scipy.linalg.blas import daxpy
+    scipy_exists = True
+except Exception:
+    scipy_exists = False
+
+# scratch arrays shared by all BaseVector objects of the same size and type
+_work_arrays = {}
+
+def _get_work(size, dtype=float):
+    """
+    Returns a preallocated scratch array of the given size.
+
+    Parameters
+    ----------
+    size : int
+    dtype : numpy.dtype, optional
+        Data type of the array, ``complex`` for complex-valued vectors.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    work = _work_arrays.get((size, dtype))
+    if work is None:
+        work = np.empty(size, dtype=dtype)
+        _work_arrays[(size, dtype)] = work
+    return work
+
+def _axpy(a, x, y):
+    """
+    Performs :math:`y = y + ax` in-place without allocating temporaries.
+
+    Parameters
+    ----------
+    a : float
+    x : numpy.ndarray
+    y : numpy.ndarray
+        Array that is updated in-place.
+    """
+    if scipy_exists and y.flags.c_contiguous and x.flags.c_contiguous and \
+            y.dtype == np.float64 and x.dtype == np.float64 and len(y) > 0:
+        daxpy(x, y, a=a)
+    else:
+        if np.iscomplexobj(y):
+            work = _get_work(len(y), complex)
+        else:
+            work = _get_work(len(y))
+        np.multiply(x, a, out=work)
+        np.add(y, work, out=y)
+
+def _dot(x, y):
+    """
+    Inner product of two 1-D arrays, always accumulated in double precision.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+    y : numpy.ndarray
+
+    Returns
+    -------
+    float
+    """
+    if x.dtype == np.float64 and y.dtype == np.float64:
+        return np.inner(x, y)
+    # mixed or reduced precision is summed in double without copying
+    return np.einsum('i,i->', x, y, dtype=np.float64)
+
+def _block_view(arrays):
+    """
+    Finds a 2-D view of a shared block whose rows are the given arrays.
+
+    This only succeeds if all arrays are rows of the same C-contiguous,
+    double precision block (see `BlockAllocator`), and their row indexes are
+    evenly spaced.
+
+    Parameters
+    ----------
+    arrays : list of numpy.ndarray
+
+    Returns
+    -------
+    numpy.ndarray or None
+        View of the block with the given arrays as rows, in the given order.
+    """
+    block = arrays[0].base
+    if block is None or block.ndim != 2 or not block.flags.c_contiguous or \
+            block.dtype != np.float64:
+        return None
+    row_stride = block.strides[0]
+    if row_stride == 0:
+        return None
+    start = block.__array_interface__['data'][0]
+    rows = []
+    for arr in arrays:
+        if arr.base is not block or arr.shape[0] != block.shape[1]:
+            return None
+        offset = arr.__array_interface__['data'][0] - start
+        if offset % row_stride != 0:
+            return None
+        rows.append(offset // row_stride)
+    if len(rows) == 1:
+        step = 1
+    else:
+        step = rows[1] - rows[0]
+        if step == 0:
+            return None
+        for k in xrange(2, len(rows)):
+            if rows[k] - rows[k-1] != step:
+                return None
+    end = rows[-1] + step
+    if end < 0:
+        end = None
+    return block[rows[0]:end:step]
+
 class BaseVector(object):
     """
     Kona's default data container, implemented on top of NumPy arrays.
@@ -12,29 +128,37 @@ class BaseVector(object):
     objects any which way they like, as long as it is in sync with the
     `BaseAllocator` implementation.
 
+    All operations write their results into the existing ``data`` array, and
+    do not allocate any temporary arrays. This preserves the memory layout
+    established by the allocator.
+
     Parameters
     ----------
     size: int
         Size of the 1-D numpy vector contained in this object.
     val : float, optional
         Data value for vector initialization.
+    dtype : numpy.dtype, optional
+        Data type of the vector, e.g. ``numpy.float32`` for low-precision
+        storage vectors.
 
     Attributes
     ----------
     data : numpy.array
         Numpy vector containing numerical data.
     """
-    def __init__(self, size, val=0):
+    def __init__(self, size, val=0, dtype=float):
         if np.isscalar(val):
             if val == 0:
-                self.data = np.zeros(size, dtype=float)
+                self.data = np.zeros(size, dtype=dtype)
             elif isinstance(val, (np.float, np.int)):
-                self.data = np.ones(size, dtype=float)*val
+                self.data = np.empty(size, dtype=dtype)
+                self.data.fill(val)
         elif isinstance(val, (np.ndarray, list, tuple)):
             if size != len(val):
                 raise ValueError(
                     'size given as %d, but length of value %d'%(size, len(val)))
-            self.data = np.array(val)
+            self.data = np.array(val, dtype=dtype)
         else:
             raise ValueError(
                 'val must be a scalar or array like, ' +
@@ -49,7 +173,7 @@ class BaseVector(object):
         vector : BaseVector
             Incoming vector for in-place operation.
         """
-        self.data = self.data + vector.data
+        np.add(self.data, vector.data, out=self.data)
 
     def times_scalar(self, value):
         """
@@ -59,7 +183,7 @@ class BaseVector(object):
         ----------
         value: float
         """
-        self.data = value*self.data
+        np.multiply(self.data, value, out=self.data)
 
     def times_vector(self, vector):
         """
@@ -70,7 +194,7 @@ class BaseVector(object):
         vector : BaseVector
             Incoming vector for in-place operation.
         """
-        self.data = self.data*vector.data
+        np.multiply(self.data, vector.data, out=self.data)
 
     def equals_value(self, value):
         """
@@ -91,7 +215,43 @@ class BaseVector(object):
         vector : BaseVector
             Incoming vector for in-place operation.
         """
-        self.data[:] = vector.data[:]
+        np.copyto(self.data, vector.data)
+
+    def equals_unit(self, index):
+        """
+        Set this vector equal to the unit vector along the given index.
+
+        .. note::
+
+            This method is optional for user-defined vectors. It is only used
+            to assemble dense reduced Hessians for small design spaces, if
+            the allocator reports the size of the design space with
+            `BaseAllocator.dense_primal_size` (see `ReducedHessian`).
+
+        Parameters
+        ----------
+        index : int
+            Index of the non-zero element.
+        """
+        self.data[:] = 0.
+        self.data[index] = 1.
+
+    def equals_imag(self, vector):
+        """
+        Set this vector equal to the imaginary part of the given
+        complex-valued vector.
+
+        .. note::
+
+            This method is only required for complex-step Hessian products
+            (see `ReducedHessian`).
+
+        Parameters
+        ----------
+        vector : BaseVector
+            Complex-valued vector.
+        """
+        np.copyto(self.data, vector.data.imag)
 
     def equals_ax_p_by(self, a, x, b, y):
         """
@@ -112,7 +272,80 @@ class BaseVector(object):
         y : BaseVector
             Vector to be operated on.
         """
-        self.data = a*x.data + b*y.data
+        if x.data is self.data and y.data is self.data:
+            # both operands are this vector, so only one scaling is needed
+            np.multiply(self.data, a + b, out=self.data)
+            return
+        if np.may_share_memory(y.data, self.data):
+            # scale the aliased operand first so that it is not overwritten
+            a, x, b, y = b, y, a, x
+        np.multiply(x.data, a, out=self.data)
+        _axpy(b, y.data, self.data)
+
+    def equals_lin_comb(self, coeffs, vectors):
+        """
+        Perform the linear combination defined below in a single pass:
+
+        .. math:: \\sum_k c_k \\mathbf{v}_k
+
+        The result is saved into this vector, which may itself appear among
+        the given vectors. If the other vectors are rows of the same
+        `BlockAllocator` block, the combination is computed with a single
+        matrix-vector product.
+
+        .. note::
+
+            This method is optional for user-defined vectors. If it is not
+            implemented, Kona falls back to repeated ``equals_ax_p_by()``
+            calls.
+
+        Parameters
+        ----------
+        coeffs : array_like
+            Scalar coefficients, one per vector.
+        vectors : list of BaseVector
+            Vectors to be combined.
+        """
+        coeffs = np.asarray(coeffs, dtype=float)
+        if len(coeffs) != len(vectors):
+            raise ValueError(
+                'number of coefficients must match the number of vectors')
+        # separate out any vectors that alias this one
+        self_coeff = 0.0
+        aliased = False
+        others = []
+        for k in xrange(len(vectors)):
+            if np.may_share_memory(vectors[k].data, self.data):
+                self_coeff += coeffs[k]
+                aliased = True
+            else:
+                others.append(k)
+        if aliased:
+            np.multiply(self.data, self_coeff, out=self.data)
+        elif len(others) == 0:
+            self.data.fill(0.0)
+            return
+        if len(others) == 0 or len(self.data) == 0:
+            return
+        block = _block_view([vectors[k].data for k in others])
+        if block is not None:
+            if aliased or not self.data.flags.c_contiguous or \
+                    self.data.dtype != np.float64 or \
+                    np.may_share_memory(block, self.data):
+                work = _get_work(len(self.data))
+                np.dot(coeffs[others], block, out=work)
+                if aliased:
+                    np.add(self.data, work, out=self.data)
+                else:
+                    np.copyto(self.data, work)
+            else:
+                np.dot(coeffs[others], block, out=self.data)
+            return
+        if not aliased:
+            k = others.pop(0)
+            np.multiply(vectors[k].data, coeffs[k], out=self.data)
+        for k in others:
+            _axpy(coeffs[k], vectors[k].data, self.data)
 
     def inner(self, vector):
         """
@@ -131,7 +364,40 @@ class BaseVector(object):
         if len(self.data) == 0:
             return 0.
         else:
-            return np.inner(self.data, vector.data)
+            return _dot(self.data, vector.data)
+
+    def inner_many(self, vectors):
+        """
+        Perform inner products between this vector and each of the given
+        vectors.
+
+        If the given vectors are rows of the same `BlockAllocator` block, the
+        products are computed with a single matrix-vector product.
+
+        .. note::
+
+            This method is optional for user-defined vectors. If it is not
+            implemented, Kona falls back to repeated ``inner()`` calls.
+
+        Parameters
+        ----------
+        vectors : list of BaseVector
+            Incoming vectors for the operation.
+
+        Returns
+        -------
+        numpy.ndarray
+            Inner products, in the same order as the given vectors.
+        """
+        if len(vectors) == 0 or len(self.data) == 0:
+            return np.zeros(len(vectors))
+        block = _block_view([vector.data for vector in vectors])
+        if block is not None and self.data.dtype == np.float64:
+            return block.dot(self.data)
+        out = np.empty(len(vectors))
+        for i in xrange(len(vectors)):
+            out[i] = _dot(self.data, vectors[i].data)
+        return out
 
     @property
     def infty(self):
@@ -146,7 +412,7 @@ class BaseVector(object):
         if len(self.data) == 0:
             return 0.
         else:
-            return max(abs(self.data))
+            return max(self.data.max(), -self.data.min())
 
     def exp(self, vector):
         """
@@ -157,7 +423,7 @@ class BaseVector(object):
         vector : BaseVector
             Incoming vector for in-place operation.
         """
-        self.data = np.exp(vector.data)
+        np.exp(vector.data, out=self.data)
 
     def log(self, vector):
         """
@@ -171,7 +437,7 @@ class BaseVector(object):
         vector : BaseVector
             Incoming vector for in-place operation.
         """
-        self.data = np.log(vector.data)
+        np.log(vector.data, out=self.data)
 
     def pow(self, power):
         """
@@ -184,7 +450,7 @@ class BaseVector(object):
         ----------
         power : float
         """
-        self.data = self.data**power
+        np.power(self.data, power, out=self.data)
 
 class BaseAllocator(object):
     """
@@ -276,3 +542,270 @@ class BaseAllocator(object):
         for i in xrange(count):
             out.append(BaseVector(self.num_dual))
         return out
+
+    def alloc_primal_low(self, count):
+        """
+        Initialize primal-space vectors that Kona only uses for storage, such
+        as Krylov subspace bases, in single precision.
+
+        .. note::
+
+            The ``alloc_*_low()`` methods are optional for user-defined
+            allocators. Kona only uses them if they are defined alongside the
+            matching full precision ``alloc_*()`` method, so an allocator
+            that overrides ``alloc_primal()`` without also overriding
+            ``alloc_primal_low()`` falls back to ``alloc_primal()``.
+
+        Parameters
+        ----------
+        count : int
+            Number of vectors requested in the primal-space.
+
+        Returns
+        -------
+        list
+            Requested number of single precision `BaseVector` instances.
+        """
+        out = []
+        for i in xrange(count):
+            out.append(BaseVector(self.num_primal, dtype=np.float32))
+        return out
+
+    def alloc_state_low(self, count):
+        """
+        Initialize state-space vectors that Kona only uses for storage, in
+        single precision.
+
+        Parameters
+        ----------
+        count : int
+            Number of vectors requested in the state-space.
+
+        Returns
+        -------
+        list
+            Requested number of single precision `BaseVector` instances.
+        """
+        out = []
+        for i in xrange(count):
+            out.append(BaseVector(self.num_state, dtype=np.float32))
+        return out
+
+    def alloc_dual_low(self, count):
+        """
+        Initialize dual-space vectors that Kona only uses for storage, in
+        single precision.
+
+        Parameters
+        ----------
+        count : int
+            Number of vectors requested in the dual-space.
+
+        Returns
+        -------
+        list
+            Requested number of single precision `BaseVector` instances.
+        """
+        out = []
+        for i in xrange(count):
+            out.append(BaseVector(self.num_dual, dtype=np.float32))
+        return out
+
+    def alloc_primal_complex(self, count):
+        """
+        Initialize complex-valued primal-space vectors, used to evaluate
+        complex-step Hessian products.
+
+        .. note::
+
+            The ``alloc_*_complex()`` methods are optional for user-defined
+            allocators. They are only required if the ``'complex_step'``
+            option of the reduced Hessian is enabled, in which case the user
+            solver must also accept complex-valued vectors in ``eval_dFdX``,
+            ``eval_dFdU``, ``multiply_dRdX_T`` and ``multiply_dRdU_T``.
+            Allocators that override ``alloc_primal()`` or ``alloc_state()``
+            must override these as well, otherwise Kona reports them as
+            missing rather than mixing in `BaseVector` objects.
+
+        Parameters
+        ----------
+        count : int
+            Number of vectors requested in the primal-space.
+
+        Returns
+        -------
+        list
+            Requested number of complex-valued `BaseVector` instances.
+        """
+        out = []
+        for i in xrange(count):
+            out.append(BaseVector(self.num_primal, dtype=complex))
+        return out
+
+    def alloc_state_complex(self, count):
+        """
+        Initialize complex-valued state-space vectors, used to evaluate
+        complex-step Hessian products.
+
+        Parameters
+        ----------
+        count : int
+            Number of vectors requested in the state-space.
+
+        Returns
+        -------
+        list
+            Requested number of complex-valued `BaseVector` instances.
+        """
+        out = []
+        for i in xrange(count):
+            out.append(BaseVector(self.num_state, dtype=complex))
+        return out
+
+    def dense_primal_size(self):
+        """
+        Report the global size of the primal space, if Kona may assemble
+        dense matrices on it.
+
+        Dense assembly uses `BaseVector.equals_unit` to generate the unit
+        vectors of the primal space, one per design variable.
+
+        .. note::
+
+            This method is optional for user-defined allocators. As with the
+            ``alloc_*_low()`` methods, Kona only uses it if it is defined
+            alongside ``alloc_primal()``, so allocators that override
+            ``alloc_primal()`` stay matrix-free unless they override this as
+            well.
+
+        Returns
+        -------
+        int or None
+            Global number of design variables, or None if the primal vectors
+            do not support unit vectors.
+        """
+        return self.num_primal
+
+class BlockAllocator(BaseAllocator):
+    """
+    Allocator that reserves one contiguous 2-D array per vector space, and
+    hands out the rows of that array as the data of individual `BaseVector`
+    objects.
+
+    The vectors produced here behave exactly like the ones produced by
+    `BaseAllocator`, but their data are zero-copy views into a shared block.
+    This keeps large Krylov subspaces contiguous in memory, and allows a
+    collection of vectors to be operated on as a single matrix.
+
+    .. note::
+
+        User solvers working with these vectors must write their results
+        in-place (e.g.: ``out_vec.data[:] = ...``). Re-binding the ``data``
+        attribute detaches the vector from its block.
+
+    Attributes
+    ----------
+    primal_blocks : list of numpy.ndarray
+        2-D arrays holding the data for primal-space vectors.
+    state_blocks : list of numpy.ndarray
+        2-D arrays holding the data for state-space vectors.
+    dual_blocks : list of numpy.ndarray
+        2-D arrays holding the data for dual-space vectors.
+    kkt_blocks : list of numpy.ndarray
+        2-D arrays holding the data for packed KKT vectors.
+    """
+    def __init__(self, num_primal, num_state, num_dual):
+        super(BlockAllocator, self).__init__(num_primal, num_state, num_dual)
+        self.primal_blocks = []
+        self.state_blocks = []
+        self.dual_blocks = []
+        self.kkt_blocks = []
+
+    def _view(self, data):
+        vec = BaseVector(0)
+        vec.data = data
+        return vec
+
+    def _alloc_block(self, size, count, blocks, dtype=float):
+        block = np.zeros((count, size), dtype=dtype)
+        blocks.append(block)
+        out = []
+        for i in xrange(count):
+            out.append(self._view(block[i]))
+        return out
+
+    def alloc_primal(self, count):
+        return self._alloc_block(self.num_primal, count, self.primal_blocks)
+
+    def alloc_state(self, count):
+        return self._alloc_block(self.num_state, count, self.state_blocks)
+
+    def alloc_dual(self, count):
+        return self._alloc_block(self.num_dual, count, self.dual_blocks)
+
+    def alloc_primal_low(self, count):
+        return self._alloc_block(
+            self.num_primal, count, self.primal_blocks, np.float32)
+
+    def alloc_state_low(self, count):
+        return self._alloc_block(
+            self.num_state, count, self.state_blocks, np.float32)
+
+    def alloc_dual_low(self, count):
+        return self._alloc_block(
+            self.num_dual, count, self.dual_blocks, np.float32)
+
+    def dense_primal_size(self):
+        return self.num_primal
+
+    def alloc_kkt(self, count, slack=False):
+        """
+        Initialize packed KKT vectors, where the design, slack and dual
+        components of each vector are consecutive pieces of one row of a
+        shared block.
+
+        .. note::
+
+            This method is optional for user-defined allocators. If it is
+            implemented, the packed vectors must support the full
+            `BaseVector` interface, including ``inner_many()`` and
+            ``equals_lin_comb()``. Otherwise, Kona assembles KKT vectors from
+            separate primal and dual vectors.
+
+        Parameters
+        ----------
+        count : int
+            Number of packed vectors requested.
+        slack : boolean, optional
+            If True, the vectors include a dual-space slack component.
+
+        Returns
+        -------
+        list of tuple
+            One ``(packed, primal, design, slack, dual)`` tuple of
+            `BaseVector` instances per vector. ``packed`` spans the entire
+            vector, and ``primal`` spans the design and slack components.
+            ``primal`` and ``slack`` are None if ``slack`` is False.
+        """
+        num_primal = self.num_primal
+        num_dual = self.num_dual
+        if slack:
+            size = num_primal + 2*num_dual
+        else:
+            size = num_primal + num_dual
+        block = np.zeros((count, size))
+        self.kkt_blocks.append(block)
+        out = []
+        for i in xrange(count):
+            row = block[i]
+            design = self._view(row[:num_primal])
+            if slack:
+                primal = self._view(row[:num_primal + num_dual])
+                slack_vec = self._view(row[num_primal:num_primal + num_dual])
+                dual = self._view(row[num_primal + num_dual:])
+            else:
+                primal = None
+                slack_vec = None
+                dual = self._view(row[num_primal:])
+            out.append((self._view(row), primal, design, slack_vec, dual))
+        return out
@@ -0,0 +1,264 @@
+import os
+import tempfile
+
+import numpy as np
+
+from base_vectors import BaseVector, BaseAllocator, _dot
+
+# chunk-sized scratch arrays shared by all MemmapVector objects
+_chunk_work = {}
+
+def _get_chunk_work(size, slot):
+    """
+    Returns a preallocated chunk-sized scratch array.
+
+    Parameters
+    ----------
+    size : int
+    slot : int
+        Index that distinguishes scratch arrays needed at the same time.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    work = _chunk_work.get((size, slot))
+    if work is None:
+        work = np.empty(size, dtype=float)
+        _chunk_work[(size, slot)] = work
+    return work
+
+class MemmapVector(BaseVector):
+    """
+    A `BaseVector` whose data is a ``numpy.memmap`` on a scratch file.
+
+    All operations stream over the data in chunks of ``chunk_size`` elements,
+    so that only a chunk of each operand needs to be paged into memory at a
+    time, and temporaries never exceed the chunk size. The other operands may
+    be ordinary in-core `BaseVector` objects.
+
+    Parameters
+    ----------
+    data : numpy.memmap
+        1-D memory-mapped array holding the vector data.
+    chunk_size : int, optional
+        Number of elements processed per chunk.
+
+    Attributes
+    ----------
+    data : numpy.memmap
+        Memory-mapped array containing numerical data.
+    chunk_size : int
+        Number of elements processed per chunk.
+    """
+    def __init__(self, data, chunk_size=65536):
+        self.data = data
+        self.chunk_size = chunk_size
+
+    def _chunks(self):
+        size = len(self.data)
+        for start in xrange(0, size, self.chunk_size):
+            yield slice(start, min(start + self.chunk_size, size))
+
+    def _work(self, s, slot):
+        return _get_chunk_work(self.chunk_size, slot)[:s.stop - s.start]
+
+    def plus(self, vector):
+        for s in self._chunks():
+            np.add(self.data[s], vector.data[s], out=self.data[s])
+
+    def times_scalar(self, value):
+        for s in self._chunks():
+            np.multiply(self.data[s], value, out=self.data[s])
+
+    def times_vector(self, vector):
+        for s in self._chunks():
+            np.multiply(self.data[s], vector.data[s], out=self.data[s])
+
+    def equals_value(self, value):
+        for s in self._chunks():
+            self.data[s] = value
+
+    def equals_vector(self, vector):
+        for s in self._chunks():
+            self.data[s] = vector.data[s]
+
+    def equals_ax_p_by(self, a, x, b, y):
+        for s in self._chunks():
+            work = self._work(s, 0)
+            work_y = self._work(s, 1)
+            # both operands are read before the chunk is written
+            np.multiply(x.data[s], a, out=work)
+            np.multiply(y.data[s], b, out=work_y)
+            np.add(work, work_y, out=self.data[s])
+
+    def equals_lin_comb(self, coeffs, vectors):
+        coeffs = np.asarray(coeffs, dtype=float)
+        if len(coeffs) != len(vectors):
+            raise ValueError(
+                'number of coefficients must match the number of vectors')
+        for s in self._chunks():
+            work = self._work(s, 0)
+            work_k = self._work(s, 1)
+            work.fill(0.0)
+            for k in xrange(len(vectors)):
+                np.multiply(vectors[k].data[s], coeffs[k], out=work_k)
+                np.add(work, work_k, out=work)
+            self.data[s] = work
+
+    def inner(self, vector):
+        total = 0.0
+        for s in self._chunks():
+            total += _dot(self.data[s], vector.data[s])
+        return total
+
+    def inner_many(self, vectors):
+        out = np.zeros(len(vectors))
+        for s in self._chunks():
+            chunk = self.data[s]
+            for k in xrange(len(vectors)):
+                out[k] += _dot(chunk, vectors[k].data[s])
+        return out
+
+    @property
+    def infty(self):
+        norm = 0.0
+        for s in self._chunks():
+            chunk = self.data[s]
+            if len(chunk) > 0:
+                norm = max(norm, chunk.max(), -chunk.min())
+        return norm
+
+    def exp(self, vector):
+        for s in self._chunks():
+            np.exp(vector.data[s], out=self.data[s])
+
+    def log(self, vector):
+        for s in self._chunks():
+            np.log(vector.data[s], out=self.data[s])
+
+    def pow(self, power):
+        for s in self._chunks():
+            np.power(self.data[s], power, out=self.data[s])
+
+class MemmapAllocator(BaseAllocator):
+    """
+    Allocator that places vectors in memory-mapped scratch files, so that
+    vector spaces larger than the available RAM can be used.
+
+    For each out-of-core vector space, the first ``in_core`` vectors
+    allocated in that space are ordinary in-core `BaseVector` objects, no
+    matter how Kona splits its allocations into requests. Within a request,
+    they are placed last. Kona hands out its up-front allocation from the end
+    of the memory stack, so these are the first vectors generated and they
+    typically hold the frequently used design, state and adjoint data. All
+    other vectors, such as Krylov subspace bases, are `MemmapVector` objects
+    that stream their data from disk. Low-precision storage vectors (see
+    `BaseAllocator.alloc_primal_low`) are always placed out-of-core.
+
+    The scratch files are unlinked as soon as they are mapped, so the disk
+    space is released automatically when the vectors are garbage collected
+    or the process exits.
+
+    .. note::
+
+        User solvers working with these vectors must write their results
+        in-place (e.g.: ``out_vec.data[:] = ...``). Re-binding the ``data``
+        attribute moves the vector into memory.
+
+    Parameters
+    ----------
+    num_primal : int
+        Primal space size.
+    num_state : int
+        State space size.
+    num_dual : int
+        Dual space size.
+    scratch_dir : string, optional
+        Directory for the scratch files. Defaults to the system temporary
+        directory.
+    in_core : int, optional
+        Number of vectors per vector space that are kept in memory.
+    chunk_size : int, optional
+        Number of elements processed per chunk by `MemmapVector` operations.
+    spaces : list of string, optional
+        Vector spaces placed out-of-core, any of ``'primal'``, ``'state'`` and
+        ``'dual'``.
+
+    Attributes
+    ----------
+    scratch_dir : string
+        Directory for the scratch files.
+    in_core : int
+        Number of vectors per vector space that are kept in memory.
+    chunk_size : int
+        Number of elements processed per chunk.
+    spaces : list of string
+        Vector spaces placed out-of-core.
+    """
+    def __init__(self, num_primal, num_state, num_dual, scratch_dir=None,
+                 in_core=4, chunk_size=65536, spaces=['state']):
+        super(MemmapAllocator, self).__init__(num_primal, num_state, num_dual)
+        for space in spaces:
+            if space not in ['primal', 'state', 'dual']:
+                raise ValueError(
+                    'MemmapAllocator() >> Unknown vector space: %s'%space)
+        if scratch_dir is None:
+            scratch_dir = tempfile.gettempdir()
+        self.scratch_dir = scratch_dir
+        self.in_core = in_core
+        self.chunk_size = chunk_size
+        self.spaces = list(spaces)
+        self._num_in_core = dict((space, 0) for space in self.spaces)
+
+    def _alloc(self, space, size, count, dtype=float, in_core=True):
+        if space not in self.spaces:
+            return [BaseVector(size, dtype=dtype) for i in xrange(count)]
+        num_in_core = 0
+        if in_core:
+            # the in-core budget is shared by all requests in this space
+            num_in_core = min(
+                count, max(self.in_core - self._num_in_core[space], 0))
+        num_mapped = count - num_in_core
+        out = []
+        if num_mapped > 0 and size > 0:
+            fd, path = tempfile.mkstemp(
+                prefix='kona_%s_'%space, suffix='.dat', dir=self.scratch_dir)
+            os.close(fd)
+            try:
+                block = np.memmap(
+                    path, dtype=dtype, mode='w+', shape=(num_mapped, size))
+            finally:
+                os.remove(path)
+            for i in xrange(num_mapped):
+                out.append(MemmapVector(block[i], self.chunk_size))
+        else:
+            num_mapped = 0
+        for i in xrange(count - num_mapped):
+            out.append(BaseVector(size, dtype=dtype))
+        self._num_in_core[space] += num_in_core
+        return out
+
+    def alloc_primal(self, count):
+        return self._alloc('primal', self.num_primal, count)
+
+    def alloc_state(self, count):
+        return self._alloc('state', self.num_state, count)
+
+    def alloc_dual(self, count):
+        return self._alloc('dual', self.num_dual, count)
+
+    def alloc_primal_low(self, count):
+        return self._alloc(
+            'primal', self.num_primal, count, np.float32, in_core=False)
+
+    def alloc_state_low(self, count):
+        return self._alloc(
+            'state', self.num_state, count, np.float32, in_core=False)
+
+    def alloc_dual_low(self, count):
+        return self._alloc(
+            'dual', self.num_dual, count, np.float32, in_core=False)
+
+    def dense_primal_size(self):
+        return self.num_primal
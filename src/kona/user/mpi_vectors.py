@@ -0,0 +1,170 @@
+import numpy as np
+
+try:
+    from mpi4py import MPI
+    mpi4py_exists = True
+except ImportError:
+    mpi4py_exists = False
+
+from base_vectors import BaseVector, BaseAllocator, _dot
+
+def _check_mpi(name):
+    if not mpi4py_exists:
+        raise ImportError(
+            '%s() >> mpi4py is required for distributed vectors'%name)
+
+class MPIVector(BaseVector):
+    """
+    A `BaseVector` distributed over the processes of an MPI communicator.
+
+    Each process owns a contiguous slice of the global vector, stored in
+    ``data``. Element-wise operations only touch the local slice and involve
+    no communication. Reductions compute a local partial result, which is
+    then combined across all processes with a single ``Allreduce`` call. This
+    includes `inner_many`, where the products with all given vectors are
+    reduced together.
+
+    .. note::
+
+        Reductions are collective operations, so all processes in the
+        communicator must call them in the same order. Kona's algorithms run
+        the same sequence of vector operations on every process.
+
+    Parameters
+    ----------
+    size: int
+        Size of the local slice owned by this process.
+    val : float, optional
+        Data value for vector initialization.
+    dtype : numpy.dtype, optional
+        Data type of the vector.
+    comm : mpi4py.MPI.Comm, optional
+        Communicator the vector is distributed over. Defaults to
+        ``MPI.COMM_WORLD``.
+
+    Attributes
+    ----------
+    data : numpy.array
+        Numpy vector containing the local slice of the data.
+    comm : mpi4py.MPI.Comm
+        Communicator the vector is distributed over.
+    """
+    def __init__(self, size, val=0, dtype=float, comm=None):
+        _check_mpi('MPIVector')
+        super(MPIVector, self).__init__(size, val, dtype)
+        if comm is None:
+            comm = MPI.COMM_WORLD
+        self.comm = comm
+
+    def _allreduce(self, local, op):
+        self.comm.Allreduce(MPI.IN_PLACE, local, op=op)
+        return local
+
+    def inner(self, vector):
+        local = np.zeros(1)
+        if len(self.data) > 0:
+            local[0] = _dot(self.data, vector.data)
+        return self._allreduce(local, MPI.SUM)[0]
+
+    def inner_many(self, vectors):
+        if len(vectors) == 0:
+            return np.zeros(0)
+        local = super(MPIVector, self).inner_many(vectors)
+        return self._allreduce(local, MPI.SUM)
+
+    @property
+    def infty(self):
+        local = np.zeros(1)
+        if len(self.data) > 0:
+            local[0] = max(self.data.max(), -self.data.min())
+        return self._allreduce(local, MPI.MAX)[0]
+
+class MPIAllocator(BaseAllocator):
+    """
+    Allocator that produces `MPIVector` objects for problems whose vector
+    spaces are already partitioned across MPI processes.
+
+    The sizes given here are the sizes of the slices owned by the calling
+    process, so the user's solver can hand its local data to Kona without
+    gathering it on one process. Vector spaces that are not in
+    ``distributed``, such as a small design space, are replicated instead:
+    every process holds a full copy in an ordinary `BaseVector`, and the
+    copies stay identical because every process performs the same
+    operations.
+
+    The user's `UserSolver.get_rank` should return ``comm.rank``, so that
+    only the root process writes Kona's output files.
+
+    Parameters
+    ----------
+    num_primal : int
+        Local primal space size.
+    num_state : int
+        Local state space size.
+    num_dual : int
+        Local dual space size.
+    comm : mpi4py.MPI.Comm, optional
+        Communicator the vectors are distributed over. Defaults to
+        ``MPI.COMM_WORLD``.
+    distributed : list of string, optional
+        Vector spaces distributed over the communicator, any of
+        ``'primal'``, ``'state'`` and ``'dual'``.
+
+    Attributes
+    ----------
+    comm : mpi4py.MPI.Comm
+        Communicator the vectors are distributed over.
+    distributed : list of string
+        Vector spaces distributed over the communicator.
+    """
+    def __init__(self, num_primal, num_state, num_dual, comm=None,
+                 distributed=['primal', 'state', 'dual']):
+        _check_mpi('MPIAllocator')
+        super(MPIAllocator, self).__init__(num_primal, num_state, num_dual)
+        for space in distributed:
+            if space not in ['primal', 'state', 'dual']:
+                raise ValueError(
+                    'MPIAllocator() >> Unknown vector space: %s'%space)
+        if comm is None:
+            comm = MPI.COMM_WORLD
+        self.comm = comm
+        self.distributed = list(distributed)
+
+    def _alloc(self, space, size, count, dtype=float):
+        out = []
+        for i in xrange(count):
+            if space in self.distributed:
+                out.append(MPIVector(size, dtype=dtype, comm=self.comm))
+            else:
+                out.append(BaseVector(size, dtype=dtype))
+        return out
+
+    def alloc_primal(self, count):
+        return self._alloc('primal', self.num_primal, count)
+
+    def alloc_state(self, count):
+        return self._alloc('state', self.num_state, count)
+
+    def alloc_dual(self, count):
+        return self._alloc('dual', self.num_dual, count)
+
+    def alloc_primal_low(self, count):
+        return self._alloc('primal', self.num_primal, count, np.float32)
+
+    def alloc_state_low(self, count):
+        return self._alloc('state', self.num_state, count, np.float32)
+
+    def alloc_dual_low(self, count):
+        return self._alloc('dual', self.num_dual, count, np.float32)
+
+    def dense_primal_size(self):
+        # unit vectors cannot be set from a global index on a local slice
+        if 'primal' in self.distributed:
+            return None
+        return self.num_primal
+
+    def alloc_primal_complex(self, count):
+        return self._alloc('primal', self.num_primal, count, complex)
+
+    def alloc_state_complex(self, count):
+        return self._alloc('state', self.num_state, count, complex)
@@ -0,0 +1,344 @@
+import threading
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+import numpy as np
+
+from base_vectors import BaseVector, BaseAllocator, _dot, _block_view
+
+# thread pools shared by all ThreadedVector objects, keyed by thread count
+_thread_pools = {}
+
+# number of elements processed at once by kernels that need scratch space
+_block_size = 8192
+
+# scratch arrays of each pool thread
+_scratch = threading.local()
+
+def _get_scratch(slot, dtype):
+    """
+    Returns a scratch array of ``_block_size`` elements owned by the calling
+    thread, so that scratch memory does not grow with the vector size.
+
+    Parameters
+    ----------
+    slot : int
+        Index that distinguishes scratch arrays needed at the same time.
+    dtype : numpy.dtype
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    arrays = getattr(_scratch, 'arrays', None)
+    if arrays is None:
+        arrays = {}
+        _scratch.arrays = arrays
+    work = arrays.get((slot, dtype))
+    if work is None or len(work) != _block_size:
+        work = np.empty(_block_size, dtype=dtype)
+        arrays[(slot, dtype)] = work
+    return work
+
+def _blocks(s):
+    """
+    Splits a chunk into consecutive blocks of at most ``_block_size``
+    elements.
+
+    Parameters
+    ----------
+    s : slice
+
+    Returns
+    -------
+    list of slice
+    """
+    return [slice(i, min(i + _block_size, s.stop))
+            for i in xrange(s.start, s.stop, _block_size)]
+
+def _get_pool(num_threads):
+    """
+    Returns a shared thread pool with the given number of threads.
+
+    Parameters
+    ----------
+    num_threads : int
+
+    Returns
+    -------
+    multiprocessing.pool.ThreadPool
+    """
+    pool = _thread_pools.get(num_threads)
+    if pool is None:
+        pool = ThreadPool(num_threads)
+        _thread_pools[num_threads] = pool
+    return pool
+
+class ThreadedVector(BaseVector):
+    """
+    A `BaseVector` that runs its operations on a pool of threads.
+
+    Vectors with at least ``threshold`` elements are split into one contiguous
+    chunk per thread. NumPy releases the GIL inside its element-wise kernels,
+    so the chunks of element-wise operations are processed concurrently, and
+    reductions are computed as per-chunk partial results that are combined at
+    the end. Smaller vectors use the plain `BaseVector` implementation, since
+    the cost of dispatching work to the threads would dominate. Kernels that
+    need scratch space process their chunk in blocks of a fixed length,
+    using small scratch arrays owned by each thread.
+
+    Linear combinations and multiple inner products over rows of a
+    `BlockAllocator` block are also left to `BaseVector`, because these are
+    single BLAS calls that are already threaded by the BLAS library.
+
+    Parameters
+    ----------
+    size: int
+        Size of the 1-D numpy vector contained in this object.
+    val : float, optional
+        Data value for vector initialization.
+    dtype : numpy.dtype, optional
+        Data type of the vector.
+    num_threads : int, optional
+        Number of threads. Defaults to the number of CPUs.
+    threshold : int, optional
+        Minimum vector size for threaded operations.
+
+    Attributes
+    ----------
+    data : numpy.array
+        Numpy vector containing numerical data.
+    num_threads : int
+        Number of threads.
+    threshold : int
+        Minimum vector size for threaded operations.
+    """
+    def __init__(self, size, val=0, dtype=float, num_threads=None,
+                 threshold=100000):
+        super(ThreadedVector, self).__init__(size, val, dtype)
+        if num_threads is None:
+            num_threads = multiprocessing.cpu_count()
+        self.num_threads = num_threads
+        self.threshold = threshold
+
+    def _threaded(self):
+        return self.num_threads > 1 and len(self.data) >= self.threshold and \
+            len(self.data) > 0
+
+    def _map(self, func):
+        size = len(self.data)
+        num_chunks = min(self.num_threads, size)
+        bounds = [size*i//num_chunks for i in xrange(num_chunks + 1)]
+        chunks = [slice(bounds[i], bounds[i+1]) for i in xrange(num_chunks)]
+        return _get_pool(self.num_threads).map(func, chunks)
+
+    def plus(self, vector):
+        if not self._threaded():
+            return super(ThreadedVector, self).plus(vector)
+
+        def kernel(s):
+            np.add(self.data[s], vector.data[s], out=self.data[s])
+
+        self._map(kernel)
+
+    def times_scalar(self, value):
+        if not self._threaded():
+            return super(ThreadedVector, self).times_scalar(value)
+
+        def kernel(s):
+            np.multiply(self.data[s], value, out=self.data[s])
+
+        self._map(kernel)
+
+    def times_vector(self, vector):
+        if not self._threaded():
+            return super(ThreadedVector, self).times_vector(vector)
+
+        def kernel(s):
+            np.multiply(self.data[s], vector.data[s], out=self.data[s])
+
+        self._map(kernel)
+
+    def equals_value(self, value):
+        if not self._threaded():
+            return super(ThreadedVector, self).equals_value(value)
+
+        def kernel(s):
+            self.data[s] = value
+
+        self._map(kernel)
+
+    def equals_vector(self, vector):
+        if not self._threaded():
+            return super(ThreadedVector, self).equals_vector(vector)
+
+        def kernel(s):
+            np.copyto(self.data[s], vector.data[s])
+
+        self._map(kernel)
+
+    def equals_ax_p_by(self, a, x, b, y):
+        if not self._threaded():
+            return super(ThreadedVector, self).equals_ax_p_by(a, x, b, y)
+        dtype = np.result_type(self.data, x.data, np.float64)
+
+        def kernel(s):
+            work = _get_scratch(0, dtype)
+            for blk in _blocks(s):
+                w = work[:blk.stop - blk.start]
+                # both operands are read before the block is written
+                np.multiply(x.data[blk], a, out=w)
+                np.multiply(y.data[blk], b, out=self.data[blk])
+                np.add(self.data[blk], w, out=self.data[blk])
+
+        self._map(kernel)
+
+    def equals_lin_comb(self, coeffs, vectors):
+        coeffs = np.asarray(coeffs, dtype=float)
+        if len(coeffs) != len(vectors):
+            raise ValueError(
+                'number of coefficients must match the number of vectors')
+        if not self._threaded() or len(vectors) == 0 or \
+                _block_view([vector.data for vector in vectors]) is not None:
+            return super(ThreadedVector, self).equals_lin_comb(
+                coeffs, vectors)
+        dtype = np.result_type(self.data, np.float64)
+
+        def kernel(s):
+            work = _get_scratch(0, dtype)
+            work_k = _get_scratch(1, dtype)
+            for blk in _blocks(s):
+                w = work[:blk.stop - blk.start]
+                w_k = work_k[:blk.stop - blk.start]
+                np.multiply(vectors[0].data[blk], coeffs[0], out=w)
+                for k in xrange(1, len(vectors)):
+                    np.multiply(vectors[k].data[blk], coeffs[k], out=w_k)
+                    np.add(w, w_k, out=w)
+                self.data[blk] = w
+
+        self._map(kernel)
+
+    def inner(self, vector):
+        if not self._threaded():
+            return super(ThreadedVector, self).inner(vector)
+
+        def kernel(s):
+            return _dot(self.data[s], vector.data[s])
+
+        return float(np.sum(self._map(kernel)))
+
+    def inner_many(self, vectors):
+        if not self._threaded() or len(vectors) == 0:
+            return super(ThreadedVector, self).inner_many(vectors)
+        if self.data.dtype == np.float64 and \
+                _block_view([vector.data for vector in vectors]) is not None:
+            return super(ThreadedVector, self).inner_many(vectors)
+
+        def kernel(s):
+            chunk = self.data[s]
+            out = np.empty(len(vectors))
+            for k in xrange(len(vectors)):
+                out[k] = _dot(chunk, vectors[k].data[s])
+            return out
+
+        return np.sum(self._map(kernel), axis=0)
+
+    @property
+    def infty(self):
+        if not self._threaded():
+            return super(ThreadedVector, self).infty
+
+        def kernel(s):
+            chunk = self.data[s]
+            return max(chunk.max(), -chunk.min())
+
+        return max(self._map(kernel))
+
+    def exp(self, vector):
+        if not self._threaded():
+            return super(ThreadedVector, self).exp(vector)
+
+        def kernel(s):
+            np.exp(vector.data[s], out=self.data[s])
+
+        self._map(kernel)
+
+    def log(self, vector):
+        if not self._threaded():
+            return super(ThreadedVector, self).log(vector)
+
+        def kernel(s):
+            np.log(vector.data[s], out=self.data[s])
+
+        self._map(kernel)
+
+    def pow(self, power):
+        if not self._threaded():
+            return super(ThreadedVector, self).pow(power)
+
+        def kernel(s):
+            np.power(self.data[s], power, out=self.data[s])
+
+        self._map(kernel)
+
+class ThreadedAllocator(BaseAllocator):
+    """
+    Allocator that produces `ThreadedVector` objects in all vector spaces.
+
+    Parameters
+    ----------
+    num_primal : int
+        Primal space size.
+    num_state : int
+        State space size.
+    num_dual : int
+        Dual space size.
+    num_threads : int, optional
+        Number of threads. Defaults to the number of CPUs.
+    threshold : int, optional
+        Minimum vector size for threaded operations.
+
+    Attributes
+    ----------
+    num_threads : int
+        Number of threads.
+    threshold : int
+        Minimum vector size for threaded operations.
+    """
+    def __init__(self, num_primal, num_state, num_dual, num_threads=None,
+                 threshold=100000):
+        super(ThreadedAllocator, self).__init__(
+            num_primal, num_state, num_dual)
+        if num_threads is None:
+            num_threads = multiprocessing.cpu_count()
+        self.num_threads = num_threads
+        self.threshold = threshold
+
+    def _alloc(self, size, count, dtype=float):
+        out = []
+        for i in xrange(count):
+            out.append(ThreadedVector(
+                size, dtype=dtype, num_threads=self.num_threads,
+                threshold=self.threshold))
+        return out
+
+    def alloc_primal(self, count):
+        return self._alloc(self.num_primal, count)
+
+    def alloc_state(self, count):
+        return self._alloc(self.num_state, count)
+
+    def alloc_dual(self, count):
+        return self._alloc(self.num_dual, count)
+
+    def alloc_primal_low(self, count):
+        return self._alloc(self.num_primal, count, np.float32)
+
+    def alloc_state_low(self, count):
+        return self._alloc(self.num_state, count, np.float32)
+
+    def alloc_dual_low(self, count):
+        return self._alloc(self.num_dual, count, np.float32)
+
+    def dense_primal_size(self):
+        return self.num_primal
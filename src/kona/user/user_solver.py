@@ -148,6 +148,33 @@ class UserSolver(object):
         """
         out_vec.data[:] = 0.
 
+    def multiply_dRdX_block(self, at_design, at_state, in_vecs, out_vecs):
+        """
+        OPTIONAL: Evaluate ``multiply_dRdX()`` for several vectors at the same
+        (design, state) point. The product with ``in_vecs[i]`` should be
+        stored in ``out_vecs[i]``.
+
+        Kona calls the block variants of the jacobian products whenever it
+        needs several independent products at one linearization point.
+        Solvers that can apply a jacobian to a block of vectors at nearly the
+        cost of a single product, e.g. by sharing the jacobian assembly and
+        memory traffic, should implement them. By default, the products are
+        evaluated one at a time.
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        in_vecs : list of BaseVector
+            Vectors to be operated on.
+        out_vecs : list of BaseVector
+            Locations where user should store the results.
+        """
+        for in_vec, out_vec in zip(in_vecs, out_vecs):
+            self.multiply_dRdX(at_design, at_state, in_vec, out_vec)
+
     def multiply_dRdU(self, at_design, at_state, in_vec, out_vec):
         """
         Evaluate the matrix-vector product for the state-jacobian of the PDE
@@ -177,6 +204,26 @@ class UserSolver(object):
         """
         out_vec.data[:] = 0.
 
+    def multiply_dRdU_block(self, at_design, at_state, in_vecs, out_vecs):
+        """
+        OPTIONAL: Evaluate ``multiply_dRdU()`` for several vectors at the same
+        (design, state) point. The product with ``in_vecs[i]`` should be
+        stored in ``out_vecs[i]``. See ``multiply_dRdX_block()``.
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        in_vecs : list of BaseVector
+            Vectors to be operated on.
+        out_vecs : list of BaseVector
+            Locations where user should store the results.
+        """
+        for in_vec, out_vec in zip(in_vecs, out_vecs):
+            self.multiply_dRdU(at_design, at_state, in_vec, out_vec)
+
     def multiply_dRdX_T(self, at_design, at_state, in_vec, out_vec):
         """
         Evaluate the transposed matrix-vector product for the design-jacobian
@@ -212,6 +259,26 @@ class UserSolver(object):
         """
         out_vec.data[:] = 0.0
 
+    def multiply_dRdX_T_block(self, at_design, at_state, in_vecs, out_vecs):
+        """
+        OPTIONAL: Evaluate ``multiply_dRdX_T()`` for several vectors at the same
+        (design, state) point. The product with ``in_vecs[i]`` should be
+        stored in ``out_vecs[i]``. See ``multiply_dRdX_block()``.
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        in_vecs : list of BaseVector
+            Vectors to be operated on.
+        out_vecs : list of BaseVector
+            Locations where user should store the results.
+        """
+        for in_vec, out_vec in zip(in_vecs, out_vecs):
+            self.multiply_dRdX_T(at_design, at_state, in_vec, out_vec)
+
     def multiply_dRdU_T(self, at_design, at_state, in_vec, out_vec):
         """
         Evaluate the transposed matrix-vector product for the state-jacobian
@@ -242,6 +309,51 @@ class UserSolver(object):
         """
         out_vec.data[:] = 0.
 
+    def multiply_dRdU_T_block(self, at_design, at_state, in_vecs, out_vecs):
+        """
+        OPTIONAL: Evaluate ``multiply_dRdU_T()`` for several vectors at the same
+        (design, state) point. The product with ``in_vecs[i]`` should be
+        stored in ``out_vecs[i]``. See ``multiply_dRdX_block()``.
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        in_vecs : list of BaseVector
+            Vectors to be operated on.
+        out_vecs : list of BaseVector
+            Locations where user should store the results.
+        """
+        for in_vec, out_vec in zip(in_vecs, out_vecs):
+            self.multiply_dRdU_T(at_design, at_state, in_vec, out_vec)
+
+    def set_linearization(self, at_design, at_state, key):
+        """
+        OPTIONAL: Kona calls this method before jacobian products, linear
+        solves and preconditioner applications whenever their (design, state)
+        evaluation point differs from the previous one. The following
+        callbacks are evaluated at ``at_design`` and ``at_state`` until the
+        next call.
+
+        The ``key`` identifies the contents of both vectors: it changes
+        whenever Kona modifies either of them, and it is the same whenever
+        Kona returns to an unmodified point. Solvers that cache their
+        jacobians can store them under this key, and rebuild them only for
+        keys they have not seen before.
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Design vector of the evaluation point.
+        at_state : BaseVector
+            State vector of the evaluation point.
+        key : hashable
+            Key of the evaluation point.
+        """
+        pass
+
     def factor_linear_system(self, at_design, at_state):
         """
         OPTIONAL: Build/factor the dR/dU matrix and its preconditioner at the
@@ -364,6 +476,26 @@ class UserSolver(object):
         """
         out_vec.data[:] = 0.
 
+    def multiply_dCdX_block(self, at_design, at_state, in_vecs, out_vecs):
+        """
+        OPTIONAL: Evaluate ``multiply_dCdX()`` for several vectors at the same
+        (design, state) point. The product with ``in_vecs[i]`` should be
+        stored in ``out_vecs[i]``. See ``multiply_dRdX_block()``.
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        in_vecs : list of BaseVector
+            Vectors to be operated on.
+        out_vecs : list of BaseVector
+            Locations where user should store the results.
+        """
+        for in_vec, out_vec in zip(in_vecs, out_vecs):
+            self.multiply_dCdX(at_design, at_state, in_vec, out_vec)
+
     def multiply_dCdU(self, at_design, at_state, in_vec, out_vec):
         """
         Evaluate the matrix-vector product for the state-jacobian of the
@@ -394,6 +526,26 @@ class UserSolver(object):
         """
         out_vec.data[:] = 0.
 
+    def multiply_dCdU_block(self, at_design, at_state, in_vecs, out_vecs):
+        """
+        OPTIONAL: Evaluate ``multiply_dCdU()`` for several vectors at the same
+        (design, state) point. The product with ``in_vecs[i]`` should be
+        stored in ``out_vecs[i]``. See ``multiply_dRdX_block()``.
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        in_vecs : list of BaseVector
+            Vectors to be operated on.
+        out_vecs : list of BaseVector
+            Locations where user should store the results.
+        """
+        for in_vec, out_vec in zip(in_vecs, out_vecs):
+            self.multiply_dCdU(at_design, at_state, in_vec, out_vec)
+
     def multiply_dCdX_T(self, at_design, at_state, in_vec, out_vec):
         """
         Evaluate the transposed matrix-vector product for the design-jacobian
@@ -424,6 +576,26 @@ class UserSolver(object):
         """
         out_vec.data[:] = 0.
 
+    def multiply_dCdX_T_block(self, at_design, at_state, in_vecs, out_vecs):
+        """
+        OPTIONAL: Evaluate ``multiply_dCdX_T()`` for several vectors at the same
+        (design, state) point. The product with ``in_vecs[i]`` should be
+        stored in ``out_vecs[i]``. See ``multiply_dRdX_block()``.
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        in_vecs : list of BaseVector
+            Vectors to be operated on.
+        out_vecs : list of BaseVector
+            Locations where user should store the results.
+        """
+        for in_vec, out_vec in zip(in_vecs, out_vecs):
+            self.multiply_dCdX_T(at_design, at_state, in_vec, out_vec)
+
     def multiply_dCdU_T(self, at_design, at_state, in_vec, out_vec):
         """
         Evaluate the transposed matrix-vector product for the state-jacobian
@@ -454,6 +626,150 @@ class UserSolver(object):
         """
         out_vec.data[:] = 0.0
 
+    def multiply_dCdU_T_block(self, at_design, at_state, in_vecs, out_vecs):
+        """
+        OPTIONAL: Evaluate ``multiply_dCdU_T()`` for several vectors at the same
+        (design, state) point. The product with ``in_vecs[i]`` should be
+        stored in ``out_vecs[i]``. See ``multiply_dRdX_block()``.
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        in_vecs : list of BaseVector
+            Vectors to be operated on.
+        out_vecs : list of BaseVector
+            Locations where user should store the results.
+        """
+        for in_vec, out_vec in zip(in_vecs, out_vecs):
+            self.multiply_dCdU_T(at_design, at_state, in_vec, out_vec)
+
+    def multiply_d2LdX2(self, at_design, at_state, at_adjoint, at_dual,
+                        in_vec, out_vec):
+        """
+        OPTIONAL: Evaluate the matrix-vector product for the second
+        derivative of the Lagrangian with respect to design variables.
+
+        .. math::
+
+            \frac{\partial^2 L}{\partial X^2} in_vec = out_vec
+
+        where the Lagrangian is defined as
+
+        .. math::
+
+            L = F(at_design, at_state) + at_adjoint^T R(at_design, at_state)
+            + at_dual^T C(at_design, at_state)
+
+        If all four ``multiply_d2L*`` methods are implemented, Kona uses them
+        for the 2nd order adjoint formulation of its Hessian-vector products
+        instead of finite differences of ``eval_dFdX()``, ``eval_dFdU()`` and
+        the jacobian-transpose products. Otherwise they are never called.
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        at_adjoint : BaseVector
+            Current adjoint vector for the residual.
+        at_dual : BaseVector or None
+            Current Lagrange multipliers for the constraints, or None for
+            unconstrained problems.
+        in_vec : BaseVector
+            Design vector to be operated on.
+        out_vec : BaseVector
+            Location where user should store the result (design vector).
+        """
+        raise NotImplementedError
+
+    def multiply_d2LdXdU(self, at_design, at_state, at_adjoint, at_dual,
+                         in_vec, out_vec):
+        """
+        OPTIONAL: Evaluate the matrix-vector product for the mixed second
+        derivative of the Lagrangian, applied to a state vector. See
+        ``multiply_d2LdX2()``.
+
+        .. math::
+
+            \frac{\partial^2 L}{\partial X \partial U} in_vec = out_vec
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        at_adjoint : BaseVector
+            Current adjoint vector for the residual.
+        at_dual : BaseVector or None
+            Current Lagrange multipliers for the constraints.
+        in_vec : BaseVector
+            State vector to be operated on.
+        out_vec : BaseVector
+            Location where user should store the result (design vector).
+        """
+        raise NotImplementedError
+
+    def multiply_d2LdXdU_T(self, at_design, at_state, at_adjoint, at_dual,
+                           in_vec, out_vec):
+        """
+        OPTIONAL: Evaluate the transposed matrix-vector product for the mixed
+        second derivative of the Lagrangian, applied to a design vector. See
+        ``multiply_d2LdX2()``.
+
+        .. math::
+
+            \frac{\partial^2 L}{\partial U \partial X} in_vec = out_vec
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        at_adjoint : BaseVector
+            Current adjoint vector for the residual.
+        at_dual : BaseVector or None
+            Current Lagrange multipliers for the constraints.
+        in_vec : BaseVector
+            Design vector to be operated on.
+        out_vec : BaseVector
+            Location where user should store the result (state vector).
+        """
+        raise NotImplementedError
+
+    def multiply_d2LdU2(self, at_design, at_state, at_adjoint, at_dual,
+                        in_vec, out_vec):
+        """
+        OPTIONAL: Evaluate the matrix-vector product for the second
+        derivative of the Lagrangian with respect to state variables. See
+        ``multiply_d2LdX2()``.
+
+        .. math::
+
+            \frac{\partial^2 L}{\partial U^2} in_vec = out_vec
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        at_adjoint : BaseVector
+            Current adjoint vector for the residual.
+        at_dual : BaseVector or None
+            Current Lagrange multipliers for the constraints.
+        in_vec : BaseVector
+            State vector to be operated on.
+        out_vec : BaseVector
+            Location where user should store the result (state vector).
+        """
+        raise NotImplementedError
+
     def restrict_dual(self, dual_vector):
         """
         Set all dual variables corresponding to equality constraints to zero.
@@ -581,7 +897,9 @@ class UserSolver(object):
         The jacobian should be evaluated at the given (design, state) point,
         ``at_design`` and ``at_state``.
 
-        Store the solution in ``result``.
+        Store the solution in ``result``. On entry, ``result`` holds an
+        initial guess for the solution, which iterative solvers can use as
+        their starting point.
 
         .. note::
 
@@ -623,7 +941,9 @@ class UserSolver(object):
         The jacobian should be evaluated at the given (design, state) point,
         ``at_design`` and ``at_state``.
 
-        Store the solution in ``result``.
+        Store the solution in ``result``. On entry, ``result`` holds an
+        initial guess for the solution, which iterative solvers can use as
+        their starting point.
 
         .. note::
 
@@ -653,6 +973,78 @@ class UserSolver(object):
             result.data[:] = 0.
         return 0
 
+    def solve_linear_block(self, at_design, at_state, rhs_vecs, rel_tol,
+                           results):
+        """
+        OPTIONAL: Solve the linear system defined by the state-jacobian of the
+        PDE residual for several right hand sides at the same (design, state)
+        point. The solution for ``rhs_vecs[i]`` should be stored in
+        ``results[i]``.
+
+        Kona groups independent solves that share a linearization into a
+        single call to this method. Solvers that use
+        ``factor_linear_system()`` can then perform one multi-RHS triangular
+        solve with the stored factorization. By default, the systems are
+        solved one at a time with ``solve_linear()``.
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        rhs_vecs : list of BaseVector
+            Right hand side vectors.
+        rel_tol : float
+            Tolerance that the linear systems should be solved to.
+        results : list of BaseVector
+            Locations where user should store the results. On entry, they
+            hold initial guesses for the solutions.
+
+        Returns
+        -------
+        int
+            Number of preconditioner calls required for all the solutions.
+        """
+        cost = 0
+        for rhs_vec, result in zip(rhs_vecs, results):
+            cost += self.solve_linear(
+                at_design, at_state, rhs_vec, rel_tol, result)
+        return cost
+
+    def solve_adjoint_block(self, at_design, at_state, rhs_vecs, rel_tol,
+                            results):
+        """
+        OPTIONAL: Solve the linear system defined by the transposed
+        state-jacobian of the PDE residual for several right hand sides at the
+        same (design, state) point. The solution for ``rhs_vecs[i]`` should be
+        stored in ``results[i]``. See ``solve_linear_block()``.
+
+        Parameters
+        ----------
+        at_design : BaseVector
+            Current design vector.
+        at_state : BaseVector
+            Current state vector.
+        rhs_vecs : list of BaseVector
+            Right hand side vectors.
+        rel_tol : float
+            Tolerance that the linear systems should be solved to.
+        results : list of BaseVector
+            Locations where user should store the results. On entry, they
+            hold initial guesses for the solutions.
+
+        Returns
+        -------
+        int
+            Number of preconditioner calls required for all the solutions.
+        """
+        cost = 0
+        for rhs_vec, result in zip(rhs_vecs, results):
+            cost += self.solve_adjoint(
+                at_design, at_state, rhs_vec, rel_tol, result)
+        return cost
+
     def current_solution(self, curr_design, curr_state, curr_adj,
                          curr_dual, num_iter):
         """